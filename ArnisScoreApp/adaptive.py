@@ -0,0 +1,95 @@
+import datetime
+from threading import Lock
+
+# (imgsz, detect_every) from best quality to cheapest. Frames the detector
+# skips are covered by the tracker, so a higher skip costs little accuracy.
+DEFAULT_LADDER = (
+    (640, 1),
+    (640, 2),
+    (512, 2),
+    (512, 3),
+    (416, 3),
+    (416, 4),
+    (320, 4),
+)
+
+class AdaptiveController:
+    """Closed-loop choice of detector input size and frame skip for one camera.
+
+    Feed it the measured latency of every detector call with ``record``. Every
+    ``window`` calls it compares the frame rate the current level can sustain
+    (``detect_every / latency``) with ``target_fps`` and moves one rung down the
+    ladder when it falls short, or one rung up when the better level would
+    still hold the target with ``headroom`` to spare. Levels below the quality
+    floor (``min_imgsz`` / ``max_skip``) are never used.
+    """
+    def __init__(self, target_fps=30.0, min_imgsz=416, max_skip=3, ladder=DEFAULT_LADDER,
+                 window=30, smoothing=0.2, headroom=1.25, name="", log_callback=None):
+        self.ladder = [
+            (imgsz, skip) for imgsz, skip in ladder if imgsz >= min_imgsz and skip <= max_skip
+        ]
+        if not self.ladder:
+            raise ValueError("Quality floor excludes every level of the ladder")
+        self.target_fps = float(target_fps)
+        self.window = int(window)
+        self.smoothing = float(smoothing)
+        self.headroom = float(headroom)
+        self.name = name
+        self.log_callback = log_callback
+        self.level = 0
+        self.latency = None
+        self.samples = 0
+        self.changes = []
+        self.lock = Lock()
+
+    @property
+    def imgsz(self):
+        return self.ladder[self.level][0]
+
+    @property
+    def detect_every(self):
+        return self.ladder[self.level][1]
+
+    def sustainable_fps(self, level=None, latency=None):
+        """Frame rate a level can hold, scaling latency with the input pixel count."""
+        level = self.level if level is None else level
+        latency = self.latency if latency is None else latency
+        if not latency:
+            return float("inf")
+        imgsz, skip = self.ladder[level]
+        scaled = latency * (imgsz / self.imgsz) ** 2
+        return skip / scaled
+
+    def record(self, latency_s):
+        with self.lock:
+            if self.latency is None:
+                self.latency = latency_s
+            else:
+                self.latency += (latency_s - self.latency) * self.smoothing
+            self.samples += 1
+            if self.samples < self.window:
+                return
+            self.samples = 0
+
+            current = self.sustainable_fps()
+            if current < self.target_fps and self.level < len(self.ladder) - 1:
+                self._move(self.level + 1, current)
+            elif (self.level > 0
+                  and self.sustainable_fps(self.level - 1) >= self.target_fps * self.headroom):
+                self._move(self.level - 1, current)
+
+    def _move(self, level, current_fps):
+        old = self.ladder[self.level]
+        self.level = level
+        # Latency was measured at the old size; rescale so the next decision is fair
+        self.latency *= (self.imgsz / old[0]) ** 2
+        direction = "down" if level > self.ladder.index(old) else "up"
+        message = (
+            f"{self.name}: stepping {direction} to imgsz={self.imgsz}, detect every "
+            f"{self.detect_every} frame(s) (sustainable {current_fps:.1f} FPS, "
+            f"target {self.target_fps:.0f} FPS)"
+        )
+        self.changes.append((datetime.datetime.now(), old, self.ladder[level]))
+        print(f"[{datetime.datetime.now():%H:%M:%S}] {message}")
+        if self.log_callback:
+            self.log_callback(message)
@@ -0,0 +1,159 @@
+"""Headless match analyzer: scores a recorded bout with the live scoring logic.
+
+    python analyze.py match.mp4 --events hits.jsonl --csv hits.csv --video annotated.mp4
+
+Frames are decoded, scored and (optionally) written one at a time, so memory
+stays flat however long the match is. Nothing here imports Qt or needs a display.
+"""
+import os
+import csv
+import json
+import time
+import argparse
+
+import cv2
+
+from backends import BACKENDS, set_default_backend
+from frame_source import VideoFileSource, open_file_capture
+from prediction import Prediction
+
+EVENT_FIELDS = [
+    "frame", "timestamp", "attacker", "body_part", "valid", "confidence", "blue_score", "red_score",
+]
+
+def iter_frames(path, start=0, end=None, prefetch=8):
+    """Yields (frame_index, timestamp_s, frame) for frames [start, end) of the video.
+
+    Decoding runs ahead on a background thread, at most ``prefetch`` frames,
+    so it overlaps with scoring; indices and timestamps are those of the
+    whole video, not of the requested range.
+    """
+    with VideoFileSource(path, prefetch=prefetch, start=start, end=end) as source:
+        yield from source
+
+def video_fps(path):
+    return video_info(path)[0]
+
+def video_info(path):
+    """(fps, frame_count) as reported by the container."""
+    cap = open_file_capture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frame_count
+
+class EventWriter:
+    """Appends hit events to JSONL and/or CSV as they happen, flushing each one."""
+    def __init__(self, jsonl_path=None, csv_path=None):
+        self.jsonl = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+        self.csv_file = open(csv_path, "w", newline="", encoding="utf-8") if csv_path else None
+        self.csv = None
+        if self.csv_file:
+            self.csv = csv.DictWriter(self.csv_file, fieldnames=EVENT_FIELDS)
+            self.csv.writeheader()
+        self.count = 0
+
+    def write(self, event):
+        if self.jsonl:
+            self.jsonl.write(json.dumps(event) + "\n")
+            self.jsonl.flush()
+        if self.csv:
+            self.csv.writerow(event)
+            self.csv_file.flush()
+        self.count += 1
+
+    def close(self):
+        for f in (self.jsonl, self.csv_file):
+            if f:
+                f.close()
+
+def analyze_video(path, writer, prediction=None, video_path=None, camera_number=1, report_every=500,
+                  start=0, end=None, record_from=None):
+    """Runs frames [start, end) of ``path`` through Prediction.process_frame; returns a summary dict.
+
+    Frames before ``record_from`` are scored to warm up the tracker, the
+    CNN+LSTM window and hit debouncing, but their events are not written.
+    """
+    hits = []
+    if prediction is None:
+        prediction = Prediction()
+    prediction.log_callback = lambda valid, conf, text, cam: hits.append((valid, conf, text))
+
+    fps = video_fps(path)
+    out = None
+    started = time.perf_counter()
+    frames = 0
+    try:
+        for index, timestamp, frame in iter_frames(path, start, end):
+            annotated = prediction.process_frame(
+                frame, camera_number, frame_seq=index, render=video_path is not None
+            )
+            if video_path is not None:
+                if out is None:
+                    height, width = annotated.shape[:2]
+                    out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+                out.write(annotated)
+
+            if record_from is not None and index < record_from:
+                hits.clear()
+            for valid, confidence, text in hits:
+                attacker, _, body_part = text.partition(" - ")
+                writer.write({
+                    "frame": index,
+                    "timestamp": round(timestamp, 3),
+                    "attacker": attacker,
+                    "body_part": body_part,
+                    "valid": bool(valid),
+                    "confidence": round(float(confidence), 2),
+                    "blue_score": prediction.scores["Blue"],
+                    "red_score": prediction.scores["Red"],
+                })
+            hits.clear()
+
+            frames += 1
+            if report_every and frames % report_every == 0:
+                elapsed = time.perf_counter() - started
+                print(f"{frames} frames ({timestamp:.0f}s of video), {frames / elapsed:.1f} FPS")
+    finally:
+        if out is not None:
+            out.release()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "frames": frames,
+        "events": writer.count,
+        "seconds": elapsed,
+        "scores": dict(prediction.scores),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="Match video to analyze")
+    parser.add_argument("--events", help="Write hit events as JSON lines (default: <video>_events.jsonl)")
+    parser.add_argument("--csv", help="Write hit events as CSV")
+    parser.add_argument("--video", dest="annotated", help="Write an annotated copy of the video (mp4)")
+    parser.add_argument("--backend", choices=BACKENDS, default=os.environ.get("ARNIS_BACKEND", "torch"))
+    parser.add_argument("--conf", type=float, default=0.7, help="Detection confidence threshold")
+    parser.add_argument("--roi", action="store_true", help="Detect on a crop around the fighters")
+    parser.add_argument("--detect-every", type=int, default=1, metavar="N",
+                        help="Run the detector on every Nth frame and track in between")
+    args = parser.parse_args()
+    set_default_backend(args.backend)
+
+    events_path = args.events
+    if events_path is None and args.csv is None:
+        events_path = os.path.splitext(args.video)[0] + "_events.jsonl"
+
+    prediction = Prediction(roi_mode=args.roi, detect_every=args.detect_every)
+    prediction.confidence_threshold = args.conf
+    writer = EventWriter(events_path, args.csv)
+    try:
+        summary = analyze_video(args.video, writer, prediction, video_path=args.annotated)
+    finally:
+        writer.close()
+
+    print(f"{summary['frames']} frames in {summary['seconds']:.1f}s, {summary['events']} hit events")
+    print(f"Final score: Blue {summary['scores']['Blue']} - Red {summary['scores']['Red']}")
+    for path in (events_path, args.csv, args.annotated):
+        if path:
+            print(f"Wrote {path}")
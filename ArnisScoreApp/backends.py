@@ -0,0 +1,145 @@
+import os
+import sys
+import importlib.util
+
+# torch    - the trained .pt weights through PyTorch (default)
+# onnx     - ONNX Runtime on the CPU
+# openvino - OpenVINO IR, the fastest option on Intel laptops
+# int8     - static INT8 ONNX produced by quantize.py, run with ONNX Runtime
+# auto     - openvino if installed, else onnx if installed, else torch
+BACKENDS = ("torch", "onnx", "openvino", "int8", "auto")
+
+_default_backend = os.environ.get("ARNIS_BACKEND", "torch")
+
+def set_default_backend(name):
+    global _default_backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    _default_backend = name
+
+def get_default_backend():
+    return _default_backend
+
+def is_installed(module_name):
+    return importlib.util.find_spec(module_name) is not None
+
+def resolve_backend(name=None):
+    name = name or _default_backend
+    if name == "auto":
+        if is_installed("openvino"):
+            return "openvino"
+        if is_installed("onnxruntime"):
+            return "onnx"
+        return "torch"
+    if name in ("onnx", "int8") and not is_installed("onnxruntime"):
+        print("onnxruntime is not installed, falling back to the torch backend")
+        return "torch"
+    if name == "openvino" and not is_installed("openvino"):
+        print("OpenVINO is not installed, falling back to the onnx backend")
+        return resolve_backend("onnx")
+    return name
+
+def exported_path(weights_path, backend):
+    stem, _ = os.path.splitext(weights_path)
+    if backend == "onnx":
+        return stem + ".onnx"
+    if backend == "openvino":
+        return stem + "_openvino_model"
+    if backend == "int8":
+        return stem + "_int8.onnx"
+    return weights_path
+
+def export_weights(weights_path, backend, imgsz=640):
+    """Export .pt weights for a backend once; later runs reuse the file next to them."""
+    target = exported_path(weights_path, backend)
+    if backend == "torch" or os.path.exists(target):
+        return target
+    if backend == "int8":
+        # Calibration needs the training images, so this is never done on the fly
+        raise FileNotFoundError(f"{target} not found; build it with quantize.py first")
+
+    from ultralytics import YOLO
+    print(f"Exporting {os.path.basename(weights_path)} for the {backend} backend...")
+    # dynamic shapes keep batched multi-camera calls and smaller imgsz working
+    exported = YOLO(weights_path).export(format=backend, imgsz=imgsz, dynamic=True)
+    return exported or target
+
+def load_model(weights_path, backend=None):
+    """Returns an ultralytics YOLO object running on the requested backend.
+
+    Every backend yields the same ``Results`` objects, so callers do not
+    need to know which one is in use.
+    """
+    from ultralytics import YOLO
+    backend = resolve_backend(backend)
+    if backend == "torch" or not weights_path.endswith(".pt"):
+        return YOLO(weights_path), backend
+    return YOLO(export_weights(weights_path, backend), task="detect"), backend
+
+# ---------------- Output parity check ----------------
+def _box_iou(a, b):
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def compare_backends(weights_path, images, backend, conf=0.25, min_iou=0.9, conf_tol=0.05):
+    """Runs the same images through torch and ``backend`` and matches their detections.
+
+    A torch box counts as reproduced when the other backend has a box of the
+    same class with IoU >= ``min_iou`` and confidence within ``conf_tol``.
+    Returns a list of per-image mismatch descriptions (empty when in parity).
+    """
+    import cv2
+    reference, _ = load_model(weights_path, "torch")
+    candidate, resolved = load_model(weights_path, backend)
+    if resolved == "torch":
+        raise RuntimeError(f"Backend '{backend}' is not available here")
+
+    mismatches = []
+    for image_path in images:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            mismatches.append(f"{image_path}: could not be read")
+            continue
+        ref = reference(frame, verbose=False, conf=conf)[0].boxes
+        got = candidate(frame, verbose=False, conf=conf)[0].boxes
+        ref_boxes = list(zip(ref.xyxy.tolist(), ref.cls.tolist(), ref.conf.tolist()))
+        got_boxes = list(zip(got.xyxy.tolist(), got.cls.tolist(), got.conf.tolist()))
+
+        if len(ref_boxes) != len(got_boxes):
+            mismatches.append(f"{image_path}: {len(ref_boxes)} torch boxes vs {len(got_boxes)} {resolved} boxes")
+        for box, cls, score in ref_boxes:
+            best = max(
+                (g for g in got_boxes if int(g[1]) == int(cls)),
+                key=lambda g: _box_iou(box, g[0]),
+                default=None,
+            )
+            if best is None or _box_iou(box, best[0]) < min_iou:
+                mismatches.append(f"{image_path}: class {int(cls)} box {box} has no match")
+            elif abs(best[2] - score) > conf_tol:
+                mismatches.append(
+                    f"{image_path}: class {int(cls)} confidence {score:.3f} vs {best[2]:.3f}"
+                )
+    return mismatches
+
+if __name__ == "__main__":
+    import argparse
+    from detection import get_model_path
+
+    parser = argparse.ArgumentParser(description="Check detector output parity against PyTorch")
+    parser.add_argument("images", nargs="+", help="Images to run through both backends")
+    parser.add_argument("--backend", default="onnx", choices=("onnx", "openvino", "int8"))
+    parser.add_argument("--weights", default=get_model_path("object_detection.pt"))
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--conf-tol", type=float, default=0.05)
+    args = parser.parse_args()
+
+    problems = compare_backends(
+        args.weights, args.images, args.backend, min_iou=args.min_iou, conf_tol=args.conf_tol
+    )
+    for problem in problems:
+        print(problem)
+    print(f"{len(args.images)} images checked, {len(problems)} mismatches")
+    sys.exit(1 if problems else 0)
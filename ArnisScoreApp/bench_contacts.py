@@ -0,0 +1,102 @@
+"""Microbenchmark: per-box Python contact loop vs. geometry.find_contacts.
+
+    python bench_contacts.py --boxes 4 8 12 24 48 --frames 5000
+    python bench_contacts.py --torch        # boxes as torch tensors, as the detector returns them
+
+A match frame usually holds two fighters, so 4-8 boxes. find_contacts
+walks small frames in plain Python and switches to the IoU matrix above
+SMALL_BOXES. With --torch the loop pays a ``.cpu().numpy()`` per box, as
+the old Prediction.process_frame did, and find_contacts pays the one
+``as_arrays`` conversion per frame.
+"""
+import time
+import argparse
+from types import SimpleNamespace
+
+import numpy as np
+
+from geometry import as_arrays, find_contacts
+
+def calculate_iou(box1, box2):
+    x1_inter = max(box1[0], box2[0])
+    y1_inter = max(box1[1], box2[1])
+    x2_inter = min(box1[2], box2[2])
+    y2_inter = min(box1[3], box2[3])
+    inter_area = max(0, x2_inter - x1_inter) * max(0, y2_inter - y1_inter)
+    box1_area = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    box2_area = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    union_area = box1_area + box2_area - inter_area
+    return inter_area / union_area if union_area > 0 else 0.0
+
+def loop_contacts(xyxy, cls, conf, threshold):
+    """The pre-vectorisation Prediction.process_frame loop, one box at a time.
+
+    With torch tensors each box is copied off the device on its own, as
+    the old code did; with NumPy rows that copy is left out.
+    """
+    groups = {0: [], 1: [], 2: [], 3: []}
+    for coords, class_id, score in zip(xyxy, cls, conf):
+        if score < threshold:
+            continue
+        coords = coords.cpu().numpy() if hasattr(coords, "cpu") else np.array(coords)
+        groups[int(class_id)].append((coords, float(score)))
+
+    contacts = []
+    for stick, score in groups[3]:
+        for player, _ in groups[0]:
+            if calculate_iou(stick, player) > 0.0:
+                contacts.append(("Red", score))
+    for stick, score in groups[1]:
+        for player, _ in groups[2]:
+            if calculate_iou(stick, player) > 0.0:
+                contacts.append(("Blue", score))
+    return contacts
+
+def random_frame(rng, n_boxes, size=640):
+    xy = rng.uniform(0, size * 0.8, (n_boxes, 2))
+    wh = rng.uniform(20, size * 0.3, (n_boxes, 2))
+    xyxy = np.hstack([xy, xy + wh]).astype(np.float32)
+    cls = rng.integers(0, 4, n_boxes)
+    conf = rng.uniform(0.5, 1.0, n_boxes).astype(np.float32)
+    return xyxy, cls, conf
+
+def contacts_from_boxes(xyxy, cls, conf, threshold):
+    """find_contacts including the per-frame copy off the device."""
+    return find_contacts(*as_arrays(SimpleNamespace(xyxy=xyxy, cls=cls, conf=conf)), threshold)
+
+def bench(fn, frames, threshold, repeat=3):
+    """Best of ``repeat`` passes, in microseconds per frame."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for xyxy, cls, conf in frames:
+            fn(xyxy, cls, conf, threshold)
+        best = min(best, time.perf_counter() - start)
+    return best / len(frames) * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boxes", type=int, nargs="+", default=[4, 8, 12, 24, 48])
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--torch", action="store_true", help="Feed both sides torch tensors")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.torch:
+        import torch
+
+    print(f"{args.frames} frames per size, {'torch tensors' if args.torch else 'NumPy arrays'}")
+    print(f"{'boxes':>5}  {'python loop':>12}  {'find_contacts':>14}")
+    for n_boxes in args.boxes:
+        frames = [random_frame(rng, n_boxes) for _ in range(args.frames)]
+        for xyxy, cls, conf in frames[:200]:
+            expected = loop_contacts(xyxy, cls, conf, args.threshold)
+            got = [(c.attacker, c.conf) for c in find_contacts(xyxy, cls, conf, args.threshold)]
+            assert [a for a, _ in expected] == [a for a, _ in got], "contact order differs"
+        if args.torch:
+            frames = [tuple(torch.from_numpy(np.asarray(a)) for a in frame) for frame in frames]
+
+        loop_us = bench(loop_contacts, frames, args.threshold)
+        ours_us = bench(contacts_from_boxes if args.torch else find_contacts, frames, args.threshold)
+        print(f"{n_boxes:>5}  {loop_us:9.1f} us  {ours_us:11.1f} us  ({loop_us / ours_us:.1f}x)")
@@ -1,114 +1,302 @@
-from PyQt5.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker, Qt, pyqtSlot
-import cv2
-import numpy as np
-import datetime
-
-def list_cameras(max_devices=10):
-    available = []
-    backends = [
-        cv2.CAP_DSHOW,
-        cv2.CAP_MSMF,
-        cv2.CAP_ANY
-    ]
-
-    for i in range(max_devices):
-        for backend in backends:
-            try:
-                cap = cv2.VideoCapture(i, backend)
-                if cap.isOpened():
-                    ret, _ = cap.read()
-                    if ret:
-                        available.append(i)
-                        cap.release()
-                        break
-                    cap.release()
-            except:
-                continue
-
-    return available if available else [0]
-
-class CameraThread(QThread):
-    log_signal = pyqtSignal(bool, float, str)
-    frame_signal = pyqtSignal(np.ndarray)
-
-    def __init__(self, detector=None, camera_index=0, use_prediction=False, prediction_instance=None, camera_number=1):
-        super().__init__()
-        self.detector = detector
-        self.camera_index = camera_index
-        self.detection_enabled = False
-        self.running = False
-        self.use_prediction = use_prediction
-        self.prediction = prediction_instance
-        self.camera_number = camera_number
-        self.mutex = QMutex()
-        self.last_frame = None
-        self.fps = 0
-        self.frame_count = 0
-        self.last_time = datetime.datetime.now()
-
-    def run(self):
-        self.mutex.lock()
-        self.running = True
-        self.mutex.unlock()
-
-        backends = [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]
-        cap = None
-
-        for backend in backends:
-            try:
-                cap = cv2.VideoCapture(self.camera_index, backend)
-                if cap.isOpened():
-                    break
-            except:
-                continue
-
-        if not cap or not cap.isOpened():
-            print(f"Failed to open camera {self.camera_index}")
-            return
-
-        try:
-            while self.is_running():
-                ret, frame = cap.read()
-                if not ret:
-                    print("Failed to read frame")
-                    break
-
-                with QMutexLocker(self.mutex):
-                    self.last_frame = frame.copy()
-
-                self.frame_count += 1
-                now = datetime.datetime.now()
-                elapsed = (now - self.last_time).total_seconds()
-                if elapsed >= 1.0:  # Update FPS every second
-                    self.fps = self.frame_count / elapsed
-                    self.frame_count = 0
-                    self.last_time = now
-
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                if self.detection_enabled and self.use_prediction and self.prediction:
-                    try:
-                        processed_frame = self.prediction.process_frame(frame, self.camera_number)
-                        rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-                    except Exception as e:
-                        print(f"Prediction error: {e}")
-
-                self.frame_signal.emit(rgb_frame)
-        finally:
-            if cap:
-                cap.release()
-            print(f"Camera {self.camera_index} stopped")
-
-    def is_running(self):
-        with QMutexLocker(self.mutex):
-            return self.running
-
-    @pyqtSlot()
-    def stop(self):
-        with QMutexLocker(self.mutex):
-            self.running = False
-        self.wait(500)
-
-    def get_last_frame(self):
-        with QMutexLocker(self.mutex):
-            return self.last_frame.copy() if hasattr(self, 'last_frame') and self.last_frame is not None else None
+from PyQt5.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker, Qt, pyqtSlot
+import cv2
+import datetime
+import threading
+import time
+import glob
+import os
+import sys
+from collections import namedtuple
+from frame_source import FramePool, FrameSlot, open_source
+from overlay import fit_shape
+
+# What the worker hands to the GUI: an RGB image at display size, plus
+# overlay primitives when annotations are drawn by Qt instead of OpenCV
+DisplayFrame = namedtuple("DisplayFrame", "image overlay")
+
+# ---------------- Camera discovery ----------------
+def capture_backends():
+    """OpenCV capture backends worth trying on this platform, preferred first."""
+    if sys.platform.startswith("linux"):
+        return [cv2.CAP_V4L2, cv2.CAP_ANY]
+    if sys.platform == "darwin":
+        return [cv2.CAP_AVFOUNDATION, cv2.CAP_ANY]
+    return [cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY]
+
+class CameraDiscovery:
+    """Finds working camera indices, probing all devices at once.
+
+    On Linux only the /dev/video* nodes that exist are probed; elsewhere the
+    indices up to ``max_devices``. Each probe runs on its own thread and is
+    abandoned after ``timeout`` seconds. Working devices are remembered with
+    the backend that opened them, so a refresh re-checks them with that one
+    backend. Failed devices are skipped until their /dev node changes or, on
+    other platforms, for ``retry_after`` seconds.
+    """
+    def __init__(self, max_devices=10, timeout=3.0, retry_after=10.0):
+        self.max_devices = max_devices
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.good = {}   # index -> backend that delivered a frame
+        self.bad = {}    # index -> node ctime (Linux) or time of the failed probe
+        self.lock = threading.Lock()
+
+    def candidates(self):
+        """{index: node ctime} of devices to consider (ctime is None off Linux)."""
+        if sys.platform.startswith("linux"):
+            nodes = {}
+            for path in glob.glob("/dev/video*"):
+                suffix = path[len("/dev/video"):]
+                if suffix.isdigit():
+                    try:
+                        nodes[int(suffix)] = os.stat(path).st_ctime
+                    except OSError:
+                        continue
+            return nodes
+        return {index: None for index in range(self.max_devices)}
+
+    def preferred_backends(self, index):
+        backends = capture_backends()
+        with self.lock:
+            known = self.good.get(index)
+        if known is not None:
+            backends = [known] + [b for b in backends if b != known]
+        return backends
+
+    def probe(self, index, backends):
+        """Returns the first backend that opens ``index`` and reads a frame, or None."""
+        for backend in backends:
+            try:
+                cap = cv2.VideoCapture(index, backend)
+                try:
+                    if cap.isOpened() and cap.read()[0]:
+                        return backend
+                finally:
+                    cap.release()
+            except Exception:
+                continue
+        return None
+
+    def probe_all(self, jobs):
+        """Runs {index: backends} probes in parallel; indices that time out are left out."""
+        results = {}
+
+        def worker(index, backends):
+            results[index] = self.probe(index, backends)
+
+        threads = [threading.Thread(target=worker, args=job, daemon=True) for job in jobs.items()]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + self.timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        return dict(results)
+
+    def discover(self, in_use=(), force=False):
+        """Sorted indices of working cameras; ``in_use`` devices are open elsewhere and kept as is."""
+        now = time.monotonic()
+        candidates = self.candidates()
+        with self.lock:
+            if force:
+                self.good.clear()
+                self.bad.clear()
+            for cache in (self.good, self.bad):
+                for index in [i for i in cache if i not in candidates]:
+                    del cache[index]
+            jobs = {}
+            for index, ctime in candidates.items():
+                if index in in_use:
+                    continue
+                if index in self.good:
+                    jobs[index] = [self.good[index]]
+                elif index not in self.bad:
+                    jobs[index] = capture_backends()
+                elif ctime is not None and self.bad[index] != ctime:
+                    jobs[index] = capture_backends()
+                elif ctime is None and now - self.bad[index] >= self.retry_after:
+                    jobs[index] = capture_backends()
+
+        results = self.probe_all(jobs)
+
+        with self.lock:
+            for index in jobs:
+                if index not in results:
+                    # Timed out: not usable now, but not known to be bad either
+                    print(f"Camera {index} did not answer within {self.timeout:g}s")
+                    self.good.pop(index, None)
+                elif results[index] is None:
+                    self.good.pop(index, None)
+                    ctime = candidates[index]
+                    self.bad[index] = ctime if ctime is not None else now
+                else:
+                    self.good[index] = results[index]
+                    self.bad.pop(index, None)
+            return sorted(set(self.good) | (set(in_use) & set(candidates)))
+
+camera_discovery = CameraDiscovery()
+
+def list_cameras(max_devices=10, in_use=(), force=False):
+    camera_discovery.max_devices = max_devices
+    available = camera_discovery.discover(in_use=in_use, force=force)
+    return available if available else [0]
+
+class CameraDiscoveryThread(QThread):
+    """Runs list_cameras off the GUI thread and emits the result."""
+    cameras_found = pyqtSignal(list)
+
+    def __init__(self, in_use=(), force=False, parent=None):
+        super().__init__(parent)
+        self.in_use = set(in_use)
+        self.force = force
+
+    def run(self):
+        self.cameras_found.emit(list_cameras(in_use=self.in_use, force=self.force))
+
+class CameraThread(QThread):
+    log_signal = pyqtSignal(bool, float, str)
+    # Emits the sequence number of a new display frame; fetch it with take_display_frame()
+    frame_ready = pyqtSignal(int)
+    LATENCY_SMOOTHING = 0.1
+
+    def __init__(self, detector=None, camera_index=0, use_prediction=False, prediction_instance=None, camera_number=1):
+        super().__init__()
+        self.detector = detector
+        self.camera_index = camera_index
+        self.detection_enabled = False
+        self.running = False
+        self.use_prediction = use_prediction
+        self.prediction = prediction_instance
+        self.camera_number = camera_number
+        self.mutex = QMutex()
+        self.last_frame = None
+        self.fps = 0
+        self.frame_count = 0
+        self.last_time = datetime.datetime.now()
+        self.source = None
+        self.frame_seq = 0
+        self.latency_ms = 0.0
+        # Display frames are RGB, already scaled to display_size (w, h) set by the GUI
+        self.display_size = None
+        self.display_pool = FramePool()
+        self.display_slot = FrameSlot(on_drop=lambda item: self.display_pool.release(item.image))
+        # Leave boxes and banner to the widget's paintEvent instead of drawing them into the frame
+        self.qt_overlay = False
+
+    @property
+    def dropped_frames(self):
+        return self.source.dropped if self.source is not None else 0
+
+    # ---------------- Display ----------------
+    def display_shape(self, frame):
+        """Frame shape scaled down to fit display_size, keeping the aspect ratio."""
+        return fit_shape(frame.shape, self.display_size)
+
+    def to_display(self, frame):
+        """Scales and converts to RGB into a pooled buffer: one resize and one cvtColor per frame."""
+        buffer = self.display_pool.acquire(self.display_shape(frame))
+        if buffer.shape == frame.shape:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+        cv2.resize(frame, (buffer.shape[1], buffer.shape[0]), dst=buffer, interpolation=cv2.INTER_LINEAR)
+        return cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+
+    def take_display_frame(self):
+        """Newest display frame as (seq, rgb, overlay), or None if it was already taken.
+
+        Hand the array back with release_display_frame once it has been copied
+        into a QPixmap. ``overlay`` is None unless qt_overlay is set.
+        """
+        item = self.display_slot.take(timeout=0)
+        if item is None:
+            return None
+        seq, display, _ = item
+        return seq, display.image, display.overlay
+
+    def release_display_frame(self, frame):
+        self.display_pool.release(frame)
+
+    def open_source(self):
+        """Camera index, stream URL or video file path -> a started FrameSource, or None."""
+        backends = capture_backends()
+        if not isinstance(self.camera_index, str):
+            backends = camera_discovery.preferred_backends(self.camera_index)
+        try:
+            return open_source(self.camera_index, backends=backends).start()
+        except IOError as e:
+            print(e)
+            return None
+
+    def run(self):
+        self.mutex.lock()
+        self.running = True
+        self.mutex.unlock()
+
+        # Decoding runs on the source's own thread and never waits for inference
+        self.source = self.open_source()
+        if not self.source:
+            print(f"Failed to open camera {self.camera_index}")
+            return
+        source = self.source
+
+        try:
+            while self.is_running() and not source.closed:
+                item = source.read(timeout=0.5)
+                if item is None:
+                    continue
+                self.frame_seq, captured_at, frame = item
+                if not source.live:
+                    # File timestamps are positions in the video; latency is measured from now
+                    captured_at = time.monotonic()
+
+                # Capture buffers are recycled; the one shown last stays valid for get_last_frame
+                with QMutexLocker(self.mutex):
+                    previous, self.last_frame = self.last_frame, frame
+                source.release(previous)
+
+                self.frame_count += 1
+                now = datetime.datetime.now()
+                elapsed = (now - self.last_time).total_seconds()
+                if elapsed >= 1.0:  # Update FPS every second
+                    self.fps = self.frame_count / elapsed
+                    self.frame_count = 0
+                    self.last_time = now
+
+                shown, overlay = frame, None
+                if self.detection_enabled and self.use_prediction and self.prediction:
+                    try:
+                        # Annotations are drawn at display size, never at capture resolution
+                        shown = self.prediction.process_frame(
+                            frame, self.camera_number, self.frame_seq,
+                            render=not self.qt_overlay, display_size=self.display_size
+                        )
+                        if self.qt_overlay:
+                            scale = self.display_shape(frame)[1] / frame.shape[1]
+                            overlay = self.prediction.current_overlay(scale)
+                    except Exception as e:
+                        print(f"Prediction error: {e}")
+
+                # Capture-to-decision latency, smoothed so the overlay stays readable
+                latency = (time.monotonic() - captured_at) * 1000.0
+                self.latency_ms += (latency - self.latency_ms) * self.LATENCY_SMOOTHING
+
+                self.display_slot.put(DisplayFrame(self.to_display(shown), overlay), captured_at)
+                self.frame_ready.emit(self.frame_seq)
+        finally:
+            with QMutexLocker(self.mutex):
+                self.running = False
+                self.last_frame = None
+            source.close()
+            print(f"Camera {self.camera_index} stopped ({self.dropped_frames} stale frames dropped)")
+
+    def is_running(self):
+        with QMutexLocker(self.mutex):
+            return self.running
+
+    @pyqtSlot()
+    def stop(self):
+        with QMutexLocker(self.mutex):
+            self.running = False
+        self.wait(500)
+
+    def get_last_frame(self):
+        with QMutexLocker(self.mutex):
+            return self.last_frame.copy() if hasattr(self, 'last_frame') and self.last_frame is not None else None
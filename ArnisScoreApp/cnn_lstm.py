@@ -1,32 +1,181 @@
-import numpy as np
-import cv2
-import os
-
-class CNNLSTMModel:
-    def __init__(self, model_path=None, sequence_length=16, image_size=(128, 128)):
-        self.sequence_length = sequence_length
-        self.image_size = image_size
-        self.frame_sequence = []
-        print("CNN+LSTM model initialized")
-    
-    def preprocess_frame(self, frame):
-        frame = cv2.resize(frame, self.image_size)
-        return frame
-    
-    def add_frame(self, frame):
-        processed_frame = self.preprocess_frame(frame)
-        
-        if len(self.frame_sequence) >= self.sequence_length:
-            self.frame_sequence.pop(0)
-        
-        self.frame_sequence.append(processed_frame)
-    
-    def predict(self):
-        if len(self.frame_sequence) < self.sequence_length:
-            return "no_action", 0.0
-        
-        return "no_action", 0.0
-    
-    def reset_sequence(self):
-        """Reset the frame sequence"""
-        self.frame_sequence = []
\ No newline at end of file
+import numpy as np
+import cv2
+import os
+import threading
+
+# Sorted dataset folder names, the order the ConvLSTM was trained with
+CLASSES_LIST = [
+    "back", "back of the head", "chest & abdomen", "head & face", "hitting the groin",
+    "lower extremities", "side of the body", "throat", "upper extremities",
+]
+
+# Body part names as used by ScoringEngine.VALID_PARTS / INVALID_PARTS
+ACTION_BODY_PARTS = {
+    "back": "Back",
+    "back of the head": "Back of the Head",
+    "chest & abdomen": "Chest & Abdomen",
+    "head & face": "Head",
+    "hitting the groin": "Hitting the Groin",
+    "lower extremities": "Lower Extremities",
+    "side of the body": "Side of the Body",
+    "throat": "Throat",
+    "upper extremities": "Upper Extremities",
+}
+
+_models = {}
+_models_lock = threading.Lock()
+
+def load_convlstm(model_path):
+    """Loads each .h5 file once per process; TensorFlow is only imported here."""
+    with _models_lock:
+        model = _models.get(model_path)
+        if model is None:
+            from tensorflow.keras.models import load_model
+            model = load_model(model_path, compile=False)
+            _models[model_path] = model
+        return model
+
+class CNNLSTMModel:
+    def __init__(self, model_path=None, sequence_length=20, image_size=(224, 224),
+                 stride=4, min_confidence=0.8, streaming=False):
+        self.model = None
+        if model_path and os.path.exists(model_path):
+            try:
+                self.model = load_convlstm(model_path)
+                _, sequence_length, height, width, _ = self.model.input_shape
+                image_size = (width, height)
+            except Exception as e:
+                print(f"CNN+LSTM model could not be loaded: {e}")
+        self.sequence_length = sequence_length
+        self.image_size = image_size
+        # Streaming: classify each window once, back to back, so the ConvLSTM
+        # sees every frame once (one step per frame) instead of sequence_length / stride times
+        self.stride = sequence_length if streaming else stride
+        self.min_confidence = min_confidence
+        # When True an ActionBatcher runs predictions; predict() only reads them
+        self.batched = False
+
+        width, height = image_size
+        self.frames = np.zeros((sequence_length, height, width, 3), dtype=np.uint8)
+        self.lock = threading.Lock()
+        self.reset_sequence()
+        print("CNN+LSTM model initialized" if self.model is not None else "CNN+LSTM model unavailable")
+
+    def preprocess_frame(self, frame):
+        frame = cv2.resize(frame, self.image_size)
+        return frame
+
+    def add_frame(self, frame):
+        with self.lock:
+            slot = self.frames[self.frame_count % self.sequence_length]
+            cv2.resize(frame, self.image_size, dst=slot)
+            self.frame_count += 1
+            self.frames_since_predict += 1
+
+    def ready(self):
+        with self.lock:
+            if self.model is None:
+                return False
+            return (self.frame_count >= self.sequence_length
+                    and self.frames_since_predict >= self.stride)
+
+    def sequence(self):
+        """The buffered window, oldest frame first, as a new array."""
+        with self.lock:
+            start = self.frame_count % self.sequence_length
+            order = (np.arange(self.sequence_length) + start) % self.sequence_length
+            self.frames_since_predict = 0
+            return self.frames[order]
+
+    def set_prediction(self, probabilities):
+        index = int(np.argmax(probabilities))
+        confidence = float(probabilities[index])
+        action = CLASSES_LIST[index] if confidence >= self.min_confidence else "no_action"
+        with self.lock:
+            # Report a strike once, not on every stride while it stays on screen
+            if action != self.last_action:
+                self.pending = (action, confidence)
+            self.last_action, self.last_confidence = action, confidence
+
+    def predict(self):
+        """Returns a newly recognised action once, then ("no_action", 0.0) until the next one."""
+        if not self.batched and self.ready():
+            predict_batch([self])
+        with self.lock:
+            action, confidence = self.pending
+            self.pending = ("no_action", 0.0)
+        return action, confidence
+
+    def reset_sequence(self):
+        """Reset the frame sequence"""
+        with self.lock:
+            self._reset_locked()
+
+    def _reset_locked(self):
+        self.frame_count = 0
+        self.frames_since_predict = 0
+        self.last_action, self.last_confidence = "no_action", 0.0
+        self.pending = ("no_action", 0.0)
+
+def predict_batch(models):
+    """Runs every ready sequence through its ConvLSTM, one call per loaded model."""
+    groups = {}
+    for m in models:
+        if m is not None and m.ready():
+            groups.setdefault(id(m.model), []).append(m)
+
+    for members in groups.values():
+        batch = np.stack([m.sequence() for m in members]).astype(np.float32)
+        batch /= 255.0
+        probabilities = np.asarray(members[0].model(batch, training=False))
+        for m, p in zip(members, probabilities):
+            m.set_prediction(p)
+    return sum(len(m) for m in groups.values())
+
+class ActionBatcher:
+    """Background thread that batches the CNN-LSTM sequences of all active cameras."""
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.models = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def register(self, key, model):
+        if model is None:
+            return
+        model.batched = True
+        with self.lock:
+            self.models[key] = model
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="cnn-lstm-batcher", daemon=True)
+            self.thread.start()
+
+    def unregister(self, key):
+        with self.lock:
+            model = self.models.pop(key, None)
+        if model is not None:
+            model.batched = False
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        # Models left registered go back to running their own predictions
+        with self.lock:
+            models, self.models = list(self.models.values()), {}
+        for model in models:
+            model.batched = False
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            with self.lock:
+                models = list(self.models.values())
+            if not models:
+                continue
+            try:
+                predict_batch(models)
+            except Exception as e:
+                print(f"CNN+LSTM batch error: {e}")
@@ -1,89 +1,179 @@
-import os
-import sys
-import cv2
-from ultralytics import YOLO
-
-def get_model_path(model_name):
-    try:
-        base_path = sys._MEIPASS
-    except AttributeError:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-
-    return os.path.join(base_path, 'models', model_name)
-
-try:
-    from cnn_lstm import CNNLSTMModel
-    CNN_LSTM_AVAILABLE = True
-except ImportError as e:
-
-    CNN_LSTM_AVAILABLE = False
-    
-    class CNNLSTMModel:
-        def __init__(self, *args, **kwargs):
-            print("CNN+LSTM model")
-        
-        def add_frame(self, frame):
-            pass
-        
-        def predict(self):
-            return "no_action", 0.0
-        
-        def reset_sequence(self):
-            pass
-
-class ArnisStrikeDetector:
-    def __init__(self, min_conf=0.5, allowed_labels=None):
-        self.yolo_model = YOLO(get_model_path('object_detection.pt'))
-        self.convlstm_model_path = get_model_path('convlstm_v3.h5')
-        
-        if CNN_LSTM_AVAILABLE:
-            self.cnn_lstm = CNNLSTMModel(self.convlstm_model_path)
-        else:
-            self.cnn_lstm = None
-        
-        self.class_names = self.yolo_model.names if hasattr(self.yolo_model, 'names') else {}
-        self.min_conf = float(min_conf)
-        self.allowed_labels = set(allowed_labels) if allowed_labels else None
-        self.current_roi = None
-
-    def detect(self, frame, debug=False):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.yolo_model(rgb_frame)
-
-        best_label = None
-        best_conf = 0.0
-
-        for r in results:
-            for box in r.boxes:
-                cls = int(box.cls[0])
-                conf = float(box.conf[0])
-                label = self.class_names.get(cls, str(cls))
-
-                if self.allowed_labels is not None and label not in self.allowed_labels:
-                    continue
-
-                if conf > best_conf:
-                    best_conf = conf
-                    best_label = label
-
-        if best_label is None:
-            return rgb_frame, False, None, None
-
-        valid = best_conf >= self.min_conf
-        return rgb_frame, valid, best_conf, best_label
-    
-    def detect_action(self, frame, player_bbox):
-        if player_bbox is None or self.cnn_lstm is None:
-            return "no_action", 0.0
-        
-        x1, y1, x2, y2 = player_bbox
-        player_region = frame[int(y1):int(y2), int(x1):int(x2)]
-        
-        if player_region.size == 0:
-            return "no_action", 0.0
-        
-        self.cnn_lstm.add_frame(player_region)
-        
-        action, confidence = self.cnn_lstm.predict()
-        
-        return action, confidence
+import os
+import sys
+import cv2
+import numpy as np
+from threading import Lock
+from backends import load_model, resolve_backend
+
+def get_model_path(model_name):
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, 'models', model_name)
+
+# ---------------- Shared Model Registry ----------------
+class SharedModel:
+    """One loaded set of YOLO weights, shared by every camera.
+
+    Inference on an ultralytics model is not thread-safe, so calls are
+    serialised on a per-model lock.
+    """
+    def __init__(self, model_path, backend=None):
+        self.model_path = model_path
+        self.model, self.backend = load_model(model_path, backend)
+        self.names = self.model.names if hasattr(self.model, 'names') else {}
+        self.lock = Lock()
+
+    def __call__(self, source, **kwargs):
+        with self.lock:
+            return self.model(source, **kwargs)
+
+class ModelRegistry:
+    """Process-wide cache so each weight file is loaded exactly once per backend."""
+    _models = {}
+    _lock = Lock()
+
+    @classmethod
+    def get(cls, model_name='object_detection.pt', backend=None):
+        model_path = get_model_path(model_name)
+        key = (model_path, resolve_backend(backend))
+        with cls._lock:
+            model = cls._models.get(key)
+            if model is None:
+                model = SharedModel(model_path, key[1])
+                cls._models[key] = model
+            return model
+
+    @classmethod
+    def loaded(cls):
+        with cls._lock:
+            return list(cls._models)
+
+def get_yolo_model(model_name='object_detection.pt', backend=None):
+    return ModelRegistry.get(model_name, backend)
+
+try:
+    from cnn_lstm import CNNLSTMModel
+    CNN_LSTM_AVAILABLE = True
+except ImportError as e:
+
+    CNN_LSTM_AVAILABLE = False
+    
+    class CNNLSTMModel:
+        def __init__(self, *args, **kwargs):
+            print("CNN+LSTM model")
+        
+        def add_frame(self, frame):
+            pass
+        
+        def predict(self):
+            return "no_action", 0.0
+        
+        def reset_sequence(self):
+            pass
+
+class ArnisStrikeDetector:
+    ROI_MARGIN = 0.25          # padding around the fighters, as a fraction of their extent
+    ROI_MIN_SIZE = 160         # never crop tighter than this many pixels per side
+    ROI_MAX_COVERAGE = 0.8     # a crop this close to the full frame is not worth it
+    PLAYER_CLASSES = (0, 2)
+
+    def __init__(self, min_conf=0.5, allowed_labels=None, yolo_model=None,
+                 roi_mode=False, full_frame_interval=15, cnn_lstm_streaming=False):
+        self.yolo_model = yolo_model or get_yolo_model('object_detection.pt')
+        self.convlstm_model_path = get_model_path('convlstm_v3.h5')
+        
+        if CNN_LSTM_AVAILABLE:
+            self.cnn_lstm = CNNLSTMModel(self.convlstm_model_path, streaming=cnn_lstm_streaming)
+        else:
+            self.cnn_lstm = None
+        
+        self.class_names = self.yolo_model.names if hasattr(self.yolo_model, 'names') else {}
+        self.min_conf = float(min_conf)
+        self.allowed_labels = set(allowed_labels) if allowed_labels else None
+        self.current_roi = None
+        self.roi_mode = roi_mode
+        self.full_frame_interval = int(full_frame_interval)
+        self.frames_since_full = 0
+
+    # ---------------- Region of interest ----------------
+    def select_region(self, frame):
+        """Returns (image, (x0, y0)) to run the detector on.
+
+        In ROI mode this is a crop around both fighters from the last
+        detections; a full-frame pass is forced every ``full_frame_interval``
+        frames and whenever tracking has been lost.
+        """
+        if (not self.roi_mode or self.current_roi is None
+                or self.frames_since_full >= self.full_frame_interval):
+            self.frames_since_full = 0
+            return frame, (0, 0)
+
+        self.frames_since_full += 1
+        x1, y1, x2, y2 = self.current_roi
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def update_roi(self, xyxy, cls, frame_shape, min_players=2):
+        """Fits ``current_roi`` around the players and their sticks (frame coordinates)."""
+        if not self.roi_mode:
+            return
+        if np.isin(cls, self.PLAYER_CLASSES).sum() < min_players:
+            # Lost a fighter: fall back to the full frame on the next pass
+            self.current_roi = None
+            return
+
+        h, w = frame_shape[:2]
+        x1, y1 = xyxy[:, 0].min(), xyxy[:, 1].min()
+        x2, y2 = xyxy[:, 2].max(), xyxy[:, 3].max()
+        pad_x = max((x2 - x1) * self.ROI_MARGIN, (self.ROI_MIN_SIZE - (x2 - x1)) / 2, 0)
+        pad_y = max((y2 - y1) * self.ROI_MARGIN, (self.ROI_MIN_SIZE - (y2 - y1)) / 2, 0)
+        roi = (
+            int(max(0, x1 - pad_x)), int(max(0, y1 - pad_y)),
+            int(min(w, x2 + pad_x)), int(min(h, y2 + pad_y)),
+        )
+        area = (roi[2] - roi[0]) * (roi[3] - roi[1])
+        self.current_roi = roi if area < self.ROI_MAX_COVERAGE * w * h else None
+
+    def detect(self, frame, debug=False):
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.yolo_model(rgb_frame)
+
+        best_label = None
+        best_conf = 0.0
+
+        for r in results:
+            for box in r.boxes:
+                cls = int(box.cls[0])
+                conf = float(box.conf[0])
+                label = self.class_names.get(cls, str(cls))
+
+                if self.allowed_labels is not None and label not in self.allowed_labels:
+                    continue
+
+                if conf > best_conf:
+                    best_conf = conf
+                    best_label = label
+
+        if best_label is None:
+            return rgb_frame, False, None, None
+
+        valid = best_conf >= self.min_conf
+        return rgb_frame, valid, best_conf, best_label
+    
+    def detect_action(self, frame, player_bbox):
+        if player_bbox is None or self.cnn_lstm is None:
+            return "no_action", 0.0
+        
+        x1, y1, x2, y2 = player_bbox
+        player_region = frame[int(y1):int(y2), int(x1):int(x2)]
+        
+        if player_region.size == 0:
+            return "no_action", 0.0
+        
+        self.cnn_lstm.add_frame(player_region)
+        
+        action, confidence = self.cnn_lstm.predict()
+        
+        return action, confidence
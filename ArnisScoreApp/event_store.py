@@ -0,0 +1,297 @@
+"""Persistent, append-only store of scored hits, one SQLite database for every match.
+
+    python event_store.py                          # list matches
+    python event_store.py --match 12 --camera 1    # hits of one match and camera
+    python event_store.py --scorer Red --since "2026-10-18 09:00" --until "2026-10-18 12:00"
+    python event_store.py --since 2026-01-01 --parquet season.parquet
+
+The database runs in WAL mode and is written by a single background thread:
+``record`` only queues the event, so camera and GUI threads never wait on
+disk. Queued events are committed in batches, at most ``flush_interval``
+seconds after they were recorded. Each event carries the running score of
+its camera, so the score of an interrupted match is rebuilt from the last
+event per camera.
+"""
+import os
+import time
+import queue
+import sqlite3
+import datetime
+import argparse
+import threading
+from contextlib import contextmanager
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), "ArniScore", "match_events.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    camera INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    valid INTEGER NOT NULL,
+    confidence REAL,
+    scored_by TEXT,
+    body_part TEXT,
+    blue_score INTEGER NOT NULL,
+    red_score INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_match_camera ON events(match_id, camera, id);
+CREATE INDEX IF NOT EXISTS events_camera_time ON events(camera, timestamp);
+CREATE INDEX IF NOT EXISTS events_scorer_time ON events(scored_by, timestamp);
+"""
+
+EVENT_COLUMNS = [
+    "id", "match_id", "camera", "timestamp", "valid", "confidence",
+    "scored_by", "body_part", "blue_score", "red_score",
+]
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL with synchronous=NORMAL survives an application crash; only an OS
+    # crash or power cut can lose the last committed batch
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+@contextmanager
+def connection(path):
+    """A short-lived connection for one transaction or query."""
+    conn = connect(path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+class EventStore:
+    """Writes hit events on a background thread and answers queries about past matches.
+
+    A match starts with the first ``record`` (or explicitly with
+    ``start_match``, or is resumed by ``recover``) and is closed with
+    ``end_match``; events recorded in between belong to it.
+    """
+    def __init__(self, path=DEFAULT_PATH, batch_size=256, flush_interval=0.5):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        # Camera threads record while the GUI thread starts and ends matches
+        self.match_lock = threading.Lock()
+        self.match_id = None
+        self.dropped = 0
+        with connection(path) as conn:
+            conn.executescript(SCHEMA)
+            # Match ids are handed out here so start_match need not wait for the writer
+            self.next_match_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM matches").fetchone()[0]
+        self.thread = threading.Thread(target=self.write_loop, name="event-store", daemon=True)
+        self.thread.start()
+
+    # ---------------- Writing ----------------
+    def start_match(self, started=None):
+        with self.match_lock:
+            return self._start_match_locked(started)
+
+    def _start_match_locked(self, started=None):
+        self.match_id = self.next_match_id
+        self.next_match_id += 1
+        self.queue.put(("match", (self.match_id, started or time.time())))
+        return self.match_id
+
+    def end_match(self, ended=None):
+        with self.match_lock:
+            if self.match_id is not None:
+                self.queue.put(("end", (ended or time.time(), self.match_id)))
+                self.match_id = None
+
+    def record(self, camera, valid, confidence, scored_by, body_part, scores, timestamp=None):
+        """Queues one hit; ``scores`` is the camera's running {"Blue": n, "Red": n} after it."""
+        event = (
+            int(camera), timestamp or time.time(), int(bool(valid)),
+            float(confidence), scored_by, body_part, int(scores["Blue"]), int(scores["Red"]),
+        )
+        # Queued under the lock, so an end_match queued after it cannot overtake it
+        with self.match_lock:
+            match_id = self.match_id
+            if match_id is None:
+                match_id = self._start_match_locked()
+            self.queue.put(("event", (match_id,) + event))
+
+    def flush(self, timeout=5.0):
+        """Blocks until everything queued so far is committed (for shutdown and tests)."""
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self):
+        self.end_match()
+        self.queue.put(("stop", None))
+        self.thread.join(timeout=5.0)
+
+    def write_loop(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            item = self.queue.get()
+            batch = [item]
+            # Keep collecting until the batch is full or flush_interval has passed
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] == "event":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Control items are answered whether or not the writes below succeed
+            waiters = [payload for kind, payload in batch if kind == "flush"]
+            if any(kind == "stop" for kind, _ in batch):
+                running = False
+            try:
+                with conn:
+                    for kind, payload in batch:
+                        if kind == "event":
+                            conn.execute(
+                                "INSERT INTO events (match_id, camera, timestamp, valid, confidence, "
+                                "scored_by, body_part, blue_score, red_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                payload,
+                            )
+                        elif kind == "match":
+                            conn.execute("INSERT OR IGNORE INTO matches (id, started) VALUES (?, ?)", payload)
+                        elif kind == "end":
+                            conn.execute("UPDATE matches SET ended = ? WHERE id = ?", payload)
+            except sqlite3.Error as e:
+                self.dropped += sum(kind == "event" for kind, _ in batch)
+                print(f"Event store write failed: {e}")
+            for done in waiters:
+                done.set()
+        conn.close()
+
+    # ---------------- Recovery ----------------
+    def recover(self):
+        """Resumes the last match if it never ended (the app crashed or was killed).
+
+        Returns {camera: {"Blue": n, "Red": n}} for the resumed match, or None
+        when there was nothing to resume; the next ``record`` then starts a new one.
+        """
+        with connection(self.path) as conn:
+            row = conn.execute("SELECT id, ended FROM matches ORDER BY id DESC LIMIT 1").fetchone()
+            if row is None or row[1] is not None:
+                return None
+            match_id = row[0]
+            scores = {
+                camera: {"Blue": blue, "Red": red}
+                for camera, blue, red in conn.execute(
+                    "SELECT camera, blue_score, red_score FROM events WHERE id IN "
+                    "(SELECT MAX(id) FROM events WHERE match_id = ? GROUP BY camera)",
+                    (match_id,),
+                )
+            }
+        with self.match_lock:
+            self.match_id = match_id
+        return scores
+
+    # ---------------- Queries ----------------
+    def matches(self, limit=50):
+        """[(id, started, ended, hit_count)], newest first."""
+        with connection(self.path) as conn:
+            return conn.execute(
+                "SELECT m.id, m.started, m.ended, COUNT(e.id) FROM matches m "
+                "LEFT JOIN events e ON e.match_id = m.id GROUP BY m.id ORDER BY m.id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    @staticmethod
+    def where(match_id=None, camera=None, since=None, until=None, scored_by=None, valid=None):
+        clauses, params = [], []
+        for column, op, value in (
+            ("match_id", "=", match_id), ("camera", "=", camera), ("timestamp", ">=", since),
+            ("timestamp", "<", until), ("scored_by", "=", scored_by),
+            ("valid", "=", None if valid is None else int(bool(valid))),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, limit=None, **filters):
+        """Events matching every given filter, oldest first, as dicts. Times are epoch seconds.
+
+        Filters: match_id, camera, since, until, scored_by, valid.
+        """
+        where, params = self.where(**filters)
+        sql = f"SELECT {', '.join(EVENT_COLUMNS)} FROM events{where} ORDER BY id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with connection(self.path) as conn:
+            return [dict(zip(EVENT_COLUMNS, row)) for row in conn.execute(sql, params)]
+
+    def iter_query(self, chunk_size=10000, **filters):
+        """Like ``query`` but yields lists of row tuples (EVENT_COLUMNS order), for large exports."""
+        where, params = self.where(**filters)
+        with connection(self.path) as conn:
+            cursor = conn.execute(f"SELECT {', '.join(EVENT_COLUMNS)} FROM events{where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+
+    def count(self, **filters):
+        where, params = self.where(**filters)
+        with connection(self.path) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+def parse_time(text):
+    return datetime.datetime.fromisoformat(text).timestamp() if text else None
+
+def format_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--match", type=int)
+    parser.add_argument("--camera", type=int)
+    parser.add_argument("--scorer", choices=["Blue", "Red"])
+    parser.add_argument("--since", help="ISO date/time, e.g. 2026-10-18 or '2026-10-18 09:30'")
+    parser.add_argument("--until", help="ISO date/time (exclusive)")
+    parser.add_argument("--valid-only", action="store_true")
+    parser.add_argument("--parquet", metavar="PATH", help="Write the selected events to a Parquet file (needs pyarrow)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"{args.db} does not exist")
+    store = EventStore(args.db)
+    filters = dict(
+        match_id=args.match, camera=args.camera, scored_by=args.scorer,
+        since=parse_time(args.since), until=parse_time(args.until),
+        valid=True if args.valid_only else None,
+    )
+    try:
+        if args.parquet:
+            from utils import write_events_parquet
+            write_events_parquet(args.parquet, store, **filters)
+            print(f"Wrote {store.count(**filters)} events to {args.parquet}")
+        elif not any((args.match, args.camera, args.scorer, args.since, args.until, args.valid_only)):
+            for match_id, started, ended, hits in store.matches():
+                print(f"Match {match_id}: {format_time(started)} - {format_time(ended)}, {hits} hits")
+        else:
+            events = store.query(**filters)
+            for event in events:
+                print(f"{format_time(event['timestamp'])}  match {event['match_id']}  camera {event['camera']}  "
+                      f"{event['scored_by']:<4} {event['body_part']:<20} "
+                      f"{'valid' if event['valid'] else 'invalid':<7} {event['confidence']:.1f}  "
+                      f"Blue {event['blue_score']} - {event['red_score']} Red")
+    finally:
+        store.queue.put(("stop", None))
+        store.thread.join(timeout=5.0)
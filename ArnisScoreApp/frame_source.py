@@ -0,0 +1,610 @@
+import os
+import time
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+class FramePool:
+    """Recycles frame buffers of one shape instead of allocating an array per frame.
+
+    ``acquire`` hands out a free buffer, allocating only when none is free;
+    ``release`` gives it back. Buffers of another shape are dropped on
+    release, so a resolution change simply drains the old ones.
+    """
+    MAX_FREE = 8
+
+    def __init__(self, shape=None, dtype=np.uint8):
+        self.shape = tuple(shape) if shape else None
+        self.dtype = dtype
+        self.free = []
+        self.allocated = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, shape=None):
+        shape = tuple(shape) if shape else self.shape
+        with self.lock:
+            if shape != self.shape:
+                self.shape = shape
+                self.free.clear()
+            if self.free:
+                return self.free.pop()
+            self.allocated += 1
+        return np.empty(shape, self.dtype)
+
+    def release(self, buffer):
+        if buffer is None:
+            return
+        with self.lock:
+            if buffer.shape == self.shape and len(self.free) < self.MAX_FREE:
+                self.free.append(buffer)
+
+class FrameSlot:
+    """Single-slot buffer between capture and inference: only the newest frame is kept.
+
+    A frame that is overwritten before the consumer took it is counted as
+    dropped and handed to ``on_drop`` (e.g. ``FramePool.release``).
+    """
+    def __init__(self, on_drop=None):
+        self.on_drop = on_drop
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame, timestamp):
+        with self._cond:
+            stale = self._frame
+            if stale is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._timestamp = timestamp
+            self._seq += 1
+            self._cond.notify()
+        if stale is not None and self.on_drop:
+            self.on_drop(stale)
+
+    def take(self, timeout=None):
+        """Returns (seq, frame, capture_time) or None on timeout/close."""
+        with self._cond:
+            if self._frame is None and not self._closed:
+                self._cond.wait(timeout)
+            if self._frame is None:
+                return None
+            frame, self._frame = self._frame, None
+            return self._seq, frame, self._timestamp
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        with self._cond:
+            return self._closed and self._frame is None
+
+# ---------------- Frame sources ----------------
+class FrameSource:
+    """Common interface of camera and video-file sources.
+
+    ``read(timeout)`` returns (frame_index, timestamp_s, frame), or None on
+    timeout or once the source is finished; ``closed`` tells the two apart.
+    Sources decode on their own thread, are iterable and work as context
+    managers (``with VideoFileSource(path) as source: for item in source``).
+    """
+    live = False
+    fps = 30.0
+    frame_count = 0
+    dropped = 0
+
+    def start(self):
+        return self
+
+    def read(self, timeout=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def release(self, frame):
+        """Hands a frame from read() back once the consumer is done with it (optional)."""
+
+    @property
+    def closed(self):
+        return False
+
+    def __iter__(self):
+        while True:
+            item = self.read()
+            if item is None:
+                if self.closed:
+                    return
+                continue
+            yield item
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _resize(frame, size):
+    if size is None or (frame.shape[1], frame.shape[0]) == tuple(size):
+        return frame
+    return cv2.resize(frame, tuple(size), interpolation=cv2.INTER_AREA)
+
+# OpenCV has no per-capture way to pass FFmpeg demuxer options; it reads them from
+# OPENCV_FFMPEG_CAPTURE_OPTIONS in the process environment whenever an FFmpeg capture
+# opens. NetworkStreamSource sets that variable only while holding this lock, and every
+# other FFmpeg open (video files) takes it too, so none picks up a stream's options.
+# Device captures (camera indices) use their own backends and never read the variable.
+_ffmpeg_open_lock = threading.Lock()
+
+def open_file_capture(path):
+    """cv2.VideoCapture for a video file, safe to call while streams are being opened."""
+    with _ffmpeg_open_lock:
+        return cv2.VideoCapture(path)
+
+class CameraSource(FrameSource):
+    """A capture device read on a background thread; only the newest frame is handed out.
+
+    Frames are decoded straight into pooled buffers. Consumers that call
+    ``release`` when done get them recycled, so steady-state capture
+    allocates nothing; frames never released are simply garbage collected.
+    """
+    live = True
+
+    def __init__(self, index=0, backends=(cv2.CAP_ANY,), resize=None):
+        self.index = index
+        self.backends = list(backends)
+        self.resize = resize
+        self.pool = FramePool()
+        self.slot = FrameSlot(on_drop=self.pool.release)
+        self.cap = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def open(self):
+        for backend in self.backends:
+            try:
+                cap = cv2.VideoCapture(self.index, backend)
+                if cap.isOpened():
+                    # Keep the driver queue short; the frame slot already drops stale frames
+                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                    return cap
+                cap.release()
+            except Exception:
+                continue
+        return None
+
+    def start(self):
+        if self.thread is None:
+            self.cap = self.open()
+            if self.cap is None:
+                raise IOError(f"Failed to open camera {self.index}")
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+            self.thread = threading.Thread(target=self.grab_loop, name=f"camera-{self.index}", daemon=True)
+            self.thread.start()
+        return self
+
+    def grab_loop(self):
+        try:
+            while not self.stopped.is_set():
+                buffer = self.pool.acquire() if self.pool.shape else None
+                ret, frame = self.cap.read(buffer)
+                if not ret:
+                    print("Failed to read frame")
+                    break
+                if frame is not buffer:
+                    # First frame, or the driver changed resolution
+                    self.pool.shape = frame.shape
+                if self.resize is not None:
+                    resized = _resize(frame, self.resize)
+                    if resized is not frame:
+                        self.pool.release(frame)
+                        frame = resized
+                self.slot.put(frame, time.monotonic())
+        finally:
+            self.slot.close()
+
+    def read(self, timeout=None):
+        item = self.slot.take(timeout)
+        if item is None:
+            return None
+        seq, frame, captured_at = item
+        return seq, captured_at, frame
+
+    def release(self, frame):
+        self.pool.release(frame)
+
+    @property
+    def dropped(self):
+        return self.slot.dropped
+
+    @property
+    def closed(self):
+        return self.slot.closed
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        if self.cap is not None:
+            self.cap.release()
+        self.slot.close()
+
+STREAM_SCHEMES = ("rtsp://", "rtsps://", "rtp://", "udp://", "tcp://", "srt://", "http://", "https://")
+
+def is_stream_url(spec):
+    return isinstance(spec, str) and spec.lower().startswith(STREAM_SCHEMES)
+
+class NetworkStreamSource(FrameSource):
+    """An IP camera or network stream (RTSP, HTTP-MJPEG, UDP) read on a background thread.
+
+    FFmpeg is opened with its input buffering turned off, and the grab thread
+    reads as fast as frames arrive, keeping only the newest, so no backlog
+    builds up in the demuxer. A stream that fails to open or stops delivering
+    is reopened with exponential backoff until the source is closed.
+
+    ``stats()`` reports live stream health. ``delay_ms`` is how much later the
+    latest frame arrived than its presentation time allows, compared with the
+    fastest frame seen (network and buffering delay). ``jitter_ms`` is the
+    RFC 3550 interarrival jitter and ``age_ms`` how long the frame waited for
+    the consumer. HTTP-MJPEG carries no timestamps (FFmpeg makes up 25 fps
+    ones), so there ``delay_ms`` is None and jitter is measured against the
+    average frame interval instead.
+    """
+    live = True
+    RECONNECT_MIN = 0.5
+    RECONNECT_MAX = 10.0
+    # Applied through OPENCV_FFMPEG_CAPTURE_OPTIONS (see _ffmpeg_open_lock); the timeouts,
+    # which OpenCV does take per capture, are passed to VideoCapture instead
+    FFMPEG_OPTIONS = {
+        "fflags": "nobuffer",
+        "flags": "low_delay",
+        "max_delay": "0",
+        "reorder_queue_size": "0",
+        "probesize": "32768",
+        "analyzeduration": "0",
+    }
+
+    def __init__(self, url, resize=None, transport="tcp", open_timeout=5.0, read_timeout=5.0):
+        self.url = url
+        self.scheme = url.split("://", 1)[0].lower()
+        # RTSP/RTP/UDP/SRT streams carry sender timestamps; HTTP-MJPEG does not
+        self.timestamped = self.scheme not in ("http", "https")
+        self.resize = resize
+        self.transport = transport
+        self.open_timeout = open_timeout
+        self.read_timeout = read_timeout
+        self.pool = FramePool()
+        self.slot = FrameSlot(on_drop=self.pool.release)
+        self.cap = None
+        self.thread = None
+        self.stopped = threading.Event()
+        self.status = "connecting"
+        self.reconnects = 0
+        self.frames = 0
+        # Latency and jitter state, written by the grab thread only
+        self.min_offset = None
+        self.delay_ms = None
+        self.jitter_ms = 0.0
+        self.mean_interval = None
+        self.age_ms = 0.0
+        self.measured_fps = 0.0
+        self.last_arrival = None
+        self.last_pts = None
+
+    def ffmpeg_options(self):
+        options = dict(self.FFMPEG_OPTIONS)
+        if self.scheme in ("rtsp", "rtsps"):
+            options["rtsp_transport"] = self.transport
+        elif self.scheme in ("udp", "rtp"):
+            # Lost packets must not end the stream; a smaller FIFO keeps it current
+            options["overrun_nonfatal"] = "1"
+            options["fifo_size"] = "50000"
+        return "|".join(f"{key};{value}" for key, value in options.items())
+
+    def open(self):
+        params = [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(self.open_timeout * 1000),
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(self.read_timeout * 1000),
+        ]
+        # Held for the whole open, up to open_timeout, so file opens may wait that long
+        with _ffmpeg_open_lock:
+            previous = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = self.ffmpeg_options()
+            try:
+                cap = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG, params)
+            finally:
+                if previous is None:
+                    os.environ.pop("OPENCV_FFMPEG_CAPTURE_OPTIONS", None)
+                else:
+                    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = previous
+        if not cap.isOpened():
+            cap.release()
+            return None
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.grab_loop, name="stream-grab", daemon=True)
+            self.thread.start()
+        return self
+
+    # ---------------- Grab thread ----------------
+    def grab_loop(self):
+        backoff = self.RECONNECT_MIN
+        try:
+            while not self.stopped.is_set():
+                self.cap = self.open()
+                if self.cap is None:
+                    print(f"Stream {self.url} unavailable, retrying in {backoff:g}s")
+                    self.status = "reconnecting"
+                    self.stopped.wait(backoff)
+                    backoff = min(backoff * 2, self.RECONNECT_MAX)
+                    continue
+                self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+                self.status = "live"
+                self.last_arrival = self.last_pts = self.min_offset = self.mean_interval = None
+                if self.read_frames():
+                    # It delivered frames, so the next outage starts from a short wait again
+                    backoff = self.RECONNECT_MIN
+                self.cap.release()
+                self.cap = None
+                if not self.stopped.is_set():
+                    self.reconnects += 1
+                    self.status = "reconnecting"
+                    print(f"Stream {self.url} lost, reconnecting in {backoff:g}s")
+                    self.stopped.wait(backoff)
+                    backoff = min(backoff * 2, self.RECONNECT_MAX)
+        finally:
+            self.status = "closed"
+            self.slot.close()
+
+    def read_frames(self):
+        """Reads until the stream fails or the source closes; returns whether any frame arrived."""
+        received = False
+        window_start, window_frames = time.monotonic(), 0
+        while not self.stopped.is_set():
+            buffer = self.pool.acquire() if self.pool.shape else None
+            ret, frame = self.cap.read(buffer)
+            if not ret:
+                self.pool.release(buffer)
+                return received
+            arrival = time.monotonic()
+            received = True
+            if frame is not buffer:
+                self.pool.shape = frame.shape
+            self.measure(arrival, self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+            window_frames += 1
+            if arrival - window_start >= 1.0:
+                self.measured_fps = window_frames / (arrival - window_start)
+                window_start, window_frames = arrival, 0
+            if self.resize is not None:
+                resized = _resize(frame, self.resize)
+                if resized is not frame:
+                    self.pool.release(frame)
+                    frame = resized
+            self.frames += 1
+            self.slot.put(frame, arrival)
+        return received
+
+    def measure(self, arrival, pts):
+        """Updates delay and jitter from a frame's arrival time and presentation time (seconds)."""
+        if self.last_arrival is not None:
+            interval = arrival - self.last_arrival
+            if self.timestamped:
+                expected = pts - self.last_pts
+            else:
+                if self.mean_interval is None:
+                    self.mean_interval = interval
+                self.mean_interval += (interval - self.mean_interval) / 16.0
+                expected = self.mean_interval
+            self.jitter_ms += (abs(interval - expected) * 1000.0 - self.jitter_ms) / 16.0
+        if self.timestamped:
+            offset = arrival - pts
+            if self.min_offset is None or offset < self.min_offset:
+                self.min_offset = offset
+            self.delay_ms = (offset - self.min_offset) * 1000.0
+        self.last_arrival, self.last_pts = arrival, pts
+
+    # ---------------- Consumer ----------------
+    def read(self, timeout=None):
+        item = self.slot.take(timeout)
+        if item is None:
+            return None
+        seq, frame, arrival = item
+        self.age_ms = (time.monotonic() - arrival) * 1000.0
+        return seq, arrival, frame
+
+    def release(self, frame):
+        self.pool.release(frame)
+
+    def stats(self):
+        return {
+            "status": self.status, "fps": round(self.measured_fps, 1),
+            "delay_ms": None if self.delay_ms is None else round(self.delay_ms, 1),
+            "jitter_ms": round(self.jitter_ms, 1), "age_ms": round(self.age_ms, 1),
+            "frames": self.frames, "dropped": self.dropped, "reconnects": self.reconnects,
+        }
+
+    @property
+    def dropped(self):
+        return self.slot.dropped
+
+    @property
+    def closed(self):
+        return self.slot.closed
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.read_timeout + 1.0)
+        self.slot.close()
+
+class VideoFileSource(FrameSource):
+    """Decodes a video file on a background thread into a bounded prefetch queue.
+
+    The decoder runs up to ``prefetch`` frames ahead, so decoding overlaps
+    with whatever the consumer does with each frame. Frames come out in
+    order with their index and timestamp in the file. ``resize`` scales
+    frames on the decode thread. With ``realtime`` the file plays at its own
+    frame rate and a consumer that falls behind skips frames, as with a camera.
+    """
+    # Forward seeks shorter than this are decoded through; longer ones and
+    # backward seeks jump via the container index to the preceding keyframe.
+    SEEK_DECODE_LIMIT = 48
+    _END = object()
+
+    def __init__(self, path, prefetch=8, resize=None, start=0, end=None, realtime=False):
+        if not os.path.exists(path):
+            raise IOError(f"Video {path} not found")
+        self.path = path
+        self.resize = resize
+        self.end = end
+        self.realtime = realtime
+        self.queue = queue.Queue(maxsize=max(1, prefetch))
+        self.cap = open_file_capture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.position = 0          # index of the next frame the decoder reads
+        self.lock = threading.Lock()
+        self.generation = 0        # bumped by seek(); older queued frames are discarded
+        self.pending_seek = start or None
+        self.stopped = threading.Event()
+        self.finished = False
+        self.thread = None
+        self.clock = None          # (index, monotonic) anchor for realtime pacing
+        self.dropped = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.decode_loop, name="video-decode", daemon=True)
+            self.thread.start()
+        return self
+
+    # ---------------- Decode thread ----------------
+    def _apply_seek(self, target):
+        distance = target - self.position
+        if 0 <= distance <= self.SEEK_DECODE_LIMIT:
+            # grab() decodes without converting, cheaper than reading the frames
+            for _ in range(distance):
+                if not self.cap.grab():
+                    break
+                self.position += 1
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            self.position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def _put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                with self.lock:
+                    if self.pending_seek is not None:
+                        return False
+        return False
+
+    def decode_loop(self):
+        while not self.stopped.is_set():
+            with self.lock:
+                target, self.pending_seek = self.pending_seek, None
+                generation = self.generation
+            if target is not None:
+                self._apply_seek(target)
+
+            if self.end is not None and self.position >= self.end:
+                ret = False
+            else:
+                ret, frame = self.cap.read()
+            if not ret:
+                self._put((generation, self._END))
+                # Idle until a seek asks for more or the source is closed
+                while not self.stopped.is_set():
+                    with self.lock:
+                        if self.pending_seek is not None:
+                            break
+                    time.sleep(0.05)
+                continue
+
+            index = self.position
+            self.position += 1
+            self._put((generation, (index, index / self.fps, _resize(frame, self.resize))))
+
+    # ---------------- Consumer ----------------
+    def seek(self, frame_index):
+        """Repositions the stream; the next read() returns ``frame_index`` (or the nearest frame)."""
+        with self.lock:
+            self.pending_seek = max(0, int(frame_index))
+            self.generation += 1
+            self.finished = False
+            self.clock = None
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.finished:
+                return None
+            try:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                generation, item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            with self.lock:
+                if generation != self.generation:
+                    continue
+            if item is self._END:
+                self.finished = True
+                return None
+            if self.realtime and not self._pace(item[0]):
+                continue
+            return item
+
+    def _pace(self, index):
+        """Sleeps until ``index`` is due; returns False if it is already a frame late."""
+        now = time.monotonic()
+        if self.clock is None:
+            self.clock = (index, now)
+        due = self.clock[1] + (index - self.clock[0]) / self.fps
+        if now - due > 1.0 / self.fps:
+            self.dropped += 1
+            return False
+        if due > now:
+            time.sleep(due - now)
+        return True
+
+    @property
+    def closed(self):
+        return self.finished or self.stopped.is_set()
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
+
+def open_source(spec, backends=(cv2.CAP_ANY,), resize=None, realtime=True):
+    """A camera index, stream URL or video file path -> the matching FrameSource (not yet started).
+
+    Files play in real time by default, so they can stand in for a camera.
+    """
+    if is_stream_url(spec):
+        return NetworkStreamSource(spec, resize=resize)
+    if isinstance(spec, str) and not spec.isdigit():
+        return VideoFileSource(spec, resize=resize, realtime=realtime)
+    return CameraSource(int(spec), backends=backends, resize=resize)
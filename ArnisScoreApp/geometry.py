@@ -0,0 +1,151 @@
+from collections import namedtuple
+
+import numpy as np
+
+BLUE_PLAYER, BLUE_STICK, RED_PLAYER, RED_STICK = 0, 1, 2, 3
+
+# Vertical split of a player box used to name the body region a stick lands on
+HEAD_LIMIT, BODY_LIMIT, LEGS_LIMIT = 0.30, 0.70, 0.90
+BODY_REGIONS = np.array(["Head", "Body", "Legs", "Invalid"])
+
+Contact = namedtuple("Contact", "attacker stick_box player_box iou conf body_part")
+
+# Up to this many boxes a plain Python pass beats NumPy's per-call overhead
+# (bench_contacts.py puts the crossover at roughly 30 boxes per frame)
+SMALL_BOXES = 24
+
+def as_arrays(boxes):
+    """Accepts a ``result.boxes`` object or an object with xyxy/cls/conf arrays."""
+    xyxy, cls, conf = boxes.xyxy, boxes.cls, boxes.conf
+    if hasattr(xyxy, "cpu"):
+        xyxy, cls, conf = xyxy.cpu().numpy(), cls.cpu().numpy(), conf.cpu().numpy()
+    return (
+        np.asarray(xyxy, dtype=np.float32).reshape(-1, 4),
+        np.asarray(cls).astype(np.int64).reshape(-1),
+        np.asarray(conf, dtype=np.float32).reshape(-1),
+    )
+
+def iou_matrix(a, b):
+    """IoU between every box in ``a`` (N, 4) and every box in ``b`` (M, 4) -> (N, M)."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    # A zero union means zero intersection, so clamping it only avoids 0/0
+    return inter / np.maximum(union, 1e-9)
+
+def classify_hit(player_boxes, stick_boxes):
+    """Body region for each (player, stick) pair, from where the stick centre falls."""
+    player_boxes = np.asarray(player_boxes, dtype=np.float32).reshape(-1, 4)
+    stick_boxes = np.asarray(stick_boxes, dtype=np.float32).reshape(-1, 4)
+    py1 = player_boxes[:, 1]
+    height = player_boxes[:, 3] - py1
+    stick_center_y = (stick_boxes[:, 1] + stick_boxes[:, 3]) / 2
+    limits = np.stack([py1 + height * HEAD_LIMIT, py1 + height * BODY_LIMIT, py1 + height * LEGS_LIMIT], axis=1)
+    region = (stick_center_y[:, None] >= limits).sum(axis=1)
+    return BODY_REGIONS[region]
+
+def _region(py1, py2, stick_center_y):
+    """classify_hit for one pair of plain floats."""
+    height = py2 - py1
+    if stick_center_y < py1 + height * HEAD_LIMIT:
+        return "Head"
+    if stick_center_y < py1 + height * BODY_LIMIT:
+        return "Body"
+    if stick_center_y < py1 + height * LEGS_LIMIT:
+        return "Legs"
+    return "Invalid"
+
+def split_classes(xyxy, cls, conf, threshold=0.0):
+    """Boxes and confidences per class id, keeping detection order."""
+    if len(xyxy) <= SMALL_BOXES:
+        groups = ([], [], [], [])
+        for i, (class_id, score) in enumerate(zip(cls.tolist(), conf.tolist())):
+            if score >= threshold and 0 <= class_id < 4:
+                groups[class_id].append(i)
+        by_class = {}
+        for class_id, idx in enumerate(groups):
+            if len(idx) == 1:
+                # A slice is a view; fancy indexing would copy
+                i = idx[0]
+                by_class[class_id] = (xyxy[i:i + 1], conf[i:i + 1])
+            elif idx:
+                by_class[class_id] = (xyxy[idx], conf[idx])
+            else:
+                by_class[class_id] = (xyxy[:0], conf[:0])
+        return by_class
+    keep = np.flatnonzero(conf >= threshold)
+    kept_cls = cls[keep]
+    by_class = {}
+    for class_id in (BLUE_PLAYER, BLUE_STICK, RED_PLAYER, RED_STICK):
+        idx = keep[kept_cls == class_id]
+        by_class[class_id] = (xyxy[idx], conf[idx])
+    return by_class
+
+def find_contacts(xyxy, cls, conf, threshold=0.0, by_class=None):
+    """All stick-on-opponent contacts in one frame, red attacks first.
+
+    Both colours are handled in a single IoU matrix of every stick against
+    every player, with same-colour pairs masked out. Returns ``Contact``
+    tuples whose ``body_part`` is the ``classify_hit`` region of the struck
+    player. Frames with few boxes, the usual case of two fighters, take
+    the plain loop in ``_small_contacts`` instead, which is faster there.
+    """
+    by_class = by_class or split_classes(xyxy, cls, conf, threshold)
+    red_sticks, red_conf = by_class[RED_STICK]
+    blue_sticks, blue_conf = by_class[BLUE_STICK]
+    blue_players = by_class[BLUE_PLAYER][0]
+    red_players = by_class[RED_PLAYER][0]
+    n_rs, n_bp = len(red_sticks), len(blue_players)
+    if not ((n_rs and n_bp) or (len(blue_sticks) and len(red_players))):
+        return []
+    if n_rs + n_bp + len(blue_sticks) + len(red_players) <= SMALL_BOXES:
+        return (_small_contacts("Red", red_sticks, red_conf, blue_players)
+                + _small_contacts("Blue", blue_sticks, blue_conf, red_players))
+
+    # Rows: red sticks then blue sticks. Columns: blue players then red players.
+    sticks = np.concatenate([red_sticks, blue_sticks])
+    players = np.concatenate([blue_players, red_players])
+    ious = iou_matrix(sticks, players)
+    ious[:n_rs, n_bp:] = 0.0
+    ious[n_rs:, :n_bp] = 0.0
+
+    # argwhere walks row-major, i.e. the same order as the old nested stick/player loops
+    pairs = np.argwhere(ious > 0.0)
+    if len(pairs) == 0:
+        return []
+    s_idx, p_idx = pairs[:, 0], pairs[:, 1]
+    parts = classify_hit(players[p_idx], sticks[s_idx])
+    stick_conf = np.concatenate([red_conf, blue_conf])
+    return [
+        Contact("Red" if s < n_rs else "Blue", sticks[s], players[p],
+                float(ious[s, p]), float(stick_conf[s]), str(part))
+        for s, p, part in zip(s_idx.tolist(), p_idx.tolist(), parts)
+    ]
+
+def _small_contacts(attacker, sticks, stick_conf, players):
+    """find_contacts for one colour, one pair at a time, in the same order as the matrix path."""
+    contacts = []
+    if not len(sticks) or not len(players):
+        return contacts
+    player_rows = players.tolist()
+    for s, ((sx1, sy1, sx2, sy2), score) in enumerate(zip(sticks.tolist(), stick_conf.tolist())):
+        stick_area = (sx2 - sx1) * (sy2 - sy1)
+        center_y = (sy1 + sy2) / 2
+        for p, (px1, py1, px2, py2) in enumerate(player_rows):
+            w = min(sx2, px2) - max(sx1, px1)
+            h = min(sy2, py2) - max(sy1, py1)
+            if w <= 0 or h <= 0:
+                continue
+            inter = w * h
+            union = stick_area + (px2 - px1) * (py2 - py1) - inter
+            contacts.append(Contact(attacker, sticks[s], players[p], inter / max(union, 1e-9),
+                                    score, _region(py1, py2, center_y)))
+    return contacts
@@ -1,775 +1,789 @@
-from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QComboBox, QApplication, QProgressBar
-)
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QFont
-from camera import CameraThread, list_cameras
-from detection import ArnisStrikeDetector
-from utils import export_to_csv, export_to_pdf
-import os
-import datetime
-import sys
-import traceback
-import cv2
-from threading import Lock
-from ultralytics import YOLO
-
-sys.excepthook = lambda exc_type, exc_value, exc_traceback: traceback.print_exception(
-    exc_type, exc_value, exc_traceback
-)
-
-from PyQt5.QtWidgets import QProgressBar
-
-class SplashScreen(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Loading...")
-        self.setFixedSize(400, 200)
-        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
-        layout = QVBoxLayout()
-
-        self.label = QLabel("Loading Arnis Strike Detection System...")
-        self.label.setAlignment(Qt.AlignCenter)
-        self.label.setStyleSheet("font-size: 16px; font-weight: bold;")
-
-        self.progress_bar = QProgressBar(self)
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setTextVisible(True)
-        self.progress_bar.setStyleSheet("""
-            QProgressBar {
-                border: 2px solid grey;
-                border-radius: 5px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #3498db;
-                width: 10px;
-                margin: 0.5px;
-            }
-        """)
-
-        self.progress_label = QLabel("Initializing...")
-        self.progress_label.setAlignment(Qt.AlignCenter)
-
-        layout.addWidget(self.label)
-        layout.addWidget(self.progress_bar)
-        layout.addWidget(self.progress_label)
-        self.setLayout(layout)
-
-    def update_progress(self, value, message):
-        self.progress_bar.setValue(value)
-        self.progress_label.setText(message)
-        QApplication.processEvents()
-
-# ------------ CNN+LSTM Match Logs Window ------------
-class MatchLogsWindow(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("CNN-LSTM Realtime Detection")
-        layout = QVBoxLayout()
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(
-            ["Time", "Confidence", "Body Part", "Camera"]
-        )
-        layout.addWidget(self.table)
-        buttons_layout = QHBoxLayout()
-
-        # Clear button
-        self.clear_btn = QPushButton("Clear")
-        self.clear_btn.clicked.connect(self.clear_table)
-        buttons_layout.addWidget(self.clear_btn)
-
-        # Export CSV button
-        self.export_csv_btn = QPushButton("Export CSV")
-        self.export_csv_btn.clicked.connect(self.export_logs_csv)
-        buttons_layout.addWidget(self.export_csv_btn)
-
-        # Export PDF button
-        self.export_pdf_btn = QPushButton("Export PDF")
-        self.export_pdf_btn.clicked.connect(self.export_logs_pdf)
-        buttons_layout.addWidget(self.export_pdf_btn)
-
-        layout.addLayout(buttons_layout)
-        self.setLayout(layout)
-        self.resize(600, 350)
-
-    def add_log(self, time_str, valid, confidence, scored_by, body_part, camera):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        self.table.setItem(row, 0, QTableWidgetItem(time_str))
-        self.table.setItem(row, 1, QTableWidgetItem(f"{confidence:.2f}"))
-        self.table.setItem(row, 2, QTableWidgetItem(str(body_part)))
-        self.table.setItem(row, 3, QTableWidgetItem(str(camera)))
-        self.table.scrollToBottom()
-
-    def clear_table(self):
-        self.table.setRowCount(0)
-
-    def export_logs_csv(self):
-        from utils import export_cnn_lstm_logs_csv
-        logs = []
-        for row in range(self.table.rowCount()):
-            time = self.table.item(row, 0).text()
-            confidence = self.table.item(row, 1).text()
-            body_part = self.table.item(row, 2).text()
-            camera = self.table.item(row, 3).text()
-            logs.append((time, confidence, body_part, camera))
-        export_cnn_lstm_logs_csv("CNN-LSTM Detection Logs", logs)
-
-    def export_logs_pdf(self):
-        from utils import export_cnn_lstm_logs_pdf
-        logs = []
-        for row in range(self.table.rowCount()):
-            time = self.table.item(row, 0).text()
-            confidence = self.table.item(row, 1).text()
-            body_part = self.table.item(row, 2).text()
-            camera = self.table.item(row, 3).text()
-            logs.append((time, confidence, body_part, camera))
-        export_cnn_lstm_logs_pdf("CNN-LSTM Detection Logs", logs)
-
-# ---------------- Prediction Class ----------------
-class Prediction:
-    VALID_PARTS = [
-        "Head", "Body", "Legs", "Chest & Abdomen",
-        "Side of the Body", "Upper Extremities", "Lower Extremities"
-    ]
-    INVALID_PARTS = ["Back of the Head", "Throat", "Hitting the Groin", "Back"]
-
-    def __init__(self, log_callback=None):
-        from detection import get_model_path
-        self.model = YOLO(get_model_path("object_detection.pt"))
-        self.convlstm_model_path = get_model_path("convlstm_v3.h5")
-        self.lock = Lock()
-        self.scores = {"Blue": 0, "Red": 0}
-        self.winner = None
-        self.last_hit = None
-        self.confidence_threshold = 0.7
-        self.log_callback = log_callback
-        from detection import ArnisStrikeDetector
-        self.detector = ArnisStrikeDetector()
-
-    def calculate_iou(self, box1, box2):
-        x1_inter = max(box1[0], box2[0])
-        y1_inter = max(box1[1], box2[1])
-        x2_inter = min(box1[2], box2[2])
-        y2_inter = min(box1[3], box2[3])
-        inter_area = max(0, x2_inter - x1_inter) * max(0, y2_inter - y1_inter)
-        box1_area = (box1[2] - box1[0]) * (box1[3] - box1[1])
-        box2_area = (box2[2] - box2[0]) * (box2[3] - box2[1])
-        union_area = box1_area + box2_area - inter_area
-        return inter_area / union_area if union_area > 0 else 0.0
-
-    def classify_hit(self, player_box, stick_box):
-        px1, py1, px2, py2 = player_box
-        stick_center_y = (stick_box[1] + stick_box[3]) / 2
-        height = py2 - py1
-        if stick_center_y < py1 + height * 0.30:
-            return "Head"
-        elif stick_center_y < py1 + height * 0.70:
-            return "Body"
-        elif stick_center_y < py1 + height * 0.90:
-            return "Legs"
-        else:
-            return "Invalid"
-
-    def map_invalid_hit(self, classified_part, player_box):
-        if classified_part == "Head":
-            px1, py1, px2, py2 = player_box
-            if py1 < py1 + (py2 - py1) * -0.25:
-                return "Back of the Head"
-        return classified_part
-
-    def get_player_confidences(self, frame):
-        """Returns the confidence of detected players."""
-        with self.lock:
-            result = self.model(frame, verbose=False, conf=self.confidence_threshold)[0]
-            blue_conf = 0.0
-            red_conf = 0.0
-            for box in result.boxes:
-                if box.conf < self.confidence_threshold:
-                    continue
-                class_id = int(box.cls)
-                conf = float(box.conf)
-                if class_id == 0:  # Blue player
-                    blue_conf = max(blue_conf, conf)
-                elif class_id == 2:  # Red player
-                    red_conf = max(red_conf, conf)
-            return blue_conf, red_conf
-
-    def process_frame(self, frame, camera_number):
-        with self.lock:
-            result = self.model(frame, verbose=False, conf=self.confidence_threshold)[0]
-            blue_players, blue_sticks, red_players, red_sticks = [], [], [], []
-            for box in result.boxes:
-                if box.conf < self.confidence_threshold:
-                    continue
-                class_id = int(box.cls)
-                coords = box.xyxy[0].cpu().numpy()
-                conf = float(box.conf)
-                if class_id == 0:
-                    blue_players.append((coords, conf))
-                elif class_id == 1:
-                    blue_sticks.append((coords, conf))
-                elif class_id == 2:
-                    red_players.append((coords, conf))
-                elif class_id == 3:
-                    red_sticks.append((coords, conf))
-            self.winner = None
-
-        hit_registered = False
-        scored_by_red = False
-        body_part = ""
-        valid = False
-        confidence = 0.0
-
-        cnn_lstm_action = "no_action"
-        cnn_lstm_confidence = 0.0
-
-        target_player = None
-        if red_players:
-            target_player = red_players[0][0]
-        elif blue_players:
-            target_player = blue_players[0][0]
-
-        if target_player is not None:
-            cnn_lstm_action, cnn_lstm_confidence = self.detector.detect_action(frame, target_player)
-    
-            if "head" in cnn_lstm_action:
-                body_part = "Head"
-                valid = True
-            elif "body" in cnn_lstm_action:
-                body_part = "Body"
-                valid = True
-            elif "leg" in cnn_lstm_action:
-                body_part = "Legs"
-                valid = True
-            elif "invalid" in cnn_lstm_action:
-                body_part = "Invalid"
-                valid = False
-    
-            confidence = cnn_lstm_confidence
-    
-            if red_sticks and cnn_lstm_action != "no_action":
-                scored_by_red = True
-                self.scores["Red"] += 1 if valid else 0
-                hit_registered = True
-            elif blue_sticks and cnn_lstm_action != "no_action":
-                scored_by_red = False
-                self.scores["Blue"] += 1 if valid else 0
-                hit_registered = True
-
-        if not hit_registered:
-            # Red Stick hits Blue Player
-            for red_stick, conf in red_sticks:
-                for blue_player, _ in blue_players:
-                    iou = self.calculate_iou(red_stick, blue_player)
-                    if iou > 0.0 and self.last_hit != "Red":
-                        body_part = self.classify_hit(blue_player, red_stick)
-                        body_part = self.map_invalid_hit(body_part, blue_player)
-                        valid = body_part not in self.INVALID_PARTS and body_part != "Invalid"
-                        if valid:
-                            self.scores["Red"] += 1
-                            scored_by_red = True
-                        self.winner = "Red" if valid else None
-                        self.last_hit = "Red"
-                        hit_registered = True
-                        confidence = conf * 100.0
-                        break
-                if hit_registered:
-                    break
-
-            # Blue Stick hits Red Player
-            if not hit_registered:
-                for blue_stick, conf in blue_sticks:
-                    for red_player, _ in red_players:
-                        iou = self.calculate_iou(blue_stick, red_player)
-                        if iou > 0.0 and self.last_hit != "Blue":
-                            body_part = self.classify_hit(red_player, blue_stick)
-                            body_part = self.map_invalid_hit(body_part, red_player)
-                            valid = body_part not in self.INVALID_PARTS and body_part != "Invalid"
-                            if valid:
-                                self.scores["Blue"] += 1
-                            self.winner = "Blue" if valid else None
-                            self.last_hit = "Blue"
-                            hit_registered = True
-                            confidence = conf * 100.0
-                            break
-                    if hit_registered:
-                        break
-
-        if hit_registered and self.log_callback:
-            self.log_callback(
-                valid,
-                confidence,
-                f"{'Red' if scored_by_red else 'Blue'} - {body_part}",
-                camera_number
-            )
-    
-            if cnn_lstm_action != "no_action":
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                self.match_logs_window.add_log(
-                    timestamp, valid, confidence, body_part, camera_number
-                )
-        
-        if not hit_registered:
-            self.last_hit = None
-    
-        return result.plot()
-
-# ---------------- ArnisApp GUI ----------------
-class ArnisApp(QMainWindow):
-    CNNLSTM = 1.5
-
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("ArniScore: Arnis Strike Detection System")
-        self.setGeometry(200, 200, 1800, 900)
-        self.statusBar().showMessage("Ready")
-        self.detector = ArnisStrikeDetector()
-        self.match_logs_window = MatchLogsWindow()
-        self.cnnlstmshot_timer = None
-        self.confidence_timer = QTimer()
-        self.confidence_timer.timeout.connect(self.log_confidence_values)
-        self.pending_event_1 = None
-        self.pending_event_2 = None
-        self.pending_event_3 = None
-    
-        self.cnn_lstm_timer = QTimer()
-        self.cnn_lstm_timer.timeout.connect(self.process_cnn_lstm_detection)
-        self.cnn_lstm_interval = 100
-        # Cameras
-        self.cameras = list_cameras() or [0]
-        self.camera_thread_1 = None
-        self.camera_thread_2 = None
-        self.camera_thread_3 = None
-        # Separate prediction instances for each camera
-        self.predictions = {
-            1: Prediction(log_callback=lambda valid, conf, body_part, cam_num=1:
-                         self.update_log(valid, conf, body_part, cam_num)),
-            2: Prediction(log_callback=lambda valid, conf, body_part, cam_num=2:
-                         self.update_log(valid, conf, body_part, cam_num)),
-            3: Prediction(log_callback=lambda valid, conf, body_part, cam_num=3:
-                         self.update_log(valid, conf, body_part, cam_num))
-        }
-        # Track scores per camera
-        self.scores = {
-            1: {"Blue": 0, "Red": 0},
-            2: {"Blue": 0, "Red": 0},
-            3: {"Blue": 0, "Red": 0}
-        }
-        # Logs & Queues
-        self.logs_1, self.logs_2, self.logs_3 = [], [], []
-        self.log_queue_1, self.log_queue_2, self.log_queue_3 = [], [], []
-        self.init_ui()
-        # ---------------- Safety: Disable detection buttons by default ----------------
-        self.start_btn_1.setEnabled(False)
-        self.start_btn_2.setEnabled(False)
-        self.start_btn_3.setEnabled(False)
-
-    # ---------------- UI ----------------
-    def init_ui(self):
-        container = QWidget()
-        main_layout = QVBoxLayout()
-        # Camera selectors
-        cam_select_layout = QHBoxLayout()
-        self.camera_selector_1 = QComboBox()
-        self.camera_selector_2 = QComboBox()
-        self.camera_selector_3 = QComboBox()
-        for cam in self.cameras:
-            self.camera_selector_1.addItem(f"Camera {cam}")
-            self.camera_selector_2.addItem(f"Camera {cam}")
-            self.camera_selector_3.addItem(f"Camera {cam}")
-        cam_select_layout.addWidget(self.camera_selector_1)
-        cam_select_layout.addWidget(self.camera_selector_2)
-        cam_select_layout.addWidget(self.camera_selector_3)
-        
-        self.refresh_cameras_btn = QPushButton("Refresh Camera List")
-        self.refresh_cameras_btn.clicked.connect(self.refresh_camera_list)
-        cam_select_layout.addWidget(self.refresh_cameras_btn)
-        main_layout.addLayout(cam_select_layout)
-        # Camera Feeds
-        feed_layout = QHBoxLayout()
-        self.camera_label_1 = QLabel("Camera Feed 1")
-        self.camera_label_2 = QLabel("Camera Feed 2")
-        self.camera_label_3 = QLabel("Camera Feed 3")
-        for label in [self.camera_label_1, self.camera_label_2, self.camera_label_3]:
-            label.setAlignment(Qt.AlignCenter)
-            label.setMinimumSize(480, 360)
-        feed_layout.addWidget(self.camera_label_1)
-        feed_layout.addWidget(self.camera_label_2)
-        feed_layout.addWidget(self.camera_label_3)
-        main_layout.addLayout(feed_layout)
-        # Scores
-        score_layout = QHBoxLayout()
-        self.blue_score_label_1 = QLabel("Blue: 0")
-        self.red_score_label_1 = QLabel("Red: 0")
-        self.blue_score_label_2 = QLabel("Blue: 0")
-        self.red_score_label_2 = QLabel("Red: 0")
-        self.blue_score_label_3 = QLabel("Blue: 0")
-        self.red_score_label_3 = QLabel("Red: 0")
-        for lbl in [
-            self.blue_score_label_1, self.red_score_label_1,
-            self.blue_score_label_2, self.red_score_label_2,
-            self.blue_score_label_3, self.red_score_label_3,
-        ]:
-            lbl.setAlignment(Qt.AlignCenter)
-            lbl.setStyleSheet("font-size:16pt;font-weight:bold;")
-        score_layout.addWidget(self.blue_score_label_1)
-        score_layout.addWidget(self.red_score_label_1)
-        score_layout.addWidget(self.blue_score_label_2)
-        score_layout.addWidget(self.red_score_label_2)
-        score_layout.addWidget(self.blue_score_label_3)
-        score_layout.addWidget(self.red_score_label_3)
-        main_layout.addLayout(score_layout)
-        # Buttons
-        button_layout = QHBoxLayout()
-        self.preview_btn_1 = QPushButton("Preview Camera 1")
-        self.start_btn_1 = QPushButton("Start Detection 1")
-        self.stop_btn_1 = QPushButton("Stop Detection 1")
-        self.preview_btn_2 = QPushButton("Preview Camera 2")
-        self.start_btn_2 = QPushButton("Start Detection 2")
-        self.stop_btn_2 = QPushButton("Stop Detection 2")
-        self.preview_btn_3 = QPushButton("Preview Camera 3")
-        self.start_btn_3 = QPushButton("Start Detection 3")
-        self.stop_btn_3 = QPushButton("Stop Detection 3")
-        self.reset_btn = QPushButton("Reset All")
-        self.export_csv_btn = QPushButton("Export CSV All")
-        self.export_pdf_btn = QPushButton("Export PDF All")
-        self.match_logs_btn = QPushButton("CNN-LSTM Realtime Detection")
-        self.preview_btn_1.clicked.connect(self.start_preview_1)
-        self.start_btn_1.clicked.connect(lambda: self.start_detection(1))
-        self.stop_btn_1.clicked.connect(lambda: self.stop_detection(1))
-        self.preview_btn_2.clicked.connect(self.start_preview_2)
-        self.start_btn_2.clicked.connect(lambda: self.start_detection(2))
-        self.stop_btn_2.clicked.connect(lambda: self.stop_detection(2))
-        self.preview_btn_3.clicked.connect(self.start_preview_3)
-        self.start_btn_3.clicked.connect(lambda: self.start_detection(3))
-        self.stop_btn_3.clicked.connect(lambda: self.stop_detection(3))
-        self.stop_preview_btn_1 = QPushButton("Stop Preview 1")
-        self.stop_preview_btn_1.clicked.connect(self.stop_preview_1)
-        self.stop_preview_btn_2 = QPushButton("Stop Preview 2")
-        self.stop_preview_btn_2.clicked.connect(self.stop_preview_2)
-        self.stop_preview_btn_3 = QPushButton("Stop Preview 3")
-        self.stop_preview_btn_3.clicked.connect(self.stop_preview_3)
-        self.reset_btn.clicked.connect(self.reset_all)
-        self.export_csv_btn.clicked.connect(self.export_all_csv)
-        self.export_pdf_btn.clicked.connect(self.export_all_pdf)
-        self.match_logs_btn.clicked.connect(self.open_match_logs)
-        for btn in [
-            self.preview_btn_1, self.stop_preview_btn_1, self.start_btn_1, self.stop_btn_1,
-            self.preview_btn_2, self.stop_preview_btn_2, self.start_btn_2, self.stop_btn_2,
-            self.preview_btn_3, self.stop_preview_btn_3, self.start_btn_3, self.stop_btn_3,
-            self.reset_btn, self.export_csv_btn, self.export_pdf_btn,
-        ]:
-            button_layout.addWidget(btn)
-        # ---- CNN+LSTM Match Logs button ----
-        self.match_logs_btn = QPushButton("CNN-LSTM Realtime Detection")
-        self.match_logs_btn.clicked.connect(self.open_match_logs)
-        button_layout.addWidget(self.match_logs_btn)
-        main_layout.addLayout(button_layout)
-        # Logs Side by Side
-        logs_layout = QHBoxLayout()
-        log_container_1 = QVBoxLayout()
-        log_container_1.addWidget(QLabel("Camera 1 Logs"))
-        self.table_1 = QTableWidget(0, 5)
-        self.table_1.setHorizontalHeaderLabels(
-            ["Time", "Valid", "Confidence", "Scored By", "Body Part"]
-        )
-        log_container_1.addWidget(self.table_1)
-        logs_layout.addLayout(log_container_1)
-        log_container_2 = QVBoxLayout()
-        log_container_2.addWidget(QLabel("Camera 2 Logs"))
-        self.table_2 = QTableWidget(0, 5)
-        self.table_2.setHorizontalHeaderLabels(
-            ["Time", "Valid", "Confidence", "Scored By", "Body Part"]
-        )
-        log_container_2.addWidget(self.table_2)
-        logs_layout.addLayout(log_container_2)
-        log_container_3 = QVBoxLayout()
-        log_container_3.addWidget(QLabel("Camera 3 Logs"))
-        self.table_3 = QTableWidget(0, 5)
-        self.table_3.setHorizontalHeaderLabels(
-            ["Time", "Valid", "Confidence", "Scored By", "Body Part"]
-        )
-        log_container_3.addWidget(self.table_3)
-        logs_layout.addLayout(log_container_3)
-        main_layout.addLayout(logs_layout)
-        container.setLayout(main_layout)
-        self.setCentralWidget(container)
-
-    # --------- Refresh Camera List ---------
-    def refresh_camera_list(self):
-        self.cameras = list_cameras() or [0]
-        # Clear and repopulate camera selectors
-        self.camera_selector_1.clear()
-        self.camera_selector_2.clear()
-        self.camera_selector_3.clear()
-        for cam in self.cameras:
-            self.camera_selector_1.addItem(f"Camera {cam}")
-            self.camera_selector_2.addItem(f"Camera {cam}")
-            self.camera_selector_3.addItem(f"Camera {cam}")
-        self.statusBar().showMessage(f"Camera list refreshed. Found {len(self.cameras)} cameras.", 3000)
-
-    # --------- CNN+LSTM Match Logs Controls ---------
-    def open_match_logs(self):
-        self.match_logs_window.show()
-    
-    def process_cnn_lstm_detection(self):
-        """Process frames for CNN+LSTM action recognition"""
-        for cam_num in (1, 2, 3):
-            thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_num)
-            if thread and thread.isRunning() and thread.detection_enabled:
-                frame = thread.get_last_frame()
-                if frame is not None:
-                    pass
-
-    def start_cnnlstmshot_timer(self):
-        now_str = datetime.datetime.now().strftime("%H:%M:%S")
-        for cam in (1, 2, 3):
-            pending = getattr(self, f"pending_event_{cam}")
-            if pending:
-                valid, conf, scored_by, part = pending
-                setattr(self, f"pending_event_{cam}", None)
-            else:
-                valid, conf, scored_by, part = False, 0.0, "", ""
-            self.match_logs_window.add_log(
-                now_str, valid, conf, scored_by, part, cam
-            )
-        self.cnnlstmshot_timer = QTimer()
-        self.cnnlstmshot_timer.timeout.connect(self.start_cnnlstmshot_timer)
-        self.cnnlstmshot_timer.start(int(self.CNNLSTM * 1000))
-
-    def stop_cnnlstmshot_timer(self):
-        if self.cnnlstmshot_timer:
-            self.cnnlstmshot_timer.stop()
-            self.cnnlstmshot_timer = None
-
-    def log_confidence_values(self):
-        """Log confidence values for both players every second."""
-        now_str = datetime.datetime.now().strftime("%H:%M:%S")
-        for cam_num in (1, 2, 3):
-            thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_num)
-            if thread and thread.isRunning() and thread.detection_enabled:
-                frame = thread.get_last_frame()
-                if frame is not None:
-                    blue_conf, red_conf = self.predictions[cam_num].get_player_confidences(frame)
-                    self.match_logs_window.add_log(
-                        now_str, "N/A", blue_conf * 100.0, "Blue", "Classifying", cam_num
-                    )
-                    self.match_logs_window.add_log(
-                        now_str, "N/A", red_conf * 100.0, "Red", "Classifying", cam_num
-                    )
-
-    # ---------------- Camera Methods ----------------
-    def start_preview_1(self):
-        if self.camera_thread_1:
-            self.camera_thread_1.stop()
-            self.camera_thread_1.wait()
-        cam_index = self.cameras[self.camera_selector_1.currentIndex()]
-        self.camera_thread_1 = CameraThread(
-            detector=None,
-            camera_index=cam_index,
-            use_prediction=True,
-            prediction_instance=self.predictions[1],
-            camera_number=1,
-        )
-        self.camera_thread_1.frame_signal.connect(
-            lambda frame: self.update_camera_feed(frame, 1),
-            Qt.QueuedConnection
-        )
-        self.camera_thread_1.detection_enabled = False
-        self.camera_thread_1.start()
-        self.statusBar().showMessage(f"Camera {cam_index} preview 1 started", 3000)
-        self.start_btn_1.setEnabled(True)
-
-    def start_preview_2(self):
-        if self.camera_thread_2:
-            self.camera_thread_2.stop()
-            self.camera_thread_2.wait()
-        cam_index = self.cameras[self.camera_selector_2.currentIndex()]
-        self.camera_thread_2 = CameraThread(
-            detector=None,
-            camera_index=cam_index,
-            use_prediction=True,
-            prediction_instance=self.predictions[2],
-            camera_number=2,
-        )
-        self.camera_thread_2.frame_signal.connect(
-            lambda frame: self.update_camera_feed(frame, 2),
-            Qt.QueuedConnection
-        )
-        self.camera_thread_2.detection_enabled = False
-        self.camera_thread_2.start()
-        self.statusBar().showMessage(f"Camera {cam_index} preview 2 started", 3000)
-        self.start_btn_2.setEnabled(True)
-
-    def start_preview_3(self):
-        if self.camera_thread_3:
-            self.camera_thread_3.stop()
-            self.camera_thread_3.wait()
-        cam_index = self.cameras[self.camera_selector_3.currentIndex()]
-        self.camera_thread_3 = CameraThread(
-            detector=None,
-            camera_index=cam_index,
-            use_prediction=True,
-            prediction_instance=self.predictions[3],
-            camera_number=3,
-        )
-        self.camera_thread_3.frame_signal.connect(
-            lambda frame: self.update_camera_feed(frame, 3),
-            Qt.QueuedConnection
-        )
-        self.camera_thread_3.detection_enabled = False
-        self.camera_thread_3.start()
-        self.statusBar().showMessage(f"Camera {cam_index} preview 3 started", 3000)
-        self.start_btn_3.setEnabled(True)
-
-    def stop_preview_1(self):
-        if self.camera_thread_1:
-            self.camera_thread_1.stop()
-            self.camera_thread_1.wait()
-            self.camera_label_1.clear()
-            self.camera_label_1.setText("Camera Feed 1")
-            self.statusBar().showMessage("Camera 1 preview stopped", 3000)
-            self.start_btn_1.setEnabled(False)
-
-    def stop_preview_2(self):
-        if self.camera_thread_2:
-            self.camera_thread_2.stop()
-            self.camera_thread_2.wait()
-            self.camera_label_2.clear()
-            self.camera_label_2.setText("Camera Feed 2")
-            self.statusBar().showMessage("Camera 2 preview stopped", 3000)
-            self.start_btn_2.setEnabled(False)
-
-    def stop_preview_3(self):
-        if self.camera_thread_3:
-            self.camera_thread_3.stop()
-            self.camera_thread_3.wait()
-            self.camera_label_3.clear()
-            self.camera_label_3.setText("Camera Feed 3")
-            self.statusBar().showMessage("Camera 3 preview stopped", 3000)
-            self.start_btn_3.setEnabled(False)
-
-    # ---------------- Start / Stop Detection ----------------
-    def start_detection(self, cam_number):
-        thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_number)
-        if not thread or not thread.isRunning():
-            self.statusBar().showMessage(f"Start preview Camera {cam_number} first!", 5000)
-            return
-        thread.detection_enabled = True
-        self.statusBar().showMessage(f"Detection {cam_number} started", 3000)
-        if not self.confidence_timer.isActive():
-            self.confidence_timer.start(1000)
-        if not self.cnnlstmshot_timer:
-            self.start_cnnlstmshot_timer()
-
-    def stop_detection(self, cam_number):
-        thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_number)
-        if thread:
-            thread.detection_enabled = False
-        self.statusBar().showMessage(f"Detection {cam_number} stopped", 3000)
-        if not any(t and t.detection_enabled for t in [self.camera_thread_1, self.camera_thread_2, self.camera_thread_3]):
-            self.stop_cnnlstmshot_timer()
-            self.confidence_timer.stop()
-
-    # ---------------- Camera Feed ----------------
-    def update_camera_feed(self, frame, cam_number):
-        if frame is not None:
-            lbl = {1: self.camera_label_1, 2: self.camera_label_2, 3: self.camera_label_3}.get(cam_number)
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            rgb_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(rgb_image)
-
-            # Get FPS from the camera thread
-            thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_number)
-            fps = getattr(thread, 'fps', 0)
-
-            # Draw FPS on the pixmap
-            painter = QPainter(pixmap)
-            painter.setPen(QColor(255, 0, 0))  # Red color for FPS text
-            painter.setFont(QFont('Arial', 12))
-            painter.drawText(10, 20, f"FPS: {fps:.1f}")
-            painter.end()
-
-            lbl.setPixmap(pixmap)
-    # ---------------- Logs ----------------
-    def update_log(self, valid, confidence, body_part, cam_number):
-        if isinstance(body_part, str) and "-" in body_part:
-            scored_by, part = [x.strip() for x in body_part.split("-", 1)]
-        else:
-            scored_by, part = body_part if isinstance(body_part, tuple) else ("", body_part)
-        setattr(self, f"pending_event_{cam_number}", (valid, confidence, scored_by, part))
-        table = {1: self.table_1, 2: self.table_2, 3: self.table_3}[cam_number]
-        log_queue = {1: self.log_queue_1, 2: self.log_queue_2, 3: self.log_queue_3}[cam_number]
-        logs = {1: self.logs_1, 2: self.logs_2, 3: self.logs_3}[cam_number]
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        log_queue.append((timestamp, valid, confidence, scored_by, part))
-        if valid and scored_by in ("Red", "Blue"):
-            opposing = "Blue" if scored_by == "Red" else "Red"
-            log_queue.append((timestamp, False, confidence, opposing, part))
-        for log_entry in log_queue:
-            logs.append(log_entry)
-            row = table.rowCount()
-            table.insertRow(row)
-            for i, val in enumerate(log_entry):
-                table.setItem(row, i, QTableWidgetItem(str(val)))
-        table.scrollToBottom()
-        log_queue.clear()
-        self.scores[cam_number]["Blue"] = self.predictions[cam_number].scores["Blue"]
-        self.scores[cam_number]["Red"] = self.predictions[cam_number].scores["Red"]
-        self.update_scores(cam_number)
-
-    # ---------------- Update Scores ----------------
-    def update_scores(self, cam_number):
-        if cam_number == 1:
-            self.blue_score_label_1.setText(f"Blue: {self.scores[1]['Blue']}")
-            self.red_score_label_1.setText(f"Red: {self.scores[1]['Red']}")
-        elif cam_number == 2:
-            self.blue_score_label_2.setText(f"Blue: {self.scores[2]['Blue']}")
-            self.red_score_label_2.setText(f"Red: {self.scores[2]['Red']}")
-        else:
-            self.blue_score_label_3.setText(f"Blue: {self.scores[3]['Blue']}")
-            self.red_score_label_3.setText(f"Red: {self.scores[3]['Red']}")
-
-    # ---------------- Reset & Export ----------------
-    def reset_all(self):
-        for table in [self.table_1, self.table_2, self.table_3]:
-            table.setRowCount(0)
-        self.logs_1.clear()
-        self.logs_2.clear()
-        self.logs_3.clear()
-        self.log_queue_1.clear()
-        self.log_queue_2.clear()
-        self.log_queue_3.clear()
-        for cam_num in [1, 2, 3]:
-            self.scores[cam_num] = {"Blue": 0, "Red": 0}
-            self.predictions[cam_num].scores = {"Blue": 0, "Red": 0}
-            self.predictions[cam_num].last_hit = None
-            self.predictions[cam_num].winner = None
-        self.update_scores(1)
-        self.update_scores(2)
-        self.update_scores(3)
-        self.statusBar().showMessage("All logs and scores reset", 3000)
-
-    def export_all_csv(self):
-        export_to_csv(
-            [
-                ("Camera 1 Logs", self.logs_1),
-                ("Camera 2 Logs", self.logs_2),
-                ("Camera 3 Logs", self.logs_3),
-            ]
-        )
-
-    def export_all_pdf(self):
-        export_to_pdf(
-            [
-                ("Camera 1 Logs", self.logs_1),
-                ("Camera 2 Logs", self.logs_2),
-                ("Camera 3 Logs", self.logs_3),
-            ]
-        )
-
+from PyQt5.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout,
+    QTableView, QComboBox, QApplication, QProgressBar
+)
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QFont, QPen
+from camera import CameraThread, CameraDiscoveryThread
+from detection import ArnisStrikeDetector, get_yolo_model
+from cnn_lstm import ActionBatcher
+from scheduler import BatchInferenceScheduler
+from result_bus import ResultBus
+from adaptive import AdaptiveController
+from prediction import Prediction
+from log_model import LogTableModel
+from event_store import EventStore, DEFAULT_PATH as DEFAULT_EVENT_STORE
+from frame_source import is_stream_url
+from utils import (
+    export_to_csv, export_to_pdf, export_to_parquet, export_cnn_lstm_logs_csv,
+    export_cnn_lstm_logs_pdf, attach_progress, has_parquet, ExportWorker
+)
+import os
+import datetime
+import sys
+import traceback
+import cv2
+
+sys.excepthook = lambda exc_type, exc_value, exc_traceback: traceback.print_exception(
+    exc_type, exc_value, exc_traceback
+)
+
+from PyQt5.QtWidgets import QProgressBar
+
+class SplashScreen(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Loading...")
+        self.setFixedSize(400, 200)
+        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
+        layout = QVBoxLayout()
+
+        self.label = QLabel("Loading Arnis Strike Detection System...")
+        self.label.setAlignment(Qt.AlignCenter)
+        self.label.setStyleSheet("font-size: 16px; font-weight: bold;")
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: 2px solid grey;
+                border-radius: 5px;
+                text-align: center;
+            }
+            QProgressBar::chunk {
+                background-color: #3498db;
+                width: 10px;
+                margin: 0.5px;
+            }
+        """)
+
+        self.progress_label = QLabel("Initializing...")
+        self.progress_label.setAlignment(Qt.AlignCenter)
+
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.progress_label)
+        self.setLayout(layout)
+
+    def update_progress(self, value, message):
+        self.progress_bar.setValue(value)
+        self.progress_label.setText(message)
+        QApplication.processEvents()
+
+# ------------ Camera Feed Widget ------------
+class CameraFeedLabel(QLabel):
+    """Camera feed that can paint the detection overlay itself from box coordinates.
+
+    Used with --qt-overlay: the worker only scales the frame and sends an
+    overlay.Overlay, and boxes, contact markers and the score banner are
+    drawn here by QPainter on top of the pixmap.
+    """
+    def __init__(self, text=""):
+        super().__init__(text)
+        self.overlay = None
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        pixmap = self.pixmap()
+        if self.overlay is None or pixmap is None or pixmap.isNull():
+            return
+        # The pixmap is centred in the label
+        x0 = (self.width() - pixmap.width()) // 2
+        y0 = (self.height() - pixmap.height()) // 2
+        painter = QPainter(self)
+        painter.translate(x0, y0)
+        painter.setFont(QFont('Arial', 8))
+        for box, (b, g, r), label in zip(self.overlay.boxes, self.overlay.colors, self.overlay.labels):
+            x1, y1, x2, y2 = (int(v) for v in box)
+            painter.setPen(QPen(QColor(r, g, b), 2))
+            painter.drawRect(x1, y1, x2 - x1, y2 - y1)
+            painter.drawText(x1, max(y1 - 4, 10), label)
+        painter.setPen(QPen(QColor(255, 255, 0), 2))
+        for x, y in self.overlay.markers:
+            painter.drawEllipse(x - 6, y - 6, 12, 12)
+        if self.overlay.banner:
+            painter.fillRect(0, pixmap.height() - 22, pixmap.width(), 22, QColor(0, 0, 0))
+            painter.setPen(QColor(255, 255, 255))
+            painter.setFont(QFont('Arial', 10))
+            painter.drawText(8, pixmap.height() - 6, self.overlay.banner)
+        painter.end()
+
+# ------------ CNN+LSTM Match Logs Window ------------
+class MatchLogsWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("CNN-LSTM Realtime Detection")
+        layout = QVBoxLayout()
+        self.model = LogTableModel([
+            ("Time", None, None),
+            ("Confidence", "d", "{:.2f}".format),
+            ("Body Part", None, None),
+            ("Camera", "b", None),
+        ], parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.model.rowsInserted.connect(self.table.scrollToBottom)
+        layout.addWidget(self.table)
+        buttons_layout = QHBoxLayout()
+
+        # Clear button
+        self.clear_btn = QPushButton("Clear")
+        self.clear_btn.clicked.connect(self.clear_table)
+        buttons_layout.addWidget(self.clear_btn)
+
+        # Export CSV button
+        self.export_csv_btn = QPushButton("Export CSV")
+        self.export_csv_btn.clicked.connect(self.export_logs_csv)
+        buttons_layout.addWidget(self.export_csv_btn)
+
+        # Export PDF button
+        self.export_pdf_btn = QPushButton("Export PDF")
+        self.export_pdf_btn.clicked.connect(self.export_logs_pdf)
+        buttons_layout.addWidget(self.export_pdf_btn)
+
+        # Export progress; exports are written on a background thread
+        self.export_progress = QProgressBar()
+        self.export_progress.hide()
+        buttons_layout.addWidget(self.export_progress)
+        self.status_label = QLabel("")
+        buttons_layout.addWidget(self.status_label)
+
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+        self.resize(600, 350)
+
+    def add_log(self, time_str, valid, confidence, scored_by, body_part, camera):
+        self.model.append((time_str, confidence, str(body_part), camera))
+
+    def clear_table(self):
+        self.model.clear()
+
+    def export_rows(self):
+        # Full history, not just the rows the view still shows
+        return [(time, f"{confidence:.2f}", body_part, str(camera))
+                for time, confidence, body_part, camera in self.model.rows()]
+
+    def run_export(self, worker):
+        if worker is not None:
+            attach_progress(worker, self.export_progress, self.status_label.setText)
+            worker.start()
+
+    def export_logs_csv(self):
+        self.run_export(export_cnn_lstm_logs_csv("CNN-LSTM Detection Logs", self.export_rows(), self))
+
+    def export_logs_pdf(self):
+        self.run_export(export_cnn_lstm_logs_pdf("CNN-LSTM Detection Logs", self.export_rows(), self))
+
+# ---------------- ArnisApp GUI ----------------
+class ArnisApp(QMainWindow):
+    CNNLSTM = 1.5
+    BATCH_DEADLINE = 0.03  # seconds a frame may wait for the other cameras
+    adaptive_signal = pyqtSignal(str)
+    # Hits are reported from the camera threads: (valid, confidence, body_part, camera)
+    hit_signal = pyqtSignal(object, float, str, int)
+
+    def __init__(self, roi_mode=False, detect_every=1, target_fps=None, min_imgsz=416, max_skip=3,
+                 cnn_lstm_streaming=False, cnn_lstm_scoring=False, preloaded=None, qt_overlay=False,
+                 event_store_path=DEFAULT_EVENT_STORE, streams=()):
+        super().__init__()
+        self.qt_overlay = qt_overlay
+        # Models and camera list already loaded by startup.StartupLoader, if any
+        preloaded = preloaded or {}
+        self.setWindowTitle("ArniScore: Arnis Strike Detection System")
+        self.setGeometry(200, 200, 1800, 900)
+        self.statusBar().showMessage("Ready")
+        # Adaptive imgsz/frame-skip changes are reported from the camera threads
+        self.adaptive_signal.connect(lambda message: self.statusBar().showMessage(message, 10000))
+        self.hit_signal.connect(self.update_log)
+        self.adaptive_controllers = {
+            cam_num: AdaptiveController(
+                target_fps, min_imgsz=min_imgsz, max_skip=max_skip,
+                name=f"Camera {cam_num}", log_callback=self.adaptive_signal.emit
+            ) if target_fps else None
+            for cam_num in (1, 2, 3)
+        }
+        self.yolo_model = preloaded.get("yolo_model") or get_yolo_model("object_detection.pt")
+        self.detector = ArnisStrikeDetector(yolo_model=self.yolo_model)
+        # Each Prediction sends its own confidence threshold with every frame
+        self.inference_scheduler = BatchInferenceScheduler(self.yolo_model, max_wait=self.BATCH_DEADLINE)
+        self.result_bus = ResultBus()
+        self.match_logs_window = MatchLogsWindow()
+        self.cnnlstmshot_timer = None
+        self.confidence_timer = QTimer()
+        self.confidence_timer.timeout.connect(self.log_confidence_values)
+        self.pending_event_1 = None
+        self.pending_event_2 = None
+        self.pending_event_3 = None
+    
+        self.cnn_lstm_interval = 100
+        # Runs the ConvLSTM for all detecting cameras as one batch, off the GUI thread
+        self.action_batcher = ActionBatcher(interval=self.cnn_lstm_interval / 1000.0)
+        # Cameras
+        # Without a preloaded list the selectors start with camera 0 until discovery reports back;
+        # network streams (--stream) are listed after the local cameras
+        self.streams = list(streams)
+        self.cameras = (preloaded.get("cameras") or [0]) + self.streams
+        self.discovery_thread = None
+        self.camera_thread_1 = None
+        self.camera_thread_2 = None
+        self.camera_thread_3 = None
+        # Separate prediction instances for each camera
+        self.predictions = {
+            1: Prediction(log_callback=self.record_hit,
+                         model=self.yolo_model, scheduler=self.inference_scheduler,
+                         result_bus=self.result_bus, roi_mode=roi_mode,
+                         detect_every=detect_every, adaptive=self.adaptive_controllers[1],
+                         cnn_lstm_streaming=cnn_lstm_streaming, action_scoring=cnn_lstm_scoring),
+            2: Prediction(log_callback=self.record_hit,
+                         model=self.yolo_model, scheduler=self.inference_scheduler,
+                         result_bus=self.result_bus, roi_mode=roi_mode,
+                         detect_every=detect_every, adaptive=self.adaptive_controllers[2],
+                         cnn_lstm_streaming=cnn_lstm_streaming, action_scoring=cnn_lstm_scoring),
+            3: Prediction(log_callback=self.record_hit,
+                         model=self.yolo_model, scheduler=self.inference_scheduler,
+                         result_bus=self.result_bus, roi_mode=roi_mode,
+                         detect_every=detect_every, adaptive=self.adaptive_controllers[3],
+                         cnn_lstm_streaming=cnn_lstm_streaming, action_scoring=cnn_lstm_scoring)
+        }
+        # Track scores per camera
+        self.scores = {
+            1: {"Blue": 0, "Red": 0},
+            2: {"Blue": 0, "Red": 0},
+            3: {"Blue": 0, "Red": 0}
+        }
+        # Logs: the tables show the newest rows, the models keep the whole match
+        self.log_models = {
+            cam_num: LogTableModel([
+                ("Time", None, None),
+                ("Valid", None, None),
+                ("Confidence", "d", None),
+                ("Scored By", None, None),
+                ("Body Part", None, None),
+            ], parent=self)
+            for cam_num in (1, 2, 3)
+        }
+        # Every hit is also written to disk, so a crash does not lose the match
+        self.event_store = EventStore(event_store_path)
+        self.init_ui()
+        # ---------------- Safety: Disable detection buttons by default ----------------
+        self.start_btn_1.setEnabled(False)
+        self.start_btn_2.setEnabled(False)
+        self.start_btn_3.setEnabled(False)
+        if "cameras" not in preloaded:
+            self.refresh_camera_list()
+        self.restore_match()
+
+    # ---------------- UI ----------------
+    def init_ui(self):
+        container = QWidget()
+        main_layout = QVBoxLayout()
+        # Camera selectors
+        cam_select_layout = QHBoxLayout()
+        self.camera_selector_1 = QComboBox()
+        self.camera_selector_2 = QComboBox()
+        self.camera_selector_3 = QComboBox()
+        for cam in self.cameras:
+            self.camera_selector_1.addItem(self.camera_name(cam))
+            self.camera_selector_2.addItem(self.camera_name(cam))
+            self.camera_selector_3.addItem(self.camera_name(cam))
+        cam_select_layout.addWidget(self.camera_selector_1)
+        cam_select_layout.addWidget(self.camera_selector_2)
+        cam_select_layout.addWidget(self.camera_selector_3)
+        
+        self.refresh_cameras_btn = QPushButton("Refresh Camera List")
+        self.refresh_cameras_btn.clicked.connect(self.refresh_camera_list)
+        cam_select_layout.addWidget(self.refresh_cameras_btn)
+        main_layout.addLayout(cam_select_layout)
+        # Camera Feeds
+        feed_layout = QHBoxLayout()
+        self.camera_label_1 = CameraFeedLabel("Camera Feed 1")
+        self.camera_label_2 = CameraFeedLabel("Camera Feed 2")
+        self.camera_label_3 = CameraFeedLabel("Camera Feed 3")
+        for label in [self.camera_label_1, self.camera_label_2, self.camera_label_3]:
+            label.setAlignment(Qt.AlignCenter)
+            label.setMinimumSize(480, 360)
+        feed_layout.addWidget(self.camera_label_1)
+        feed_layout.addWidget(self.camera_label_2)
+        feed_layout.addWidget(self.camera_label_3)
+        main_layout.addLayout(feed_layout)
+        # Scores
+        score_layout = QHBoxLayout()
+        self.blue_score_label_1 = QLabel("Blue: 0")
+        self.red_score_label_1 = QLabel("Red: 0")
+        self.blue_score_label_2 = QLabel("Blue: 0")
+        self.red_score_label_2 = QLabel("Red: 0")
+        self.blue_score_label_3 = QLabel("Blue: 0")
+        self.red_score_label_3 = QLabel("Red: 0")
+        for lbl in [
+            self.blue_score_label_1, self.red_score_label_1,
+            self.blue_score_label_2, self.red_score_label_2,
+            self.blue_score_label_3, self.red_score_label_3,
+        ]:
+            lbl.setAlignment(Qt.AlignCenter)
+            lbl.setStyleSheet("font-size:16pt;font-weight:bold;")
+        score_layout.addWidget(self.blue_score_label_1)
+        score_layout.addWidget(self.red_score_label_1)
+        score_layout.addWidget(self.blue_score_label_2)
+        score_layout.addWidget(self.red_score_label_2)
+        score_layout.addWidget(self.blue_score_label_3)
+        score_layout.addWidget(self.red_score_label_3)
+        main_layout.addLayout(score_layout)
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.preview_btn_1 = QPushButton("Preview Camera 1")
+        self.start_btn_1 = QPushButton("Start Detection 1")
+        self.stop_btn_1 = QPushButton("Stop Detection 1")
+        self.preview_btn_2 = QPushButton("Preview Camera 2")
+        self.start_btn_2 = QPushButton("Start Detection 2")
+        self.stop_btn_2 = QPushButton("Stop Detection 2")
+        self.preview_btn_3 = QPushButton("Preview Camera 3")
+        self.start_btn_3 = QPushButton("Start Detection 3")
+        self.stop_btn_3 = QPushButton("Stop Detection 3")
+        self.reset_btn = QPushButton("Reset All")
+        self.export_csv_btn = QPushButton("Export CSV All")
+        self.export_pdf_btn = QPushButton("Export PDF All")
+        self.export_parquet_btn = QPushButton("Export Parquet (All Matches)")
+        if not has_parquet():
+            self.export_parquet_btn.setEnabled(False)
+            self.export_parquet_btn.setToolTip("Install pyarrow to enable Parquet export")
+        self.preview_btn_1.clicked.connect(self.start_preview_1)
+        self.start_btn_1.clicked.connect(lambda: self.start_detection(1))
+        self.stop_btn_1.clicked.connect(lambda: self.stop_detection(1))
+        self.preview_btn_2.clicked.connect(self.start_preview_2)
+        self.start_btn_2.clicked.connect(lambda: self.start_detection(2))
+        self.stop_btn_2.clicked.connect(lambda: self.stop_detection(2))
+        self.preview_btn_3.clicked.connect(self.start_preview_3)
+        self.start_btn_3.clicked.connect(lambda: self.start_detection(3))
+        self.stop_btn_3.clicked.connect(lambda: self.stop_detection(3))
+        self.stop_preview_btn_1 = QPushButton("Stop Preview 1")
+        self.stop_preview_btn_1.clicked.connect(self.stop_preview_1)
+        self.stop_preview_btn_2 = QPushButton("Stop Preview 2")
+        self.stop_preview_btn_2.clicked.connect(self.stop_preview_2)
+        self.stop_preview_btn_3 = QPushButton("Stop Preview 3")
+        self.stop_preview_btn_3.clicked.connect(self.stop_preview_3)
+        self.reset_btn.clicked.connect(self.reset_all)
+        self.export_csv_btn.clicked.connect(self.export_all_csv)
+        self.export_pdf_btn.clicked.connect(self.export_all_pdf)
+        self.export_parquet_btn.clicked.connect(self.export_all_parquet)
+        for btn in [
+            self.preview_btn_1, self.stop_preview_btn_1, self.start_btn_1, self.stop_btn_1,
+            self.preview_btn_2, self.stop_preview_btn_2, self.start_btn_2, self.stop_btn_2,
+            self.preview_btn_3, self.stop_preview_btn_3, self.start_btn_3, self.stop_btn_3,
+            self.reset_btn, self.export_csv_btn, self.export_pdf_btn, self.export_parquet_btn,
+        ]:
+            button_layout.addWidget(btn)
+        # ---- CNN+LSTM Match Logs button ----
+        self.match_logs_btn = QPushButton("CNN-LSTM Realtime Detection")
+        self.match_logs_btn.clicked.connect(self.open_match_logs)
+        button_layout.addWidget(self.match_logs_btn)
+        main_layout.addLayout(button_layout)
+        # Logs Side by Side
+        logs_layout = QHBoxLayout()
+        log_container_1 = QVBoxLayout()
+        log_container_1.addWidget(QLabel("Camera 1 Logs"))
+        self.table_1 = QTableView()
+        self.table_1.setModel(self.log_models[1])
+        self.log_models[1].rowsInserted.connect(self.table_1.scrollToBottom)
+        log_container_1.addWidget(self.table_1)
+        logs_layout.addLayout(log_container_1)
+        log_container_2 = QVBoxLayout()
+        log_container_2.addWidget(QLabel("Camera 2 Logs"))
+        self.table_2 = QTableView()
+        self.table_2.setModel(self.log_models[2])
+        self.log_models[2].rowsInserted.connect(self.table_2.scrollToBottom)
+        log_container_2.addWidget(self.table_2)
+        logs_layout.addLayout(log_container_2)
+        log_container_3 = QVBoxLayout()
+        log_container_3.addWidget(QLabel("Camera 3 Logs"))
+        self.table_3 = QTableView()
+        self.table_3.setModel(self.log_models[3])
+        self.log_models[3].rowsInserted.connect(self.table_3.scrollToBottom)
+        log_container_3.addWidget(self.table_3)
+        logs_layout.addLayout(log_container_3)
+        main_layout.addLayout(logs_layout)
+        container.setLayout(main_layout)
+        self.setCentralWidget(container)
+        self.export_progress = QProgressBar()
+        self.export_progress.setMaximumWidth(200)
+        self.export_progress.hide()
+        self.statusBar().addPermanentWidget(self.export_progress)
+
+    # --------- Refresh Camera List ---------
+    def refresh_camera_list(self):
+        if self.discovery_thread is not None and self.discovery_thread.isRunning():
+            return
+        # Cameras that are streaming cannot be opened a second time; keep them as they are
+        in_use = {
+            thread.camera_index
+            for thread in (self.camera_thread_1, self.camera_thread_2, self.camera_thread_3)
+            if thread and thread.isRunning() and not is_stream_url(thread.camera_index)
+        }
+        self.refresh_cameras_btn.setEnabled(False)
+        self.statusBar().showMessage("Searching for cameras...")
+        self.discovery_thread = CameraDiscoveryThread(in_use=in_use)
+        self.discovery_thread.cameras_found.connect(self.set_camera_list)
+        self.discovery_thread.start()
+
+    @staticmethod
+    def camera_name(cam):
+        return f"Stream {cam}" if is_stream_url(cam) else f"Camera {cam}"
+
+    def set_camera_list(self, cameras):
+        self.cameras = (cameras or [0]) + self.streams
+        # Repopulate camera selectors, keeping each one on its camera if still present
+        for selector in (self.camera_selector_1, self.camera_selector_2, self.camera_selector_3):
+            current = selector.currentText()
+            selector.clear()
+            for cam in self.cameras:
+                selector.addItem(self.camera_name(cam))
+            index = selector.findText(current)
+            if index >= 0:
+                selector.setCurrentIndex(index)
+        self.refresh_cameras_btn.setEnabled(True)
+        self.statusBar().showMessage(
+            f"Camera list refreshed. Found {len(self.cameras) - len(self.streams)} cameras.", 3000
+        )
+
+    # --------- CNN+LSTM Match Logs Controls ---------
+    def open_match_logs(self):
+        self.match_logs_window.show()
+    
+    def start_cnnlstmshot_timer(self):
+        now_str = datetime.datetime.now().strftime("%H:%M:%S")
+        for cam in (1, 2, 3):
+            pending = getattr(self, f"pending_event_{cam}")
+            if pending:
+                valid, conf, scored_by, part = pending
+                setattr(self, f"pending_event_{cam}", None)
+            else:
+                valid, conf, scored_by, part = False, 0.0, "", ""
+            self.match_logs_window.add_log(
+                now_str, valid, conf, scored_by, part, cam
+            )
+        self.cnnlstmshot_timer = QTimer()
+        self.cnnlstmshot_timer.timeout.connect(self.start_cnnlstmshot_timer)
+        self.cnnlstmshot_timer.start(int(self.CNNLSTM * 1000))
+
+    def stop_cnnlstmshot_timer(self):
+        if self.cnnlstmshot_timer:
+            self.cnnlstmshot_timer.stop()
+            self.cnnlstmshot_timer = None
+
+    def log_confidence_values(self):
+        """Log confidence values for both players every second."""
+        now_str = datetime.datetime.now().strftime("%H:%M:%S")
+        for cam_num in (1, 2, 3):
+            thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_num)
+            if thread and thread.isRunning() and thread.detection_enabled:
+                # Read the cached detection; never run the model on the GUI thread
+                if self.result_bus.latest(cam_num) is not None:
+                    blue_conf, red_conf = self.predictions[cam_num].get_player_confidences(cam_num)
+                    self.match_logs_window.add_log(
+                        now_str, "N/A", blue_conf * 100.0, "Blue", "Classifying", cam_num
+                    )
+                    self.match_logs_window.add_log(
+                        now_str, "N/A", red_conf * 100.0, "Red", "Classifying", cam_num
+                    )
+
+    # ---------------- Camera Methods ----------------
+    def start_preview_1(self):
+        if self.camera_thread_1:
+            self.camera_thread_1.stop()
+            self.camera_thread_1.wait()
+        cam_index = self.cameras[self.camera_selector_1.currentIndex()]
+        self.camera_thread_1 = CameraThread(
+            detector=None,
+            camera_index=cam_index,
+            use_prediction=True,
+            prediction_instance=self.predictions[1],
+            camera_number=1,
+        )
+        self.camera_thread_1.display_size = self.display_size(1)
+        self.camera_thread_1.qt_overlay = self.qt_overlay
+        self.camera_thread_1.frame_ready.connect(
+            lambda seq: self.update_camera_feed(1),
+            Qt.QueuedConnection
+        )
+        self.camera_thread_1.detection_enabled = False
+        self.camera_thread_1.start()
+        self.statusBar().showMessage(f"{self.camera_name(cam_index)} preview 1 started", 3000)
+        self.start_btn_1.setEnabled(True)
+
+    def start_preview_2(self):
+        if self.camera_thread_2:
+            self.camera_thread_2.stop()
+            self.camera_thread_2.wait()
+        cam_index = self.cameras[self.camera_selector_2.currentIndex()]
+        self.camera_thread_2 = CameraThread(
+            detector=None,
+            camera_index=cam_index,
+            use_prediction=True,
+            prediction_instance=self.predictions[2],
+            camera_number=2,
+        )
+        self.camera_thread_2.display_size = self.display_size(2)
+        self.camera_thread_2.qt_overlay = self.qt_overlay
+        self.camera_thread_2.frame_ready.connect(
+            lambda seq: self.update_camera_feed(2),
+            Qt.QueuedConnection
+        )
+        self.camera_thread_2.detection_enabled = False
+        self.camera_thread_2.start()
+        self.statusBar().showMessage(f"{self.camera_name(cam_index)} preview 2 started", 3000)
+        self.start_btn_2.setEnabled(True)
+
+    def start_preview_3(self):
+        if self.camera_thread_3:
+            self.camera_thread_3.stop()
+            self.camera_thread_3.wait()
+        cam_index = self.cameras[self.camera_selector_3.currentIndex()]
+        self.camera_thread_3 = CameraThread(
+            detector=None,
+            camera_index=cam_index,
+            use_prediction=True,
+            prediction_instance=self.predictions[3],
+            camera_number=3,
+        )
+        self.camera_thread_3.display_size = self.display_size(3)
+        self.camera_thread_3.qt_overlay = self.qt_overlay
+        self.camera_thread_3.frame_ready.connect(
+            lambda seq: self.update_camera_feed(3),
+            Qt.QueuedConnection
+        )
+        self.camera_thread_3.detection_enabled = False
+        self.camera_thread_3.start()
+        self.statusBar().showMessage(f"{self.camera_name(cam_index)} preview 3 started", 3000)
+        self.start_btn_3.setEnabled(True)
+
+    def stop_preview_1(self):
+        if self.camera_thread_1:
+            self.camera_thread_1.stop()
+            self.camera_thread_1.wait()
+            self.inference_scheduler.unregister(1)
+            self.action_batcher.unregister(1)
+            self.camera_label_1.clear()
+            self.camera_label_1.setText("Camera Feed 1")
+            self.statusBar().showMessage("Camera 1 preview stopped", 3000)
+            self.start_btn_1.setEnabled(False)
+
+    def stop_preview_2(self):
+        if self.camera_thread_2:
+            self.camera_thread_2.stop()
+            self.camera_thread_2.wait()
+            self.inference_scheduler.unregister(2)
+            self.action_batcher.unregister(2)
+            self.camera_label_2.clear()
+            self.camera_label_2.setText("Camera Feed 2")
+            self.statusBar().showMessage("Camera 2 preview stopped", 3000)
+            self.start_btn_2.setEnabled(False)
+
+    def stop_preview_3(self):
+        if self.camera_thread_3:
+            self.camera_thread_3.stop()
+            self.camera_thread_3.wait()
+            self.inference_scheduler.unregister(3)
+            self.action_batcher.unregister(3)
+            self.camera_label_3.clear()
+            self.camera_label_3.setText("Camera Feed 3")
+            self.statusBar().showMessage("Camera 3 preview stopped", 3000)
+            self.start_btn_3.setEnabled(False)
+
+    # ---------------- Start / Stop Detection ----------------
+    def start_detection(self, cam_number):
+        thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_number)
+        if not thread or not thread.isRunning():
+            self.statusBar().showMessage(f"Start preview Camera {cam_number} first!", 5000)
+            return
+        thread.detection_enabled = True
+        self.inference_scheduler.register(cam_number)
+        self.action_batcher.register(cam_number, self.predictions[cam_number].detector.cnn_lstm)
+        self.statusBar().showMessage(f"Detection {cam_number} started", 3000)
+        if not self.confidence_timer.isActive():
+            self.confidence_timer.start(1000)
+        if not self.cnnlstmshot_timer:
+            self.start_cnnlstmshot_timer()
+
+    def stop_detection(self, cam_number):
+        thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_number)
+        if thread:
+            thread.detection_enabled = False
+        self.inference_scheduler.unregister(cam_number)
+        self.action_batcher.unregister(cam_number)
+        self.statusBar().showMessage(f"Detection {cam_number} stopped", 3000)
+        if not any(t and t.detection_enabled for t in [self.camera_thread_1, self.camera_thread_2, self.camera_thread_3]):
+            self.stop_cnnlstmshot_timer()
+            self.confidence_timer.stop()
+
+    # ---------------- Camera Feed ----------------
+    def display_size(self, cam_number):
+        lbl = {1: self.camera_label_1, 2: self.camera_label_2, 3: self.camera_label_3}[cam_number]
+        return lbl.width(), lbl.height()
+
+    def update_camera_feed(self, cam_number):
+        thread = {1: self.camera_thread_1, 2: self.camera_thread_2, 3: self.camera_thread_3}.get(cam_number)
+        if thread is None:
+            return
+        # Several queued signals may point at one frame; only the newest is shown, once
+        item = thread.take_display_frame()
+        if item is None:
+            return
+        _, frame, overlay = item
+        lbl = {1: self.camera_label_1, 2: self.camera_label_2, 3: self.camera_label_3}.get(cam_number)
+        lbl.overlay = overlay
+        h, w, ch = frame.shape
+        bytes_per_line = ch * w
+        rgb_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
+        pixmap = QPixmap.fromImage(rgb_image)
+        thread.release_display_frame(frame)
+        # The worker scales the next frames to the label's current size
+        thread.display_size = (lbl.width(), lbl.height())
+
+        fps = getattr(thread, 'fps', 0)
+        latency = getattr(thread, 'latency_ms', 0.0)
+        dropped = getattr(thread, 'dropped_frames', 0)
+        # Network streams also report their connection state, delay and jitter
+        stream_stats = thread.source.stats() if hasattr(thread.source, "stats") else None
+
+        # Draw FPS, capture-to-decision latency and dropped frames on the pixmap
+        painter = QPainter(pixmap)
+        painter.setPen(QColor(255, 0, 0))  # Red color for FPS text
+        painter.setFont(QFont('Arial', 12))
+        painter.drawText(10, 20, f"FPS: {fps:.1f}")
+        painter.drawText(10, 40, f"Latency: {latency:.0f} ms  Dropped: {dropped}")
+        if stream_stats:
+            delay = stream_stats["delay_ms"]
+            painter.drawText(10, 60, f"Stream: {stream_stats['status']}  "
+                                     f"Delay: {'-' if delay is None else f'{delay:.0f}'} ms  "
+                                     f"Jitter: {stream_stats['jitter_ms']:.0f} ms  "
+                                     f"Reconnects: {stream_stats['reconnects']}")
+        painter.end()
+
+        lbl.setPixmap(pixmap)
+    # ---------------- Logs ----------------
+    @staticmethod
+    def split_hit(body_part):
+        """'Red - Head' -> ('Red', 'Head')."""
+        if isinstance(body_part, str) and "-" in body_part:
+            return tuple(x.strip() for x in body_part.split("-", 1))
+        return body_part if isinstance(body_part, tuple) else ("", body_part)
+
+    @staticmethod
+    def log_rows(timestamp, valid, confidence, scored_by, part):
+        rows = [(timestamp, valid, confidence, scored_by, part)]
+        if valid and scored_by in ("Red", "Blue"):
+            opposing = "Blue" if scored_by == "Red" else "Red"
+            rows.append((timestamp, False, confidence, opposing, part))
+        return rows
+
+    def record_hit(self, valid, confidence, body_part, cam_number):
+        """Prediction log callback, called on the camera thread right after the score changed."""
+        scored_by, part = self.split_hit(body_part)
+        self.event_store.record(cam_number, valid, confidence, scored_by, part,
+                                self.predictions[cam_number].scores)
+        self.hit_signal.emit(valid, confidence, body_part, cam_number)
+
+    def update_log(self, valid, confidence, body_part, cam_number):
+        scored_by, part = self.split_hit(body_part)
+        setattr(self, f"pending_event_{cam_number}", (valid, confidence, scored_by, part))
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self.log_models[cam_number].extend(self.log_rows(timestamp, valid, confidence, scored_by, part))
+        self.scores[cam_number]["Blue"] = self.predictions[cam_number].scores["Blue"]
+        self.scores[cam_number]["Red"] = self.predictions[cam_number].scores["Red"]
+        self.update_scores(cam_number)
+
+    def restore_match(self):
+        """Picks up an interrupted match from the event store: scores and log rows."""
+        scores = self.event_store.recover()
+        if not scores:
+            return
+        for cam_num, camera_scores in scores.items():
+            if cam_num not in self.predictions:
+                continue
+            self.predictions[cam_num].scores = dict(camera_scores)
+            self.scores[cam_num] = dict(camera_scores)
+            self.update_scores(cam_num)
+        for event in self.event_store.query(match_id=self.event_store.match_id):
+            if event["camera"] not in self.log_models:
+                continue
+            timestamp = datetime.datetime.fromtimestamp(event["timestamp"]).strftime("%H:%M:%S")
+            self.log_models[event["camera"]].extend(self.log_rows(
+                timestamp, bool(event["valid"]), event["confidence"], event["scored_by"], event["body_part"]
+            ))
+        self.statusBar().showMessage(f"Resumed interrupted match {self.event_store.match_id}", 10000)
+
+    # ---------------- Update Scores ----------------
+    def update_scores(self, cam_number):
+        if cam_number == 1:
+            self.blue_score_label_1.setText(f"Blue: {self.scores[1]['Blue']}")
+            self.red_score_label_1.setText(f"Red: {self.scores[1]['Red']}")
+        elif cam_number == 2:
+            self.blue_score_label_2.setText(f"Blue: {self.scores[2]['Blue']}")
+            self.red_score_label_2.setText(f"Red: {self.scores[2]['Red']}")
+        else:
+            self.blue_score_label_3.setText(f"Blue: {self.scores[3]['Blue']}")
+            self.red_score_label_3.setText(f"Red: {self.scores[3]['Red']}")
+
+    # ---------------- Reset & Export ----------------
+    def reset_all(self):
+        for model in self.log_models.values():
+            model.clear()
+        # The old match stays in the event store; the next hit starts a new one
+        self.event_store.end_match()
+        for cam_num in [1, 2, 3]:
+            self.scores[cam_num] = {"Blue": 0, "Red": 0}
+            self.predictions[cam_num].reset_scores()
+            self.predictions[cam_num].tracker.reset()
+            if self.predictions[cam_num].detector.cnn_lstm:
+                self.predictions[cam_num].detector.cnn_lstm.reset_sequence()
+        self.result_bus.clear()
+        self.update_scores(1)
+        self.update_scores(2)
+        self.update_scores(3)
+        self.statusBar().showMessage("All logs and scores reset", 3000)
+
+    def run_export(self, worker):
+        if worker is not None:
+            attach_progress(worker, self.export_progress,
+                            lambda message: self.statusBar().showMessage(message, 5000))
+            worker.start()
+
+    def export_all_csv(self):
+        self.run_export(export_to_csv(
+            [
+                ("Camera 1 Logs", self.log_models[1].rows()),
+                ("Camera 2 Logs", self.log_models[2].rows()),
+                ("Camera 3 Logs", self.log_models[3].rows()),
+            ],
+            self,
+        ))
+
+    def export_all_pdf(self):
+        self.run_export(export_to_pdf(
+            [
+                ("Camera 1 Logs", self.log_models[1].rows()),
+                ("Camera 2 Logs", self.log_models[2].rows()),
+                ("Camera 3 Logs", self.log_models[3].rows()),
+            ],
+            self,
+        ))
+
+    def export_all_parquet(self):
+        self.run_export(export_to_parquet(self.event_store, self))
+
+    def closeEvent(self, event):
+        # Camera threads first: they may be waiting on a batch from the scheduler
+        for thread in (self.camera_thread_1, self.camera_thread_2, self.camera_thread_3):
+            if thread:
+                thread.stop()
+                thread.wait()
+        self.inference_scheduler.stop()
+        self.action_batcher.stop()
+        # Let running exports finish writing their files
+        for worker in self.findChildren(ExportWorker):
+            worker.wait()
+        # Commits queued hits and marks the match as finished
+        self.event_store.close()
+        super().closeEvent(event)
+
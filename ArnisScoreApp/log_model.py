@@ -0,0 +1,116 @@
+from sys import intern
+from array import array
+from threading import Lock
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+
+class LogTableModel(QAbstractTableModel):
+    """Append-only log table for a QTableView, stored column by column.
+
+    ``append`` may be called from any thread: rows wait in a pending list and
+    are inserted together by a timer on the GUI thread, one insert per
+    ``flush_interval`` ms however many rows arrived. The view only ever sees
+    the newest ``max_visible`` rows; the whole history stays here, outside
+    the widget, for ``rows()`` and exports.
+
+    ``columns`` is a list of (header, typecode, formatter). A typecode such as
+    'd' stores that column in a compact ``array``; None keeps Python objects
+    (strings are interned).
+    """
+    def __init__(self, columns, max_visible=500, flush_interval=100, parent=None):
+        super().__init__(parent)
+        self.headers = [header for header, _, _ in columns]
+        self.typecodes = [typecode for _, typecode, _ in columns]
+        self.formatters = [formatter or str for _, _, formatter in columns]
+        self.max_visible = max_visible
+        self.data_columns = self._empty_columns()
+        self.offset = 0            # history index of the first visible row
+        self.pending = []
+        self.lock = Lock()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(flush_interval)
+
+    def _empty_columns(self):
+        return [array(code) if code else [] for code in self.typecodes]
+
+    # ---------------- Qt model interface ----------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.data_columns[0]) - self.offset
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        column = index.column()
+        return self.formatters[column](self.data_columns[column][self.offset + index.row()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    # ---------------- Appending ----------------
+    def append(self, row):
+        with self.lock:
+            self.pending.append(row)
+
+    def extend(self, rows):
+        with self.lock:
+            self.pending.extend(rows)
+
+    def _store(self, rows):
+        for i, column in enumerate(self.data_columns):
+            values = [row[i] for row in rows]
+            if self.typecodes[i] is None:
+                # Times, names and body parts repeat constantly; keep one copy of each
+                values = [intern(v) if isinstance(v, str) else v for v in values]
+            column.extend(values)
+
+    def flush(self):
+        """Moves pending rows into the table with one remove and one insert notification."""
+        with self.lock:
+            rows, self.pending = self.pending, []
+        if not rows:
+            return
+        visible = self.rowCount()
+        total = len(self.data_columns[0]) + len(rows)
+        first_visible = max(self.offset, total - self.max_visible)
+
+        # Scroll the oldest rows out of the view; they stay in the history
+        removed = min(first_visible - self.offset, visible)
+        if removed > 0:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            self.offset += removed
+            self.endRemoveRows()
+
+        # A burst bigger than the whole view: its head goes straight to the history
+        hidden = first_visible - self.offset
+        if hidden > 0:
+            self._store(rows[:hidden])
+            self.offset += hidden
+            rows = rows[hidden:]
+
+        start = self.rowCount()
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._store(rows)
+        self.endInsertRows()
+
+    # ---------------- History ----------------
+    def rows(self):
+        """Every row logged since the last clear, oldest first, as tuples."""
+        self.flush()
+        return list(zip(*self.data_columns))
+
+    def __len__(self):
+        return len(self.data_columns[0]) + len(self.pending)
+
+    def clear(self):
+        self.beginResetModel()
+        with self.lock:
+            self.pending = []
+        self.data_columns = self._empty_columns()
+        self.offset = 0
+        self.endResetModel()
@@ -1,47 +1,119 @@
-import sys
-import os
-import time
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from gui import ArnisApp, SplashScreen
-
-os.environ["QT_LOGGING_RULES"] = "qt5*.debug=false"
-
-if __name__ == "__main__":
-    import numpy as np
-    from PyQt5.QtCore import QMetaType
-    try:
-        QMetaType.register(np.ndarray)
-    except:
-        pass
-
-    app = QApplication(sys.argv)
-
-    splash = SplashScreen()
-    splash.show()
-    app.processEvents()
-
-    splash.update_progress(10, "Loading models...")
-    app.processEvents()
-    time.sleep(1)
-
-    splash.update_progress(40, "Initializing UI...")
-    app.processEvents()
-    time.sleep(0.5)
-
-    splash.update_progress(70, "Setting up cameras...")
-    app.processEvents()
-    time.sleep(0.5)
-
-    splash.update_progress(90, "Almost ready...")
-    app.processEvents()
-    window = ArnisApp()
-
-    splash.update_progress(100, "Ready!")
-    app.processEvents()
-    time.sleep(0.5)
-
-    splash.close()
-    window.show()
-
-    sys.exit(app.exec_())
+import sys
+import os
+import time
+import argparse
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
+from backends import BACKENDS, set_default_backend
+from adaptive import DEFAULT_LADDER
+from gui import ArnisApp, SplashScreen
+from startup import StartupLoader, log_timings
+from event_store import DEFAULT_PATH as DEFAULT_EVENT_STORE
+
+os.environ["QT_LOGGING_RULES"] = "qt5*.debug=false"
+
+if __name__ == "__main__":
+    import numpy as np
+    from PyQt5.QtCore import QMetaType
+    try:
+        QMetaType.register(np.ndarray)
+    except:
+        pass
+
+    parser = argparse.ArgumentParser(description="ArniScore: Arnis Strike Detection System")
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default=os.environ.get("ARNIS_BACKEND", "torch"),
+        help="Inference backend for the YOLO detector (default: torch)"
+    )
+    parser.add_argument(
+        "--roi", action="store_true",
+        help="Run the detector on a crop around the fighters, with periodic full-frame passes"
+    )
+    parser.add_argument(
+        "--detect-every", type=int, default=1, metavar="N",
+        help="Run the detector on every Nth frame and track boxes in between (default: 1)"
+    )
+    parser.add_argument(
+        "--target-fps", type=float, default=None,
+        help="Adapt detector input size and frame skip per camera to hold this frame rate"
+    )
+    parser.add_argument(
+        "--min-imgsz", type=int, default=416,
+        help="Quality floor: smallest detector input size the adaptive controller may use"
+    )
+    parser.add_argument(
+        "--max-skip", type=int, default=3,
+        help="Quality floor: most frames the adaptive controller may leave to the tracker"
+    )
+    parser.add_argument(
+        "--cnn-lstm-streaming", action="store_true",
+        help="Classify back-to-back windows (stride = sequence length), so the ConvLSTM sees each frame once; "
+             "one decision per window instead of one every 4 frames"
+    )
+    parser.add_argument(
+        "--cnn-lstm-scoring", action="store_true",
+        help="Score a hit whenever the ConvLSTM recognises a strike and a stick is in view, "
+             "without waiting for a stick-on-player contact"
+    )
+    parser.add_argument(
+        "--qt-overlay", action="store_true",
+        help="Draw boxes and the score banner with Qt in the feed widget instead of into each frame"
+    )
+    parser.add_argument(
+        "--event-store", default=DEFAULT_EVENT_STORE, metavar="PATH",
+        help=f"SQLite file that keeps every scored hit across restarts (default: {DEFAULT_EVENT_STORE})"
+    )
+    parser.add_argument(
+        "--stream", action="append", default=[], metavar="URL",
+        help="Add a network camera (rtsp://, http:// MJPEG, udp://...) to the camera selectors; repeatable"
+    )
+    args, qt_args = parser.parse_known_args()
+    set_default_backend(args.backend)
+
+    app = QApplication([sys.argv[0]] + qt_args)
+    launched = time.perf_counter()
+
+    splash = SplashScreen()
+    splash.show()
+    app.processEvents()
+
+    # Warm up every input size the adaptive controller may switch to
+    warmup_sizes = {640}
+    if args.target_fps:
+        warmup_sizes |= {imgsz for imgsz, _ in DEFAULT_LADDER if imgsz >= args.min_imgsz}
+
+    loader = StartupLoader(warmup_sizes=warmup_sizes)
+    loader.progress.connect(splash.update_progress)
+    windows = []
+
+    def show_window(preloaded):
+        splash.update_progress(95, "Building interface...")
+        started = time.perf_counter()
+        window = ArnisApp(
+            roi_mode=args.roi,
+            detect_every=args.detect_every,
+            target_fps=args.target_fps,
+            min_imgsz=args.min_imgsz,
+            max_skip=args.max_skip,
+            cnn_lstm_streaming=args.cnn_lstm_streaming,
+            cnn_lstm_scoring=args.cnn_lstm_scoring,
+            preloaded=preloaded,
+            qt_overlay=args.qt_overlay,
+            event_store_path=args.event_store,
+            streams=args.stream,
+        )
+        timings = preloaded.get("timings", {})
+        timings["window"] = time.perf_counter() - started
+        timings["time to window"] = time.perf_counter() - launched
+        log_timings(timings)
+
+        splash.update_progress(100, "Ready!")
+        splash.close()
+        window.show()
+        window.statusBar().showMessage(f"Ready in {timings['time to window']:.1f}s", 5000)
+        windows.append(window)
+
+    loader.loaded.connect(show_window)
+    loader.start()
+
+    sys.exit(app.exec_())
@@ -0,0 +1,92 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from geometry import BLUE_PLAYER, BLUE_STICK
+
+# Everything needed to draw one frame's annotations, already in display coordinates.
+# Drawn with OpenCV by OverlayRenderer.draw or with QPainter by the GUI.
+Overlay = namedtuple("Overlay", "boxes colors labels markers banner")
+
+BLUE = (255, 0, 0)   # BGR
+RED = (0, 0, 255)
+MARKER = (0, 255, 255)
+
+def fit_shape(shape, size):
+    """``shape`` scaled down to fit ``size`` (w, h), keeping the aspect ratio; never upscales."""
+    height, width = shape[:2]
+    if not size:
+        return tuple(shape)
+    box_w, box_h = size
+    scale = min(box_w / width, box_h / height, 1.0)
+    return (max(1, int(height * scale)), max(1, int(width * scale))) + tuple(shape[2:])
+
+class OverlayRenderer:
+    """Draws detections, contact markers and the score banner, and nothing else.
+
+    Replaces ``result.plot()``: the frame is scaled to display size first and
+    annotations are drawn onto that, in a buffer reused from frame to frame.
+    The returned image stays valid until the next ``render`` call.
+    """
+    def __init__(self, names=None):
+        self.names = names or {}
+        self.buffer = None
+
+    def build(self, record, contacts=(), scores=None, scale=1.0):
+        """Overlay primitives for a DetectionRecord, scaled to display coordinates."""
+        if record is None or not len(record):
+            boxes = np.zeros((0, 4), np.int32)
+            colors, labels = [], []
+        else:
+            boxes = np.round(record.xyxy * scale).astype(np.int32)
+            colors = [BLUE if c in (BLUE_PLAYER, BLUE_STICK) else RED for c in record.cls]
+            labels = []
+            for i, class_id in enumerate(record.cls):
+                name = self.names.get(int(class_id), str(class_id))
+                if record.predicted and record.track_id is not None:
+                    labels.append(f"{name} #{record.track_id[i]}")
+                else:
+                    labels.append(f"{name} {record.conf[i]:.2f}")
+
+        # Contact marker at the centre of each stick/player overlap
+        markers = []
+        for contact in contacts or ():
+            s, p = contact.stick_box, contact.player_box
+            x = (max(s[0], p[0]) + min(s[2], p[2])) / 2
+            y = (max(s[1], p[1]) + min(s[3], p[3])) / 2
+            markers.append((int(x * scale), int(y * scale)))
+
+        banner = f"Blue {scores['Blue']}  -  {scores['Red']} Red" if scores else None
+        return Overlay(boxes, colors, labels, markers, banner)
+
+    def render(self, frame, record, contacts=(), scores=None, size=None):
+        """Returns (image, overlay): ``frame`` fitted to ``size`` with annotations drawn on."""
+        shape = fit_shape(frame.shape, size)
+        if self.buffer is None or self.buffer.shape != shape:
+            self.buffer = np.empty(shape, frame.dtype)
+        if shape == frame.shape:
+            np.copyto(self.buffer, frame)
+        else:
+            cv2.resize(frame, (shape[1], shape[0]), dst=self.buffer, interpolation=cv2.INTER_LINEAR)
+        overlay = self.build(record, contacts, scores, shape[1] / frame.shape[1])
+        self.draw(self.buffer, overlay)
+        return self.buffer, overlay
+
+    @staticmethod
+    def draw(image, overlay):
+        thickness = 1 if image.shape[1] < 960 else 2
+        for box, color, label in zip(overlay.boxes, overlay.colors, overlay.labels):
+            x1, y1, x2, y2 = (int(v) for v in box)
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness + 1)
+            cv2.putText(image, label, (x1, max(y1 - 5, 12)), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.4 * thickness, color, thickness, cv2.LINE_AA)
+        for x, y in overlay.markers:
+            cv2.circle(image, (x, y), 6 * thickness, MARKER, thickness + 1, cv2.LINE_AA)
+        if overlay.banner:
+            height = 22 * thickness
+            top = image.shape[0] - height
+            cv2.rectangle(image, (0, top), (image.shape[1], image.shape[0]), (0, 0, 0), -1)
+            cv2.putText(image, overlay.banner, (8, image.shape[0] - 6 * thickness), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.55 * thickness, (255, 255, 255), thickness, cv2.LINE_AA)
+        return image
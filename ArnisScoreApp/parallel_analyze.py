@@ -0,0 +1,167 @@
+"""Scores many match videos, or one long one, on every core.
+
+    python parallel_analyze.py matches/ --out-dir scored/
+    python parallel_analyze.py final.mp4 --segment-seconds 300 --overlap-seconds 3
+
+Each video is cut into segments that run in a process pool. A segment starts
+``overlap`` seconds early and replays that stretch only to rebuild the
+tracker, the CNN+LSTM window and hit debouncing; events are kept only from
+the segment's own first frame. Segments therefore never share a frame's
+events, and a hit streak across a boundary is debounced as in a single pass.
+Events are merged in frame order and running scores recomputed per video.
+"""
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analyze import EventWriter, video_info
+from backends import BACKENDS
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v")
+
+class EventList:
+    """Collects a segment's events for the parent process instead of writing them."""
+    def __init__(self):
+        self.events = []
+
+    @property
+    def count(self):
+        return len(self.events)
+
+    def write(self, event):
+        self.events.append(event)
+
+# ---------------- Planning ----------------
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.append(path)
+    return videos
+
+def plan_segments(video, segment_seconds, overlap_seconds, detect_every=1):
+    """[(start, end, warmup_start)] frame ranges covering the whole video."""
+    fps, frame_count = video_info(video)
+    if frame_count <= 0 or not segment_seconds:
+        return [(0, None, 0)]
+    length = max(1, int(segment_seconds * fps))
+    overlap = int(overlap_seconds * fps)
+    segments = []
+    for start in range(0, frame_count, length):
+        # Align the warm-up so the detector runs on the same frames as a single pass
+        warmup = max(0, start - overlap)
+        warmup -= warmup % detect_every
+        end = start + length if start + length < frame_count else None
+        segments.append((start, end, warmup))
+    return segments
+
+# ---------------- Worker ----------------
+def init_worker(backend, threads):
+    # One pool process per core group; keep each from spreading over every core
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import cv2
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from backends import set_default_backend
+    set_default_backend(backend)
+
+def analyze_segment(video, start, end, warmup, options):
+    from analyze import analyze_video
+    from prediction import Prediction
+
+    prediction = Prediction(roi_mode=options["roi"], detect_every=options["detect_every"])
+    prediction.confidence_threshold = options["conf"]
+    events = EventList()
+    summary = analyze_video(video, events, prediction, start=warmup, end=end,
+                            record_from=start, report_every=0)
+    summary["events"] = events.events
+    return video, start, summary
+
+# ---------------- Merging ----------------
+def merge_events(segments):
+    """Joins per-segment events in frame order and recomputes the running score.
+
+    A segment's own counters include its warm-up hits, so totals are rebuilt
+    from the valid hits instead of taken from the segments.
+    """
+    scores = {"Blue": 0, "Red": 0}
+    merged = []
+    for _, events in sorted(segments, key=lambda item: item[0]):
+        for event in events:
+            event = dict(event)
+            if event["valid"] and event["attacker"] in scores:
+                scores[event["attacker"]] += 1
+            event["blue_score"], event["red_score"] = scores["Blue"], scores["Red"]
+            merged.append(event)
+    return merged, scores
+
+def output_path(video, out_dir, suffix):
+    stem = os.path.splitext(os.path.basename(video))[0]
+    return os.path.join(out_dir or os.path.dirname(os.path.abspath(video)), stem + suffix)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Match videos and/or folders of them")
+    parser.add_argument("--out-dir", help="Where to write <video>_events.jsonl (default: next to each video)")
+    parser.add_argument("--csv", action="store_true", help="Also write <video>_events.csv")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--segment-seconds", type=float, default=300,
+                        help="Split videos into segments of this length; 0 keeps each video whole")
+    parser.add_argument("--overlap-seconds", type=float, default=3,
+                        help="Warm-up replayed before each segment; must cover the 20-frame CNN+LSTM window")
+    parser.add_argument("--backend", choices=BACKENDS, default=os.environ.get("ARNIS_BACKEND", "torch"))
+    parser.add_argument("--conf", type=float, default=0.7)
+    parser.add_argument("--roi", action="store_true")
+    parser.add_argument("--detect-every", type=int, default=1, metavar="N")
+    args = parser.parse_args()
+
+    options = {"roi": args.roi, "detect_every": max(1, args.detect_every), "conf": args.conf}
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    jobs = []
+    for video in find_videos(args.paths):
+        for start, end, warmup in plan_segments(
+                video, args.segment_seconds, args.overlap_seconds, options["detect_every"]):
+            jobs.append((video, start, end, warmup))
+    print(f"{len(jobs)} segments from {len({job[0] for job in jobs})} videos on {args.workers} workers")
+
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    results = {}
+    frames = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=init_worker,
+                             initargs=(args.backend, threads)) as pool:
+        futures = [pool.submit(analyze_segment, *job, options) for job in jobs]
+        for done, future in enumerate(as_completed(futures), start=1):
+            video, start, summary = future.result()
+            results.setdefault(video, []).append((start, summary["events"]))
+            frames += summary["frames"]
+            print(f"[{done}/{len(jobs)}] {os.path.basename(video)} from frame {start}: "
+                  f"{summary['frames']} frames in {summary['seconds']:.0f}s")
+
+    for video in sorted(results):
+        events, scores = merge_events(results[video])
+        writer = EventWriter(
+            output_path(video, args.out_dir, "_events.jsonl"),
+            output_path(video, args.out_dir, "_events.csv") if args.csv else None,
+        )
+        try:
+            for event in events:
+                writer.write(event)
+        finally:
+            writer.close()
+        print(f"{os.path.basename(video)}: Blue {scores['Blue']} - Red {scores['Red']} "
+              f"({len(events)} hit events)")
+
+    elapsed = time.perf_counter() - started
+    print(f"{frames} frames (including warm-up) in {elapsed:.0f}s, {frames / max(elapsed, 1e-9):.1f} FPS overall")
@@ -0,0 +1,150 @@
+import time
+
+from detection import ArnisStrikeDetector, get_yolo_model
+from result_bus import ResultBus, DetectionRecord
+from tracker import MultiObjectTracker
+from overlay import OverlayRenderer
+from geometry import find_contacts, split_classes
+from scoring import ScoringEngine, BoutState
+
+# ---------------- Prediction Class ----------------
+class Prediction:
+    """Runs the models for one camera and feeds the scoring engine.
+
+    The scoring rules live in scoring.ScoringEngine; this class owns the
+    detector, tracker and overlay around them.
+    """
+    VALID_PARTS = ScoringEngine.VALID_PARTS
+    INVALID_PARTS = ScoringEngine.INVALID_PARTS
+
+    def __init__(self, log_callback=None, model=None, scheduler=None, result_bus=None,
+                 roi_mode=False, detect_every=1, adaptive=None, cnn_lstm_streaming=False,
+                 action_scoring=False):
+        from detection import get_model_path
+        self.model = model or get_yolo_model("object_detection.pt")
+        self.convlstm_model_path = get_model_path("convlstm_v3.h5")
+        self.engine = ScoringEngine(confidence_threshold=0.7, action_scoring=action_scoring)
+        self.state = BoutState()
+        self.log_callback = log_callback
+        self.scheduler = scheduler
+        self.result_bus = result_bus or ResultBus()
+        # Detector runs on every Nth frame; the tracker fills in the rest
+        self.tracker = MultiObjectTracker(high_conf=self.confidence_threshold)
+        self.detect_every = max(1, int(detect_every))
+        self.frame_index = 0
+        self.frames_since_detection = 0
+        # Optional AdaptiveController that picks imgsz and detect_every from measured latency
+        self.adaptive = adaptive
+        # Each camera keeps its own detector for the CNN-LSTM frame sequence,
+        # but the YOLO weights are shared through the registry.
+        self.detector = ArnisStrikeDetector(
+            yolo_model=self.model, roi_mode=roi_mode, cnn_lstm_streaming=cnn_lstm_streaming
+        )
+        self.overlay = OverlayRenderer(self.model.names)
+        self.last_record = None
+        self.last_contacts = None
+
+    @property
+    def confidence_threshold(self):
+        return self.engine.confidence_threshold
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value):
+        self.engine.confidence_threshold = value
+
+    @property
+    def scores(self):
+        return self.state.scores
+
+    @scores.setter
+    def scores(self, scores):
+        self.state.scores = scores
+
+    def reset_scores(self):
+        self.state.reset()
+
+    def get_player_confidences(self, camera_number):
+        """Returns the confidence of detected players from the last scored frame."""
+        record = self.result_bus.latest(camera_number)
+        if record is None:
+            return 0.0, 0.0
+        return record.player_confidences(self.confidence_threshold)
+
+    def run_model(self, frame, camera_number, imgsz=None):
+        """Single-frame inference, batched with the other cameras when a scheduler is set."""
+        if self.scheduler is not None:
+            return self.scheduler.infer(camera_number, frame, imgsz, self.confidence_threshold)
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+        return self.model(frame, verbose=False, conf=self.confidence_threshold, **kwargs)[0]
+
+    def current_overlay(self, scale=1.0):
+        """Overlay primitives of the last scored frame, for drawing with Qt instead of OpenCV."""
+        record, contacts = self.last_record, self.last_contacts
+        if record is not None and contacts is None:
+            contacts = find_contacts(record.xyxy, record.cls, record.conf, self.confidence_threshold)
+        return self.overlay.build(record, contacts, self.scores, scale)
+
+    def detect_or_track(self, frame, camera_number, frame_seq):
+        """Returns (record, result, region, offset); result is None on tracked-only frames."""
+        detect_every = self.adaptive.detect_every if self.adaptive else self.detect_every
+        run_detector = self.frame_index % detect_every == 0
+        self.frame_index += 1
+
+        if not run_detector:
+            # Only tracks matched on the last detector frame: a box that has been
+            # coasting longer is stale and could score a phantom hit
+            self.frames_since_detection += 1
+            ids, xyxy, cls, conf = self.tracker.step(max_misses=self.frames_since_detection)
+            record = DetectionRecord(
+                camera_number, self.result_bus.next_seq(camera_number, frame_seq),
+                xyxy, cls, conf, track_id=ids, predicted=True
+            )
+            return self.result_bus.publish_record(record), None, frame, (0, 0)
+
+        region, offset = self.detector.select_region(frame)
+        started = time.perf_counter()
+        result = self.run_model(region, camera_number, self.adaptive.imgsz if self.adaptive else None)
+        if result is None:
+            return None, None, region, offset
+        if self.adaptive:
+            self.adaptive.record(time.perf_counter() - started)
+        self.frames_since_detection = 0
+        record = DetectionRecord.from_result(
+            camera_number, self.result_bus.next_seq(camera_number, frame_seq), result, offset
+        )
+        self.tracker.predict()
+        record.track_id = self.tracker.update(record.xyxy, record.cls, record.conf)
+        self.result_bus.publish_record(record)
+        self.detector.update_roi(record.xyxy, record.cls, frame.shape)
+        return record, result, region, offset
+
+    def process_frame(self, frame, camera_number, frame_seq=None, render=True, display_size=None):
+        """Scores one frame; returns the annotated frame, or ``frame`` itself when not rendering.
+
+        The annotated frame is fitted to ``display_size`` (w, h) when given and
+        lives in a buffer that the next call overwrites.
+        """
+        record, result, region, offset = self.detect_or_track(frame, camera_number, frame_seq)
+        if record is None:
+            return frame
+        by_class = split_classes(record.xyxy, record.cls, record.conf, self.confidence_threshold)
+
+        target_player = self.engine.action_target(by_class)
+        action = None
+        # The ConvLSTM only runs when its actions can score
+        if target_player is not None and self.engine.action_scoring:
+            action = self.detector.detect_action(frame, target_player)
+        event, contacts = self.engine.score(
+            self.state, record.xyxy, record.cls, record.conf, action, by_class
+        )
+        if event is not None and self.log_callback:
+            self.log_callback(event.valid, event.confidence, event.label, camera_number)
+
+        if render and contacts is None:
+            contacts = find_contacts(record.xyxy, record.cls, record.conf, by_class=by_class)
+        self.last_record, self.last_contacts = record, contacts
+
+        if not render:
+            return frame
+        annotated, _ = self.overlay.render(frame, record, contacts, self.scores, display_size)
+        return annotated
@@ -0,0 +1,104 @@
+import time
+from collections import deque
+from threading import Lock
+
+import numpy as np
+
+from geometry import BLUE_PLAYER, RED_PLAYER
+
+class DetectionRecord:
+    """Boxes from one scored frame, copied off the model output once."""
+    __slots__ = ("camera", "frame_seq", "timestamp", "xyxy", "cls", "conf", "track_id", "predicted")
+
+    def __init__(self, camera, frame_seq, xyxy, cls, conf, timestamp=None, track_id=None, predicted=False):
+        self.camera = camera
+        self.frame_seq = frame_seq
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.xyxy = xyxy
+        self.cls = cls
+        self.conf = conf
+        # Tracker ids per box, and whether the boxes are tracker predictions
+        # for a frame the detector skipped
+        self.track_id = track_id
+        self.predicted = predicted
+
+    @classmethod
+    def from_result(cls, camera, frame_seq, result, offset=(0, 0)):
+        """``offset`` shifts boxes from a cropped ROI back to frame coordinates."""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls(camera, frame_seq, np.zeros((0, 4), np.float32),
+                       np.zeros(0, np.int64), np.zeros(0, np.float32))
+        xyxy = boxes.xyxy.cpu().numpy()
+        if offset != (0, 0):
+            xyxy = xyxy + np.array([offset[0], offset[1], offset[0], offset[1]], dtype=xyxy.dtype)
+        return cls(
+            camera, frame_seq,
+            xyxy,
+            boxes.cls.cpu().numpy().astype(np.int64),
+            boxes.conf.cpu().numpy(),
+        )
+
+    def __len__(self):
+        return len(self.cls)
+
+    def best_conf(self, class_id, threshold=0.0):
+        mask = (self.cls == class_id) & (self.conf >= threshold)
+        return float(self.conf[mask].max()) if mask.any() else 0.0
+
+    def player_confidences(self, threshold=0.0):
+        return self.best_conf(BLUE_PLAYER, threshold), self.best_conf(RED_PLAYER, threshold)
+
+class ResultBus:
+    """Publishes every detection result with its frame sequence number.
+
+    The last few records per camera are cached so consumers such as the
+    confidence log or the CNN-LSTM timer can read them instead of running
+    the model again.
+    """
+    def __init__(self, history=8):
+        self.history_size = history
+        self._records = {}
+        self._seq = {}
+        self._subscribers = []
+        self._lock = Lock()
+
+    def next_seq(self, camera, frame_seq=None):
+        with self._lock:
+            if frame_seq is None:
+                frame_seq = self._seq.get(camera, 0) + 1
+            self._seq[camera] = frame_seq
+            return frame_seq
+
+    def publish(self, camera, result, frame_seq=None, offset=(0, 0)):
+        frame_seq = self.next_seq(camera, frame_seq)
+        return self.publish_record(DetectionRecord.from_result(camera, frame_seq, result, offset))
+
+    def publish_record(self, record):
+        camera = record.camera
+        with self._lock:
+            self._records.setdefault(camera, deque(maxlen=self.history_size)).append(record)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(record)
+        return record
+
+    def latest(self, camera):
+        with self._lock:
+            records = self._records.get(camera)
+            return records[-1] if records else None
+
+    def history(self, camera):
+        with self._lock:
+            return list(self._records.get(camera, ()))
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def clear(self, camera=None):
+        with self._lock:
+            if camera is None:
+                self._records.clear()
+            else:
+                self._records.pop(camera, None)
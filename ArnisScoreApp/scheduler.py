@@ -0,0 +1,151 @@
+import time
+import threading
+from concurrent.futures import Future, CancelledError
+
+class _Request:
+    __slots__ = ("frame", "imgsz", "conf", "future", "submitted")
+
+    def __init__(self, frame, imgsz=None, conf=None):
+        self.frame = frame
+        self.imgsz = imgsz
+        self.conf = conf
+        self.future = Future()
+        self.submitted = time.monotonic()
+
+class BatchInferenceScheduler:
+    """Runs the newest frame from every active camera as one batched model call.
+
+    Each camera thread calls ``infer(camera_number, frame)`` and blocks until
+    its ``Results`` object is ready. The worker waits until every registered
+    camera has a frame pending, or until ``max_wait`` seconds have passed since
+    the oldest pending frame, then runs them together. A camera that submits a
+    new frame before its old one was taken replaces it; the old request is
+    cancelled so stale frames are never scored. ``conf`` given with a frame
+    overrides the scheduler's default, so each camera keeps its own threshold.
+    """
+    def __init__(self, model, max_wait=0.03, max_batch=8, **predict_kwargs):
+        self.model = model
+        self.max_wait = float(max_wait)
+        self.max_batch = int(max_batch)
+        self.predict_kwargs = dict(predict_kwargs)
+        self.predict_kwargs.setdefault("verbose", False)
+        self._pending = {}
+        self._active = set()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.batches_run = 0
+        self.frames_run = 0
+
+    # ---------------- Camera registration ----------------
+    def register(self, camera_number):
+        with self._cond:
+            self._active.add(camera_number)
+            self._cond.notify_all()
+
+    def unregister(self, camera_number):
+        with self._cond:
+            self._active.discard(camera_number)
+            request = self._pending.pop(camera_number, None)
+            self._cond.notify_all()
+        if request is not None:
+            request.future.cancel()
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="batch-inference", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._cond.notify_all()
+        for request in pending:
+            request.future.cancel()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # ---------------- Submission ----------------
+    def submit(self, camera_number, frame, imgsz=None, conf=None):
+        if not self._running:
+            self.start()
+        request = _Request(frame, imgsz, conf)
+        with self._cond:
+            stale = self._pending.get(camera_number)
+            self._pending[camera_number] = request
+            self._cond.notify_all()
+        if stale is not None:
+            stale.future.cancel()
+        return request.future
+
+    def infer(self, camera_number, frame, imgsz=None, conf=None):
+        """Blocking helper; returns None if the frame was superseded."""
+        try:
+            return self.submit(camera_number, frame, imgsz, conf).result()
+        except CancelledError:
+            return None
+
+    # ---------------- Worker ----------------
+    def _collect(self):
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._running:
+                return []
+
+            oldest = min(r.submitted for r in self._pending.values())
+            deadline = oldest + self.max_wait
+            while self._running:
+                expected = max(1, len(self._active))
+                remaining = deadline - time.monotonic()
+                if len(self._pending) >= min(expected, self.max_batch) or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # Oldest requests first so no camera is starved past its deadline.
+            keys = sorted(self._pending, key=lambda k: self._pending[k].submitted)
+            return [(k, self._pending.pop(k)) for k in keys[:self.max_batch]]
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                if not self._running:
+                    return
+                continue
+
+            batch = [(k, r) for k, r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            # Cameras on different adaptive input sizes or thresholds cannot share a forward pass
+            groups = {}
+            for key, request in batch:
+                groups.setdefault((request.imgsz, request.conf), []).append(request)
+            for (imgsz, conf), requests in groups.items():
+                self._run_group(imgsz, conf, requests)
+
+    def _run_group(self, imgsz, conf, requests):
+        kwargs = dict(self.predict_kwargs)
+        if imgsz is not None:
+            kwargs["imgsz"] = imgsz
+        if conf is not None:
+            kwargs["conf"] = conf
+        try:
+            results = self.model([r.frame for r in requests], **kwargs)
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.frames_run += len(requests)
+        for request, result in zip(requests, results):
+            request.future.set_result(result)
@@ -0,0 +1,153 @@
+"""Arnis scoring rules, with no Qt and no model in the loop.
+
+ScoringEngine turns one frame's detections, plus the CNN+LSTM action for
+the targeted player when there is one, into at most one HitEvent and
+updates that bout's BoutState. The engine only holds configuration, and a
+BoutState is five slots, so a single process can score hundreds of live
+bouts or replays side by side from stored detections.
+"""
+from cnn_lstm import ACTION_BODY_PARTS
+from geometry import find_contacts, split_classes, BLUE_PLAYER, BLUE_STICK, RED_PLAYER, RED_STICK
+
+NO_ACTION = "no_action"
+
+class BoutState:
+    """Score and hit-debounce state of one bout."""
+    __slots__ = ("blue", "red", "last_hit", "winner", "hits")
+
+    def __init__(self, blue=0, red=0):
+        self.blue = blue
+        self.red = red
+        self.last_hit = None   # attacker of the previous frame's contact, to count a hit once
+        self.winner = None     # attacker of a valid contact on the current frame
+        self.hits = 0
+
+    @property
+    def scores(self):
+        return {"Blue": self.blue, "Red": self.red}
+
+    @scores.setter
+    def scores(self, scores):
+        self.blue, self.red = scores["Blue"], scores["Red"]
+
+    def add_point(self, attacker):
+        if attacker == "Red":
+            self.red += 1
+        else:
+            self.blue += 1
+
+    def reset(self):
+        self.blue = self.red = self.hits = 0
+        self.last_hit = self.winner = None
+
+class HitEvent:
+    """One registered hit and the bout score right after it."""
+    __slots__ = ("attacker", "body_part", "valid", "confidence", "source", "blue_score", "red_score")
+
+    def __init__(self, attacker, body_part, valid, confidence, source, blue_score, red_score):
+        self.attacker = attacker
+        self.body_part = body_part
+        self.valid = valid
+        self.confidence = confidence
+        self.source = source    # "cnn_lstm" or "contact"
+        self.blue_score = blue_score
+        self.red_score = red_score
+
+    @property
+    def label(self):
+        """'Red - Head', the form the GUI logs and analyze.py parse."""
+        return f"{self.attacker} - {self.body_part}"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"HitEvent({self.label}, valid={self.valid}, {self.blue_score}-{self.red_score})"
+
+class ScoringEngine:
+    VALID_PARTS = [
+        "Head", "Body", "Legs", "Chest & Abdomen",
+        "Side of the Body", "Upper Extremities", "Lower Extremities"
+    ]
+    INVALID_PARTS = ["Back of the Head", "Throat", "Hitting the Groin", "Back"]
+    __slots__ = ("confidence_threshold", "action_scoring")
+
+    def __init__(self, confidence_threshold=0.7, action_scoring=False):
+        self.confidence_threshold = confidence_threshold
+        # Off by default: an action scores without a contact and without the last_hit debounce
+        self.action_scoring = action_scoring
+
+    def split(self, xyxy, cls, conf):
+        return split_classes(xyxy, cls, conf, self.confidence_threshold)
+
+    @staticmethod
+    def action_target(by_class):
+        """The player box the CNN+LSTM should classify: the first red player, else the first blue one."""
+        red_players = by_class[RED_PLAYER][0]
+        if len(red_players):
+            return red_players[0]
+        blue_players = by_class[BLUE_PLAYER][0]
+        return blue_players[0] if len(blue_players) else None
+
+    @staticmethod
+    def map_invalid_hit(classified_part, player_box):
+        if classified_part == "Head":
+            px1, py1, px2, py2 = player_box
+            if py1 < py1 + (py2 - py1) * -0.25:
+                return "Back of the Head"
+        return classified_part
+
+    def score(self, state, xyxy, cls, conf, action=None, by_class=None):
+        """Scores one frame into ``state``; returns (HitEvent or None, contacts or None).
+
+        ``action`` is the (label, confidence) the CNN+LSTM gave for
+        ``action_target``. With ``action_scoring`` on, a recognised action
+        counts when a stick of either colour is in view; otherwise the first
+        new stick-on-opponent contact is scored. ``contacts`` is returned when it was computed, so callers
+        can draw it without a second pass.
+        """
+        if by_class is None:
+            by_class = self.split(xyxy, cls, conf)
+        state.winner = None
+
+        label, action_conf = action or (NO_ACTION, 0.0)
+        if self.action_scoring and label != NO_ACTION:
+            attacker = None
+            if len(by_class[RED_STICK][0]):
+                attacker = "Red"
+            elif len(by_class[BLUE_STICK][0]):
+                attacker = "Blue"
+            if attacker is not None:
+                body_part = ACTION_BODY_PARTS.get(label, label)
+                valid = body_part in self.VALID_PARTS
+                if valid:
+                    state.add_point(attacker)
+                state.hits += 1
+                return HitEvent(attacker, body_part, valid, action_conf, "cnn_lstm",
+                                state.blue, state.red), None
+
+        # Contacts come red-stick-on-blue first, in detection order
+        contacts = find_contacts(xyxy, cls, conf, by_class=by_class)
+        for contact in contacts:
+            if state.last_hit == contact.attacker:
+                continue
+            body_part = self.map_invalid_hit(contact.body_part, contact.player_box)
+            valid = body_part not in self.INVALID_PARTS and body_part != "Invalid"
+            if valid:
+                state.add_point(contact.attacker)
+            state.winner = contact.attacker if valid else None
+            state.last_hit = contact.attacker
+            state.hits += 1
+            return HitEvent(contact.attacker, body_part, valid, contact.conf * 100.0, "contact",
+                            state.blue, state.red), contacts
+
+        state.last_hit = None
+        return None, contacts
+
+    def replay(self, detections, state=None):
+        """Scores a stream of (xyxy, cls, conf, action) tuples; yields (index, HitEvent)."""
+        state = state or BoutState()
+        for index, (xyxy, cls, conf, action) in enumerate(detections):
+            event, _ = self.score(state, xyxy, cls, conf, action)
+            if event is not None:
+                yield index, event
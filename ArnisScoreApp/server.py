@@ -0,0 +1,335 @@
+"""Headless multi-court scoring server.
+
+    python server.py --court 1=court1.mp4 --court 2=court2.mp4 --port 8080
+    python server.py --court 1=0 --court 2=1          # two local cameras
+    python server.py --court 1=rtsp://10.0.0.5/stream --court 2=http://10.0.0.6:8080/video
+
+Each court has its own frame source and Prediction; the YOLO detector runs
+for all courts in shared batches (BatchInferenceScheduler). A court scores
+one frame at a time on a shared thread pool and its source only ever hands
+over the newest frame, so a slow stream skips frames instead of queueing
+them, and never holds more than its own pool slot. Clients get hits and
+scores over a WebSocket; a client that cannot keep up loses its oldest
+messages, not the server's time.
+
+HTTP API:
+    GET  /courts                every court's score and stream stats
+    GET  /courts/{id}           one court
+    GET  /courts/{id}/events    hits so far (?since=<n> for hits after the first n)
+    POST /courts/{id}/reset     zero the court's score
+    GET  /ws[?court=<id>]       WebSocket of {"type": "hit" | "score" | "status", ...}
+"""
+import os
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from aiohttp import web, WSMsgType
+
+from backends import BACKENDS, set_default_backend
+from frame_source import open_source
+
+class Court:
+    """One video source and the Prediction that scores it."""
+    MAX_EVENTS = 10000   # hits kept for /events; the event store keeps everything
+
+    def __init__(self, court_id, spec, prediction, source):
+        self.id = court_id
+        self.spec = spec
+        self.prediction = prediction
+        self.source = source
+        self.lock = Lock()
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self.event_count = 0
+        self.pending = []
+        self.frames = 0
+        self.fps = 0.0
+        self.last_ms = 0.0
+        self.status = "starting"
+        prediction.log_callback = lambda valid, confidence, label, camera: self.pending.append(
+            (valid, confidence, label)
+        )
+
+    def step(self, timeout=0.5):
+        """Reads and scores the newest frame (worker thread). Returns new hit events, or None if no frame."""
+        item = self.source.read(timeout)
+        if item is None:
+            return None
+        index, timestamp, frame = item
+        started = time.perf_counter()
+        with self.lock:
+            self.prediction.process_frame(frame, self.id, frame_seq=index, render=False)
+            hits, self.pending = self.pending, []
+            scores = dict(self.prediction.scores)
+        self.source.release(frame)
+
+        elapsed = time.perf_counter() - started
+        self.last_ms = elapsed * 1000.0
+        self.frames += 1
+        self.status = "running"
+        now = time.time()
+        events = []
+        for valid, confidence, label in hits:
+            attacker, _, body_part = label.partition(" - ")
+            events.append({
+                "type": "hit", "court": self.id, "frame": index, "stream_time": round(timestamp, 3),
+                "time": now, "attacker": attacker, "body_part": body_part, "valid": bool(valid),
+                "confidence": round(float(confidence), 2),
+                "blue_score": scores["Blue"], "red_score": scores["Red"],
+            })
+        self.events.extend(events)
+        self.event_count += len(events)
+        return events
+
+    def reset(self):
+        with self.lock:
+            self.prediction.reset_scores()
+            self.prediction.tracker.reset()
+
+    def info(self):
+        with self.lock:
+            scores = dict(self.prediction.scores)
+        return {
+            "court": self.id, "source": str(self.spec), "status": self.status,
+            "blue_score": scores["Blue"], "red_score": scores["Red"], "hits": self.event_count,
+            "frames": self.frames, "fps": round(self.fps, 1), "frame_ms": round(self.last_ms, 1),
+            "dropped": self.source.dropped,
+            **({"stream": self.source.stats()} if hasattr(self.source, "stats") else {}),
+        }
+
+class Client:
+    """One WebSocket subscriber with a bounded outbox; when full, the oldest message goes."""
+    MAX_QUEUED = 256
+
+    def __init__(self, court=None):
+        self.court = court
+        self.outbox = deque(maxlen=self.MAX_QUEUED)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, message):
+        if self.court is not None and message.get("court") not in (None, self.court):
+            return
+        if len(self.outbox) == self.outbox.maxlen:
+            self.dropped += 1
+        self.outbox.append(message)
+        self.ready.set()
+
+class ScoringServer:
+    STATUS_INTERVAL = 1.0
+
+    def __init__(self, courts, scheduler, event_store=None):
+        self.courts = {court.id: court for court in courts}
+        self.scheduler = scheduler
+        self.event_store = event_store
+        # One slot per court: a court has at most one frame in flight
+        self.pool = ThreadPoolExecutor(max_workers=max(1, len(courts)), thread_name_prefix="court")
+        self.clients = set()
+        self.tasks = []
+        self.stopping = False
+
+    # ---------------- Court loops ----------------
+    async def run_court(self, court):
+        loop = asyncio.get_running_loop()
+        window_start, window_frames = time.monotonic(), 0
+        while not self.stopping:
+            try:
+                events = await loop.run_in_executor(self.pool, court.step)
+            except Exception as e:
+                print(f"Court {court.id}: {e}")
+                self.end_court(court, f"error: {e}")
+                return
+            if events is None:
+                if court.source.closed:
+                    self.end_court(court, "finished")
+                    return
+                continue
+
+            window_frames += 1
+            now = time.monotonic()
+            if now - window_start >= self.STATUS_INTERVAL:
+                court.fps = window_frames / (now - window_start)
+                window_start, window_frames = now, 0
+            for event in events:
+                if self.event_store is not None:
+                    self.event_store.record(
+                        court.id, event["valid"], event["confidence"], event["attacker"], event["body_part"],
+                        {"Blue": event["blue_score"], "Red": event["red_score"]}, timestamp=event["time"],
+                    )
+                self.publish(event)
+                self.publish({"type": "score", "court": court.id,
+                              "blue_score": event["blue_score"], "red_score": event["red_score"]})
+
+    def end_court(self, court, status):
+        """Stops batching for a court whose loop has exited, so the others no longer wait for its frames."""
+        self.scheduler.unregister(court.id)
+        court.status = status
+        self.publish({"type": "status", **court.info()})
+
+    async def report_status(self):
+        while not self.stopping:
+            await asyncio.sleep(self.STATUS_INTERVAL)
+            for court in self.courts.values():
+                self.publish({"type": "status", **court.info()})
+
+    def publish(self, message):
+        for client in self.clients:
+            client.push(message)
+
+    # ---------------- HTTP / WebSocket ----------------
+    def court_or_404(self, request):
+        try:
+            return self.courts[int(request.match_info["court"])]
+        except (KeyError, ValueError):
+            raise web.HTTPNotFound(text="No such court")
+
+    @staticmethod
+    def int_query(request, name, default=None):
+        value = request.query.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise web.HTTPBadRequest(text=f"{name} must be an integer")
+
+    async def list_courts(self, request):
+        return web.json_response([court.info() for court in self.courts.values()])
+
+    async def get_court(self, request):
+        return web.json_response(self.court_or_404(request).info())
+
+    async def get_events(self, request):
+        court = self.court_or_404(request)
+        since = self.int_query(request, "since", 0)
+        # Only the newest MAX_EVENTS are kept in memory
+        first = court.event_count - len(court.events)
+        events = list(court.events)[max(0, since - first):]
+        return web.json_response({"court": court.id, "total": court.event_count, "events": events})
+
+    async def reset_court(self, request):
+        court = self.court_or_404(request)
+        # Waits for the court's frame in flight, so run it off the event loop
+        await asyncio.get_running_loop().run_in_executor(self.pool, court.reset)
+        self.publish({"type": "score", "court": court.id, "blue_score": 0, "red_score": 0})
+        return web.json_response(court.info())
+
+    async def websocket(self, request):
+        court = self.int_query(request, "court")
+        ws = web.WebSocketResponse(heartbeat=20.0)
+        await ws.prepare(request)
+        client = Client(court)
+        for info in self.courts.values():
+            client.push({"type": "status", **info.info()})
+        self.clients.add(client)
+        sender = asyncio.create_task(self.send_loop(ws, client))
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+        return ws
+
+    async def send_loop(self, ws, client):
+        try:
+            while not ws.closed:
+                await client.ready.wait()
+                client.ready.clear()
+                while client.outbox:
+                    await ws.send_json(client.outbox.popleft())
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+
+    # ---------------- Lifecycle ----------------
+    def make_app(self):
+        app = web.Application()
+        app.add_routes([
+            web.get("/courts", self.list_courts),
+            web.get("/courts/{court}", self.get_court),
+            web.get("/courts/{court}/events", self.get_events),
+            web.post("/courts/{court}/reset", self.reset_court),
+            web.get("/ws", self.websocket),
+        ])
+        app.on_startup.append(self.on_startup)
+        app.on_shutdown.append(self.on_shutdown)
+        return app
+
+    async def on_startup(self, app):
+        for court in self.courts.values():
+            self.scheduler.register(court.id)
+            self.tasks.append(asyncio.create_task(self.run_court(court)))
+        self.tasks.append(asyncio.create_task(self.report_status()))
+
+    async def on_shutdown(self, app):
+        self.stopping = True
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for court in self.courts.values():
+            court.source.close()
+        self.scheduler.stop()
+        self.pool.shutdown(wait=True)
+        if self.event_store is not None:
+            self.event_store.close()
+
+def parse_court(text, default_id):
+    """'2=match.mp4' -> (2, 'match.mp4'); a bare source gets the next free id."""
+    court_id, sep, spec = text.partition("=")
+    if sep and court_id.isdigit():
+        return int(court_id), spec
+    return default_id, text
+
+def build_courts(specs, args):
+    from detection import get_yolo_model
+    from prediction import Prediction
+    from scheduler import BatchInferenceScheduler
+
+    model = get_yolo_model("object_detection.pt")
+    scheduler = BatchInferenceScheduler(model, max_wait=args.batch_wait, conf=args.conf)
+    courts = []
+    for court_id, spec in specs:
+        prediction = Prediction(model=model, scheduler=scheduler, roi_mode=args.roi,
+                                detect_every=args.detect_every)
+        prediction.confidence_threshold = args.conf
+        source = open_source(spec, resize=args.resize).start()
+        courts.append(Court(court_id, spec, prediction, source))
+        print(f"Court {court_id}: {spec}")
+    return courts, scheduler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--court", action="append", required=True, metavar="[ID=]SOURCE",
+                        help="A video file, camera index or stream URL; repeat once per court")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--backend", choices=BACKENDS, default=os.environ.get("ARNIS_BACKEND", "torch"))
+    parser.add_argument("--conf", type=float, default=0.7)
+    parser.add_argument("--roi", action="store_true")
+    parser.add_argument("--detect-every", type=int, default=1, metavar="N")
+    parser.add_argument("--batch-wait", type=float, default=0.03,
+                        help="Seconds a frame may wait for the other courts' frames to batch with")
+    parser.add_argument("--resize", type=int, nargs=2, metavar=("W", "H"),
+                        help="Scale frames on the capture thread before scoring")
+    parser.add_argument("--event-store", metavar="PATH", help="Also record every hit in this SQLite event store")
+    args = parser.parse_args()
+    set_default_backend(args.backend)
+
+    specs = []
+    for text in args.court:
+        court_id, spec = parse_court(text, len(specs) + 1)
+        if court_id in {existing for existing, _ in specs}:
+            parser.error(f"Court {court_id} given twice")
+        specs.append((court_id, spec))
+
+    courts, scheduler = build_courts(specs, args)
+    event_store = None
+    if args.event_store:
+        from event_store import EventStore
+        event_store = EventStore(args.event_store)
+    server = ScoringServer(courts, scheduler, event_store)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
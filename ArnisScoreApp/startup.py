@@ -0,0 +1,88 @@
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from camera import list_cameras
+from detection import get_model_path, get_yolo_model
+
+class StartupLoader(QThread):
+    """Loads everything ArnisApp needs in background workers while the splash is up.
+
+    The detector, the CNN+LSTM model and the camera probe run in parallel;
+    each model gets one warm-up inference so the first live frame does not pay
+    for lazy initialisation. ``progress`` reports each finished milestone and
+    ``loaded`` delivers the objects for ``ArnisApp(preloaded=...)``.
+    """
+    progress = pyqtSignal(int, str)
+    loaded = pyqtSignal(dict)
+
+    def __init__(self, warmup_sizes=(640,), parent=None):
+        super().__init__(parent)
+        self.warmup_sizes = sorted(set(warmup_sizes), reverse=True)
+        self.timings = {}
+
+    # ---------------- Steps ----------------
+    def load_detector(self):
+        model = get_yolo_model("object_detection.pt")
+        start = time.perf_counter()
+        blank = np.zeros((max(self.warmup_sizes), max(self.warmup_sizes), 3), dtype=np.uint8)
+        for imgsz in self.warmup_sizes:
+            model(blank, imgsz=imgsz, verbose=False)
+        self.timings["detector warm-up"] = time.perf_counter() - start
+        return model
+
+    def load_cnn_lstm(self):
+        from cnn_lstm import load_convlstm
+        model = load_convlstm(get_model_path("convlstm_v3.h5"))
+        start = time.perf_counter()
+        _, length, height, width, channels = model.input_shape
+        model(np.zeros((1, length, height, width, channels), np.float32), training=False)
+        self.timings["CNN+LSTM warm-up"] = time.perf_counter() - start
+        return model
+
+    def probe_cameras(self):
+        return list_cameras() or [0]
+
+    # ---------------- Thread ----------------
+    def run(self):
+        started = time.perf_counter()
+        steps = {
+            "yolo_model": ("detector", "Detector loaded", self.load_detector),
+            "cnn_lstm_model": ("CNN+LSTM", "CNN+LSTM model loaded", self.load_cnn_lstm),
+            "cameras": ("camera probe", "Cameras found", self.probe_cameras),
+        }
+        self.progress.emit(5, "Loading models and probing cameras...")
+
+        preloaded = {}
+        with ThreadPoolExecutor(max_workers=len(steps)) as pool:
+            futures = {
+                pool.submit(self.timed, label, step): (key, message)
+                for key, (label, message, step) in steps.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                key, message = futures[future]
+                try:
+                    preloaded[key] = future.result()
+                except Exception as e:
+                    # ArnisApp retries anything missing and reports the error itself
+                    print(f"Startup: {key} failed: {e}")
+                    message = f"{message.split()[0]} failed"
+                self.progress.emit(5 + 85 * done // len(steps), message + "...")
+
+        self.timings["background total"] = time.perf_counter() - started
+        preloaded["timings"] = self.timings
+        self.loaded.emit(preloaded)
+
+    def timed(self, label, step):
+        start = time.perf_counter()
+        try:
+            return step()
+        finally:
+            self.timings[label] = time.perf_counter() - start
+
+def log_timings(timings):
+    breakdown = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    print(f"[{datetime.datetime.now():%H:%M:%S}] Startup timings: {breakdown}")
@@ -0,0 +1,80 @@
+import pytest
+
+from adaptive import AdaptiveController
+
+def controller(**kwargs):
+    # smoothing=1 makes the tracked latency the last sample, so each window sees exactly what it was fed
+    kwargs = {"target_fps": 30.0, "window": 3, "smoothing": 1.0, **kwargs}
+    return AdaptiveController(**kwargs)
+
+def feed(adaptive, latency, windows=1):
+    for _ in range(adaptive.window * windows):
+        adaptive.record(latency)
+
+def test_quality_floor_trims_the_ladder():
+    adaptive = controller(min_imgsz=416, max_skip=3)
+    assert adaptive.ladder == [(640, 1), (640, 2), (512, 2), (512, 3), (416, 3)]
+    with pytest.raises(ValueError):
+        controller(min_imgsz=1024)
+
+def test_decides_once_per_window():
+    adaptive = controller()
+    assert adaptive.sustainable_fps() == float("inf")
+    adaptive.record(0.05)
+    adaptive.record(0.05)
+    assert adaptive.level == 0
+    adaptive.record(0.05)
+    assert (adaptive.imgsz, adaptive.detect_every) == (640, 2)
+
+def test_steps_down_while_below_target():
+    messages = []
+    adaptive = controller(name="Camera 1", log_callback=messages.append)
+    # 20 FPS at every frame; skipping every other frame holds 40
+    feed(adaptive, 0.05, windows=3)
+    assert (adaptive.imgsz, adaptive.detect_every) == (640, 2)
+    assert [(old, new) for _, old, new in adaptive.changes] == [((640, 1), (640, 2))]
+    assert messages[0].startswith("Camera 1: stepping down to imgsz=640, detect every 2")
+
+def test_rescales_latency_to_the_new_size():
+    adaptive = controller()
+    adaptive.level = 1
+    # (640, 2) at 100 ms holds 20 FPS
+    feed(adaptive, 0.1)
+    assert (adaptive.imgsz, adaptive.detect_every) == (512, 2)
+    assert adaptive.latency == pytest.approx(0.1 * (512 / 640) ** 2)
+    assert adaptive.sustainable_fps() == pytest.approx(2 / 0.064)
+    # The rescaled estimate already holds the target, so a matching measurement keeps the level
+    feed(adaptive, 0.064, windows=3)
+    assert adaptive.level == 2
+
+def test_sustainable_fps_of_another_level():
+    adaptive = controller()
+    adaptive.level = 2
+    adaptive.latency = 0.064
+    assert adaptive.sustainable_fps(0) == pytest.approx(1 / 0.1)
+    assert adaptive.sustainable_fps(4, latency=0.1) == pytest.approx(3 / (0.1 * (416 / 512) ** 2))
+
+def test_steps_up_only_with_headroom():
+    adaptive = controller(headroom=1.25)
+    adaptive.level = 1
+    # (640, 1) would hold 33 FPS: above target, but not by the 25% headroom
+    feed(adaptive, 0.03, windows=3)
+    assert adaptive.level == 1
+    # 40 FPS clears 30 * 1.25
+    feed(adaptive, 0.025)
+    assert adaptive.level == 0
+    assert adaptive.changes[-1][1:] == ((640, 2), (640, 1))
+
+def test_steps_up_one_rung_at_a_time():
+    adaptive = controller()
+    adaptive.level = 4
+    adaptive.latency = 0.001
+    feed(adaptive, 0.001, windows=2)
+    assert adaptive.level == 2
+
+def test_stops_at_the_floor():
+    adaptive = controller(min_imgsz=416, max_skip=3)
+    # Far too slow for any level: walks down to the last allowed rung and stays there
+    feed(adaptive, 1.0, windows=10)
+    assert (adaptive.imgsz, adaptive.detect_every) == (416, 3)
+    assert len(adaptive.changes) == len(adaptive.ladder) - 1
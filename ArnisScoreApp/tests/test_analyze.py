@@ -0,0 +1,110 @@
+"""analyze_video on a generated clip, with a stub detector in place of YOLO."""
+import csv
+import json
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from analyze import EVENT_FIELDS, EventWriter, analyze_video
+from geometry import BLUE_PLAYER, RED_STICK
+from prediction import Prediction
+
+FPS = 25
+FRAMES = 25
+# Red's stick is on Blue's head in these frames; every other frame is empty
+HIT_FRAMES = (5, 12, 20)
+
+class Boxes:
+    def __init__(self, xyxy, cls, conf):
+        self.xyxy, self.cls, self.conf = (Tensor(np.asarray(a)) for a in (xyxy, cls, conf))
+
+    def __len__(self):
+        return len(self.cls.array)
+
+class Tensor:
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+class Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+class StubDetector:
+    """Sees a red head strike on bright frames and nothing on dark ones."""
+    names = {0: "Blue Player", 1: "Blue Stick", 2: "Red Player", 3: "Red Stick"}
+
+    def __call__(self, frame, **kwargs):
+        if frame.mean() > 128:
+            boxes = Boxes(np.array([[0, 0, 50, 100], [20, 5, 30, 15]], np.float32),
+                          np.array([BLUE_PLAYER, RED_STICK]), np.array([0.9, 0.85], np.float32))
+        else:
+            boxes = Boxes(np.zeros((0, 4), np.float32), np.zeros(0), np.zeros(0, np.float32))
+        return [Result(boxes)]
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("clip") / "bout.mp4")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (64, 48))
+    if not out.isOpened():
+        pytest.skip("OpenCV cannot write mp4 here")
+    for i in range(FRAMES):
+        out.write(np.full((48, 64, 3), 255 if i in HIT_FRAMES else 0, np.uint8))
+    out.release()
+    return path
+
+def analyze(clip, tmp_path, **kwargs):
+    jsonl, csv_path = tmp_path / "hits.jsonl", tmp_path / "hits.csv"
+    writer = EventWriter(str(jsonl), str(csv_path))
+    try:
+        summary = analyze_video(clip, writer, Prediction(model=StubDetector()), report_every=0, **kwargs)
+    finally:
+        writer.close()
+    events = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    with open(csv_path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    return summary, events, rows
+
+def test_writes_every_hit_to_jsonl_and_csv(clip, tmp_path):
+    summary, events, rows = analyze(clip, tmp_path)
+    assert summary["frames"] == FRAMES
+    assert summary["events"] == 3
+    assert summary["scores"] == {"Blue": 0, "Red": 3}
+
+    assert [e["frame"] for e in events] == list(HIT_FRAMES)
+    assert events[0] == {
+        "frame": 5, "timestamp": round(5 / FPS, 3), "attacker": "Red", "body_part": "Head",
+        "valid": True, "confidence": 85.0, "blue_score": 0, "red_score": 1,
+    }
+    assert [e["red_score"] for e in events] == [1, 2, 3]
+
+    assert list(rows[0]) == EVENT_FIELDS
+    assert [row["frame"] for row in rows] == [str(f) for f in HIT_FRAMES]
+    assert rows[2]["red_score"] == "3" and rows[2]["valid"] == "True"
+
+def test_record_from_scores_but_does_not_write_warm_up_frames(clip, tmp_path):
+    # A parallel_analyze segment: starts early to warm up, owns frames from 10 on
+    summary, events, rows = analyze(clip, tmp_path, start=3, record_from=10)
+    assert summary["frames"] == FRAMES - 3
+    # The hit at frame 5 still counts towards the score, it is just not written
+    assert [(e["frame"], e["red_score"]) for e in events] == [(12, 2), (20, 3)]
+    assert len(rows) == 2 and summary["events"] == 2
+
+def test_end_is_exclusive(clip, tmp_path):
+    summary, events, _ = analyze(clip, tmp_path, start=6, end=20)
+    assert summary["frames"] == 14
+    assert [e["frame"] for e in events] == [12]
+
+def test_writes_annotated_video(clip, tmp_path):
+    annotated = str(tmp_path / "annotated.mp4")
+    analyze(clip, tmp_path, video_path=annotated)
+    cap = cv2.VideoCapture(annotated)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == FRAMES
+    cap.release()
@@ -0,0 +1,72 @@
+"""Backend selection, and output parity of the exported detectors against PyTorch.
+
+The parity test needs ultralytics, the trained weights in models/ and the
+runtime under test; it is skipped when any of them is missing. Point
+ARNIS_PARITY_IMAGES at a folder of match frames to check real detections.
+"""
+import os
+import glob
+
+import pytest
+
+import backends
+from backends import compare_backends, resolve_backend
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+WEIGHTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "object_detection.pt")
+
+def parity_images():
+    folder = os.environ.get("ARNIS_PARITY_IMAGES", os.path.join(REPO_ROOT, "images"))
+    return sorted(
+        path for pattern in ("*.jpg", "*.jpeg", "*.png") for path in glob.glob(os.path.join(folder, pattern))
+    )
+
+@pytest.fixture
+def installed(monkeypatch):
+    """Pretends exactly the given runtimes are installed."""
+    def install(*modules):
+        monkeypatch.setattr(backends, "is_installed", lambda name: name in modules)
+    return install
+
+# ---------------- resolve_backend ----------------
+def test_auto_prefers_openvino_then_onnx(installed):
+    installed("openvino", "onnxruntime")
+    assert resolve_backend("auto") == "openvino"
+    installed("onnxruntime")
+    assert resolve_backend("auto") == "onnx"
+    installed()
+    assert resolve_backend("auto") == "torch"
+
+def test_missing_runtime_falls_back(installed):
+    installed()
+    assert resolve_backend("onnx") == "torch"
+    assert resolve_backend("int8") == "torch"
+    assert resolve_backend("openvino") == "torch"
+    installed("onnxruntime")
+    assert resolve_backend("openvino") == "onnx"
+
+def test_installed_runtime_is_used(installed):
+    installed("onnxruntime", "openvino")
+    for name in ("torch", "onnx", "int8", "openvino"):
+        assert resolve_backend(name) == name
+
+# ---------------- Output parity ----------------
+@pytest.mark.parametrize("backend, runtime", [
+    ("onnx", "onnxruntime"), ("openvino", "openvino"), ("int8", "onnxruntime"),
+])
+def test_backend_matches_torch(backend, runtime):
+    pytest.importorskip("ultralytics")
+    pytest.importorskip(runtime)
+    if resolve_backend(backend) != backend:
+        pytest.skip(f"{backend} backend not available")
+    if not os.path.exists(WEIGHTS):
+        pytest.skip("models/object_detection.pt not found")
+    if backend == "int8" and not os.path.exists(backends.exported_path(WEIGHTS, "int8")):
+        pytest.skip("no INT8 model; build it with quantize.py")
+    images = parity_images()
+    if not images:
+        pytest.skip("no images to compare on")
+
+    # Quantization moves boxes and scores slightly; INT8 gets a looser match
+    min_iou, conf_tol = (0.8, 0.1) if backend == "int8" else (0.9, 0.05)
+    assert compare_backends(WEIGHTS, images, backend, min_iou=min_iou, conf_tol=conf_tol) == []
@@ -0,0 +1,134 @@
+"""CNNLSTMModel's window ring buffer and decision cadence, on a stub ConvLSTM."""
+import numpy as np
+import pytest
+
+from cnn_lstm import CLASSES_LIST, CNNLSTMModel, predict_batch
+
+SEQUENCE_LENGTH = 6
+SIZE = 8
+
+class StubConvLSTM:
+    """Records each batch and answers with fixed probabilities per call."""
+
+    def __init__(self, answers=None):
+        self.batches = []
+        self.answers = list(answers or [])
+
+    def __call__(self, batch, training=False):
+        self.batches.append(np.array(batch))
+        probabilities = np.zeros((len(batch), len(CLASSES_LIST)), np.float32)
+        index = self.answers.pop(0) if self.answers else 0
+        probabilities[:, index] = 0.9
+        return probabilities
+
+def camera(model=None, **kwargs):
+    camera = CNNLSTMModel(sequence_length=SEQUENCE_LENGTH, image_size=(SIZE, SIZE), **kwargs)
+    camera.model = model or StubConvLSTM()
+    return camera
+
+def frame(value):
+    return np.full((SIZE, SIZE, 3), value, dtype=np.uint8)
+
+def run(camera, frames):
+    """Feeds frames one at a time as detect_action does; returns the frame numbers that ran the model."""
+    ran = []
+    for i in frames:
+        camera.add_frame(frame(i))
+        if predict_batch([camera]):
+            ran.append(i)
+    return ran
+
+# ---------------- Streaming cadence ----------------
+def test_streaming_classifies_back_to_back_windows():
+    streaming = camera(streaming=True)
+    assert streaming.stride == SEQUENCE_LENGTH
+    assert run(streaming, range(4 * SEQUENCE_LENGTH)) == [5, 11, 17, 23]
+    # Every frame goes through the ConvLSTM exactly once
+    windows = [batch[0, :, 0, 0, 0] * 255 for batch in streaming.model.batches]
+    np.testing.assert_allclose(np.concatenate(windows), np.arange(4 * SEQUENCE_LENGTH), atol=1e-4)
+
+def test_windowed_default_reruns_overlapping_windows():
+    windowed = camera(stride=2)
+    assert run(windowed, range(12)) == [5, 7, 9, 11]
+
+# ---------------- Ring buffer ----------------
+def test_ready_after_a_full_window_then_every_stride():
+    windowed = camera(stride=3)
+    readiness = []
+    for i in range(12):
+        windowed.add_frame(frame(i))
+        readiness.append(windowed.ready())
+        if readiness[-1]:
+            windowed.sequence()
+    assert [i for i, ready in enumerate(readiness) if ready] == [5, 8, 11]
+
+def test_sequence_is_oldest_first_across_the_wrap():
+    windowed = camera()
+    for i in range(SEQUENCE_LENGTH + 4):
+        windowed.add_frame(frame(i * 10))
+    window = windowed.sequence()
+    assert window.shape == (SEQUENCE_LENGTH, SIZE, SIZE, 3)
+    assert window[:, 0, 0, 0].tolist() == [40, 50, 60, 70, 80, 90]
+    # A copy: later frames must not change a window already handed out
+    windowed.add_frame(frame(200))
+    assert window[0, 0, 0, 0] == 40
+
+def test_frames_are_resized_into_the_ring():
+    windowed = camera()
+    windowed.add_frame(np.zeros((50, 30, 3), np.uint8))
+    assert windowed.frames.shape == (SEQUENCE_LENGTH, SIZE, SIZE, 3)
+
+def test_an_action_is_reported_once():
+    head, chest = CLASSES_LIST.index("head & face"), CLASSES_LIST.index("chest & abdomen")
+    windowed = camera(StubConvLSTM([head, head, chest]), stride=1)
+    reported = []
+    for i in range(SEQUENCE_LENGTH + 2):
+        windowed.add_frame(frame(i))
+        reported.append(windowed.predict())
+    assert [action for action, _ in reported] == (
+        ["no_action"] * (SEQUENCE_LENGTH - 1) + ["head & face", "no_action", "chest & abdomen"]
+    )
+    assert reported[SEQUENCE_LENGTH - 1][1] == pytest.approx(0.9)
+
+def test_low_confidence_is_no_action_and_rearms():
+    head = CLASSES_LIST.index("head & face")
+    windowed = camera(min_confidence=0.95)
+    windowed.set_prediction(np.eye(len(CLASSES_LIST))[head] * 0.9)
+    assert windowed.predict() == ("no_action", 0.0)
+    windowed.min_confidence = 0.8
+    windowed.set_prediction(np.eye(len(CLASSES_LIST))[head] * 0.9)
+    assert windowed.predict()[0] == "head & face"
+    # The same strike still on screen is not reported again until something else was seen
+    windowed.set_prediction(np.eye(len(CLASSES_LIST))[head] * 0.9)
+    assert windowed.predict()[0] == "no_action"
+
+def test_reset_starts_a_new_window():
+    windowed = camera(stride=1)
+    run(windowed, range(SEQUENCE_LENGTH))
+    windowed.reset_sequence()
+    assert run(windowed, range(SEQUENCE_LENGTH)) == [SEQUENCE_LENGTH - 1]
+
+def test_batched_cameras_share_one_model_call():
+    model = StubConvLSTM()
+    cameras = [camera(model), camera(model), camera(model)]
+    for i in range(SEQUENCE_LENGTH):
+        for c in cameras[:2]:
+            c.add_frame(frame(i))
+    assert predict_batch(cameras) == 2
+    assert len(model.batches) == 1 and model.batches[0].shape == (2, SEQUENCE_LENGTH, SIZE, SIZE, 3)
+    assert model.batches[0].max() <= 1.0
+
+# ---------------- Scoring ----------------
+def test_actions_score_only_when_enabled():
+    from geometry import RED_STICK
+    from scoring import BoutState, ScoringEngine
+    xyxy = np.array([[0, 0, 10, 10]], np.float32)
+    cls, conf = np.array([RED_STICK]), np.array([0.9], np.float32)
+    action = ("head & face", 0.9)
+
+    state = BoutState()
+    event, _ = ScoringEngine().score(state, xyxy, cls, conf, action)
+    assert event is None and state.red == 0
+
+    event, _ = ScoringEngine(action_scoring=True).score(state, xyxy, cls, conf, action)
+    assert (event.attacker, event.body_part, event.source, state.red) == ("Red", "Head", "cnn_lstm", 1)
@@ -0,0 +1,130 @@
+import time
+import threading
+
+import pytest
+
+from event_store import EventStore, connection
+
+SCORES = {"Blue": 0, "Red": 0}
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"), flush_interval=0.01)
+    yield store
+    store.close()
+
+def test_first_record_starts_a_match(store):
+    assert store.recover() is None
+    store.record(1, True, 90.0, "Red", "Head", {"Blue": 0, "Red": 1})
+    store.flush()
+    (event,) = store.query()
+    assert event["match_id"] == store.match_id
+    assert (event["scored_by"], event["body_part"], event["red_score"]) == ("Red", "Head", 1)
+
+def test_recover_resumes_an_unfinished_match(tmp_path):
+    path = str(tmp_path / "events.db")
+    crashed = EventStore(path)
+    crashed.record(1, True, 90.0, "Red", "Head", {"Blue": 0, "Red": 1})
+    crashed.record(2, True, 80.0, "Blue", "Body", {"Blue": 1, "Red": 0})
+    crashed.flush()
+    # No end_match: the app died mid-match
+    crashed.queue.put(("stop", None))
+    crashed.thread.join()
+
+    store = EventStore(path)
+    assert store.recover() == {1: {"Blue": 0, "Red": 1}, 2: {"Blue": 1, "Red": 0}}
+    store.record(1, True, 85.0, "Red", "Legs", {"Blue": 0, "Red": 2})
+    store.close()
+    assert [m[3] for m in store.matches()] == [3]
+
+@pytest.fixture
+def yielding_clock(monkeypatch):
+    """Makes time.time() give up the GIL, so other threads run in the middle of start_match."""
+    clock = time.time
+
+    def yielding_time():
+        time.sleep(0.0001)
+        return clock()
+    monkeypatch.setattr(time, "time", yielding_time)
+
+def test_concurrent_records_and_match_ends_lose_nothing(store, yielding_clock):
+    cameras, hits = 3, 200
+    start = threading.Barrier(cameras + 1)
+    recording = threading.Event()
+
+    def camera(number):
+        start.wait()
+        for _ in range(hits):
+            store.record(number, True, 90.0, "Red", "Head", SCORES)
+
+    def referee():
+        start.wait()
+        while recording.is_set():
+            store.end_match()
+
+    threads = [threading.Thread(target=camera, args=(n,)) for n in range(1, cameras + 1)]
+    recording.set()
+    referee_thread = threading.Thread(target=referee)
+    referee_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recording.clear()
+    referee_thread.join()
+    store.flush()
+
+    assert store.dropped == 0
+    assert store.count() == cameras * hits
+    with connection(store.path) as conn:
+        orphans = conn.execute(
+            "SELECT COUNT(*) FROM events WHERE match_id NOT IN (SELECT id FROM matches)"
+        ).fetchone()[0]
+        ids = [row[0] for row in conn.execute("SELECT id FROM matches ORDER BY id")]
+    assert orphans == 0
+    assert ids == list(range(1, len(ids) + 1))
+
+def test_concurrent_first_hits_share_one_match(store, yielding_clock):
+    cameras = 8
+    start = threading.Barrier(cameras)
+
+    def camera(number):
+        start.wait()
+        store.record(number, True, 90.0, "Blue", "Body", SCORES)
+
+    threads = [threading.Thread(target=camera, args=(n,)) for n in range(cameras)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.flush()
+    assert len(store.matches()) == 1
+    assert {event["match_id"] for event in store.query()} == {store.match_id}
+
+@pytest.fixture
+def failing_store(tmp_path):
+    """A store whose event inserts fail, as on a full disk or a damaged file."""
+    store = EventStore(str(tmp_path / "events.db"), flush_interval=0.5)
+    store.start_match()
+    assert store.flush()
+    with connection(store.path) as conn:
+        conn.execute("DROP TABLE events")
+    yield store
+    store.queue.put(("stop", None))
+    store.thread.join(timeout=1.0)
+
+def test_flush_returns_after_a_failed_write(failing_store):
+    failing_store.record(1, True, 90.0, "Red", "Head", SCORES)
+    started = time.monotonic()
+    assert failing_store.flush(timeout=3.0)
+    assert time.monotonic() - started < 2.0
+    assert failing_store.dropped == 1
+
+def test_stop_ends_the_writer_after_a_failed_write(failing_store):
+    for _ in range(3):
+        failing_store.record(1, True, 90.0, "Red", "Head", SCORES)
+    # Lands in the same batch as the failing events
+    failing_store.queue.put(("stop", None))
+    failing_store.thread.join(timeout=2.0)
+    assert not failing_store.thread.is_alive()
+    assert failing_store.dropped == 3
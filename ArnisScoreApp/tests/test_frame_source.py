@@ -0,0 +1,461 @@
+"""Frame sources on local files and a local HTTP-MJPEG stream, no cameras needed."""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from frame_source import FramePool, FrameSlot, NetworkStreamSource, VideoFileSource, is_stream_url
+
+FPS = 30.0
+
+needs_ffmpeg = pytest.mark.skipif(
+    cv2.CAP_FFMPEG not in cv2.videoio_registry.getStreamBackends(), reason="OpenCV built without FFmpeg"
+)
+
+def jpeg_frames(n=30, size=(64, 48)):
+    frames = []
+    for i in range(n):
+        image = np.full((size[1], size[0], 3), i * 255 // n, dtype=np.uint8)
+        frames.append(cv2.imencode(".jpg", image)[1].tobytes())
+    return frames
+
+class MjpegServer:
+    """Serves JPEG frames as multipart/x-mixed-replace at a steady FPS, like an IP camera's /video."""
+
+    def __init__(self, port=0):
+        self.frames = jpeg_frames()
+        self.running = threading.Event()
+        self.port = port
+        self.httpd = None
+
+    def start(self):
+        stream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.end_headers()
+                started, i = time.monotonic(), 0
+                try:
+                    while stream.running.is_set():
+                        jpeg = stream.frames[i % len(stream.frames)]
+                        self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                                         % len(jpeg) + jpeg + b"\r\n")
+                        i += 1
+                        time.sleep(max(0.0, started + i / FPS - time.monotonic()))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.running.set()
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Drops every open connection and stops listening, as a camera that goes offline."""
+        self.running.clear()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/video"
+
+class RecordingEvent(threading.Event):
+    """``stopped`` stand-in that records each backoff wait."""
+
+    def __init__(self):
+        super().__init__()
+        self.waits = []
+
+    def wait(self, timeout=None):
+        if timeout is not None:
+            self.waits.append(timeout)
+        return super().wait(timeout)
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+@pytest.fixture
+def server():
+    server = MjpegServer().start()
+    yield server
+    if server.running.is_set():
+        server.stop()
+
+@pytest.fixture
+def open_stream():
+    sources = []
+
+    def open_stream(url, **kwargs):
+        source = NetworkStreamSource(url, open_timeout=2.0, read_timeout=1.0, **kwargs)
+        source.stopped = RecordingEvent()
+        sources.append(source)
+        return source.start()
+    yield open_stream
+    for source in sources:
+        source.close()
+
+def test_stream_urls():
+    assert is_stream_url("rtsp://10.0.0.5/stream") and is_stream_url("HTTP://cam/video")
+    assert not is_stream_url("match.mp4") and not is_stream_url(0)
+
+def test_file_opens_never_see_stream_options(monkeypatch):
+    import frame_source
+    seen = {}
+
+    class RecordingCapture:
+        def __init__(self, source, *args):
+            if source == "rtsp://camera/stream":
+                time.sleep(0.2)   # a slow stream open, holding its options in the environment
+            seen[source] = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+
+        def isOpened(self):
+            return False
+
+        def release(self):
+            pass
+    monkeypatch.setattr(frame_source.cv2, "VideoCapture", RecordingCapture)
+    monkeypatch.delenv("OPENCV_FFMPEG_CAPTURE_OPTIONS", raising=False)
+
+    stream = threading.Thread(target=NetworkStreamSource("rtsp://camera/stream").open)
+    stream.start()
+    time.sleep(0.05)
+    frame_source.open_file_capture("match.mp4")
+    stream.join()
+    assert "rtsp_transport;tcp" in seen["rtsp://camera/stream"]
+    assert seen["match.mp4"] is None
+    assert "OPENCV_FFMPEG_CAPTURE_OPTIONS" not in os.environ
+
+# ---------------- Jitter and delay ----------------
+def test_timestamped_jitter_and_delay():
+    source = NetworkStreamSource("rtsp://camera/stream")
+    source.measure(10.00, 0.0)
+    assert (source.jitter_ms, source.delay_ms) == (0.0, 0.0)
+    # 50 ms late: RFC 3550 moves jitter 1/16 of the way to |D| = 50 ms
+    source.measure(10.15, 0.1)
+    assert source.jitter_ms == pytest.approx(50 / 16)
+    assert source.delay_ms == pytest.approx(50)
+    source.measure(10.25, 0.2)
+    assert source.jitter_ms == pytest.approx(50 / 16 * 15 / 16)
+    assert source.delay_ms == pytest.approx(50)
+    # Delay is relative to the fastest frame seen, which this one now is
+    source.measure(10.28, 0.3)
+    assert source.delay_ms == pytest.approx(0)
+    assert source.min_offset == pytest.approx(9.98)
+
+def test_untimestamped_jitter_uses_mean_interval():
+    source = NetworkStreamSource("http://camera/video")
+    for i in range(40):
+        source.measure(i * 0.1, 0.0)
+    assert source.mean_interval == pytest.approx(0.1)
+    assert source.jitter_ms == pytest.approx(0.0, abs=1e-9)
+    assert source.delay_ms is None
+    # One frame 60 ms late, then one 60 ms early
+    source.measure(4.06, 0.0)
+    source.measure(4.10, 0.0)
+    assert source.jitter_ms > 3.0
+    assert source.stats()["delay_ms"] is None
+
+# ---------------- Live stream ----------------
+@needs_ffmpeg
+def test_delivers_frames_with_low_jitter(server, open_stream):
+    source = open_stream(server.url, resize=(32, 24))
+    item = source.read(timeout=10.0)
+    assert item is not None
+    index, arrival, frame = item
+    assert frame.shape == (24, 32, 3)
+    assert source.status == "live"
+    source.release(frame)
+
+    wait_for(lambda: source.frames >= 60)
+    stats = source.stats()
+    assert set(stats) == {"status", "fps", "delay_ms", "jitter_ms", "age_ms", "frames", "dropped", "reconnects"}
+    assert stats["status"] == "live" and stats["reconnects"] == 0
+    assert stats["fps"] == pytest.approx(FPS, rel=0.25)
+    assert stats["delay_ms"] is None
+    # A steadily paced local stream should be well under one frame interval
+    assert stats["jitter_ms"] < 1000.0 / FPS / 2
+    # Nobody read the frames in between, so all but the newest were dropped
+    assert stats["dropped"] >= stats["frames"] - 3
+
+@needs_ffmpeg
+def test_reconnects_with_backoff(server, open_stream, monkeypatch):
+    monkeypatch.setattr(NetworkStreamSource, "RECONNECT_MIN", 0.05)
+    monkeypatch.setattr(NetworkStreamSource, "RECONNECT_MAX", 0.2)
+    source = open_stream(server.url)
+    wait_for(lambda: source.frames >= 5)
+
+    server.stop()
+    wait_for(lambda: source.reconnects == 1)
+    assert source.status == "reconnecting"
+    # Refused while the camera is down: the wait doubles up to RECONNECT_MAX
+    wait_for(lambda: len(source.stopped.waits) >= 5)
+    assert source.stopped.waits[:5] == [0.05, 0.1, 0.2, 0.2, 0.2]
+    assert source.status == "reconnecting"
+    assert not source.closed
+
+    restarted = MjpegServer(server.port).start()
+    try:
+        frames = source.frames
+        wait_for(lambda: source.status == "live" and source.frames > frames + 5)
+        assert source.read(timeout=5.0) is not None
+        assert source.reconnects == 1
+    finally:
+        restarted.stop()
+
+@needs_ffmpeg
+def test_backoff_restarts_after_a_session_with_frames(server, open_stream, monkeypatch):
+    monkeypatch.setattr(NetworkStreamSource, "RECONNECT_MIN", 0.05)
+    monkeypatch.setattr(NetworkStreamSource, "RECONNECT_MAX", 0.2)
+    source = open_stream(server.url)
+    wait_for(lambda: source.frames >= 5)
+    server.stop()
+    wait_for(lambda: len(source.stopped.waits) >= 3)
+
+    restarted = MjpegServer(server.port).start()
+    try:
+        wait_for(lambda: source.status == "live")
+        frames = source.frames
+        wait_for(lambda: source.frames > frames + 5)
+        waits = len(source.stopped.waits)
+        restarted.stop()
+        wait_for(lambda: source.reconnects == 2)
+        wait_for(lambda: len(source.stopped.waits) > waits)
+        assert source.stopped.waits[waits] == 0.05
+    finally:
+        if restarted.running.is_set():
+            restarted.stop()
+
+@needs_ffmpeg
+def test_close_is_prompt(server, open_stream):
+    source = open_stream(server.url)
+    wait_for(lambda: source.frames >= 5)
+    started = time.monotonic()
+    source.close()
+    assert time.monotonic() - started < source.read_timeout
+    assert source.status == "closed"
+    # The newest frame is still handed over, then the source reports it is done
+    while source.read(timeout=0.1) is not None:
+        pass
+    assert source.closed
+
+def test_close_during_backoff(open_stream, monkeypatch):
+    monkeypatch.setattr(NetworkStreamSource, "RECONNECT_MIN", 30.0)
+    monkeypatch.setattr(NetworkStreamSource, "RECONNECT_MAX", 30.0)
+    probe = MjpegServer().start()
+    port = probe.port
+    probe.stop()
+    source = open_stream(f"http://127.0.0.1:{port}/video")
+    wait_for(lambda: source.stopped.waits)
+    started = time.monotonic()
+    source.close()
+    assert time.monotonic() - started < 1.0
+    assert source.closed
+
+# ---------------- VideoFileSource ----------------
+CLIP_FRAMES = 64
+BITS = 6
+
+def numbered_frame(index):
+    """Black/white columns spelling ``index`` in binary, so it survives lossy encoding."""
+    frame = np.zeros((32, 16 * BITS, 3), np.uint8)
+    for bit in range(BITS):
+        if index >> bit & 1:
+            frame[:, 16 * bit:16 * (bit + 1)] = 255
+    return frame
+
+def frame_number(frame):
+    width = frame.shape[1] // BITS
+    return sum(1 << bit for bit in range(BITS) if frame[:, width * bit:width * (bit + 1)].mean() > 128)
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("video") / "numbered.mp4")
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (16 * BITS, 32))
+    if not out.isOpened():
+        pytest.skip("OpenCV cannot write mp4 here")
+    for i in range(CLIP_FRAMES):
+        out.write(numbered_frame(i))
+    out.release()
+    return path
+
+@pytest.fixture
+def open_clip(clip):
+    sources = []
+
+    def open_clip(**kwargs):
+        source = VideoFileSource(clip, **kwargs).start()
+        sources.append(source)
+        return source
+    yield open_clip
+    for source in sources:
+        source.close()
+
+def read_index(source):
+    item = source.read(timeout=5.0)
+    assert item is not None
+    index, timestamp, frame = item
+    assert frame_number(frame) == index
+    assert timestamp == pytest.approx(index / FPS)
+    return index
+
+def test_missing_file():
+    with pytest.raises(IOError):
+        VideoFileSource("no_such_match.mp4")
+
+def test_reads_every_frame_then_ends_cleanly(open_clip):
+    source = open_clip(prefetch=4)
+    assert (source.fps, source.frame_count) == (FPS, CLIP_FRAMES)
+    assert [read_index(source) for _ in range(CLIP_FRAMES)] == list(range(CLIP_FRAMES))
+    assert source.read(timeout=5.0) is None
+    assert source.closed
+    # Ended, not timed out: later reads return at once
+    started = time.monotonic()
+    assert source.read(timeout=5.0) is None
+    assert time.monotonic() - started < 0.5
+
+def test_start_and_end_bound_the_range(open_clip):
+    source = open_clip(start=10, end=14)
+    assert [index for index, _, _ in source] == [10, 11, 12, 13]
+    assert source.closed
+
+def test_resize_on_the_decode_thread(open_clip):
+    _, _, frame = open_clip(resize=(48, 16)).read(timeout=5.0)
+    assert frame.shape == (16, 48, 3)
+
+@pytest.mark.parametrize("target", [5, 40, 63])
+def test_seek_is_frame_accurate(open_clip, monkeypatch, target):
+    # 40 from position ~10 is past the limit, so the container seek is used too
+    monkeypatch.setattr(VideoFileSource, "SEEK_DECODE_LIMIT", 16)
+    source = open_clip()
+    for _ in range(10):
+        read_index(source)
+    source.seek(target)
+    assert read_index(source) == target
+    if target + 1 < CLIP_FRAMES:
+        assert read_index(source) == target + 1
+
+def test_seek_while_the_prefetch_queue_is_full(open_clip):
+    source = open_clip(prefetch=8)
+    read_index(source)
+    wait_for(lambda: source.queue.full())
+    # The decoder is blocked on the full queue; the frames queued before the seek must not leak out
+    source.seek(50)
+    assert [read_index(source) for _ in range(3)] == [50, 51, 52]
+    source.seek(3)
+    assert read_index(source) == 3
+
+def test_seek_after_the_end_resumes(open_clip):
+    source = open_clip(start=CLIP_FRAMES - 2)
+    assert [index for index, _, _ in source] == [CLIP_FRAMES - 2, CLIP_FRAMES - 1]
+    assert source.closed
+    source.seek(20)
+    assert not source.closed
+    assert read_index(source) == 20
+
+def test_realtime_keeps_pace_with_a_fast_reader(open_clip):
+    source = open_clip(realtime=True)
+    started = time.monotonic()
+    indices = [read_index(source) for _ in range(10)]
+    elapsed = time.monotonic() - started
+    assert indices == list(range(10))
+    assert elapsed == pytest.approx(9 / FPS, abs=0.1)
+    assert source.dropped == 0
+
+def test_realtime_skips_frames_for_a_slow_reader(open_clip):
+    source = open_clip(realtime=True)
+    assert read_index(source) == 0
+    time.sleep(10 / FPS)
+    index = read_index(source)
+    # About ten frames are already late; the reader picks up close to the wall clock
+    assert index >= 8
+    assert source.dropped == index - 1
+
+# ---------------- FrameSlot ----------------
+def test_slot_hands_over_only_the_newest_frame():
+    dropped = []
+    slot = FrameSlot(on_drop=dropped.append)
+    for i in range(3):
+        slot.put(f"frame{i}", float(i))
+    assert slot.take(0) == (3, "frame2", 2.0)
+    assert slot.dropped == 2 and dropped == ["frame0", "frame1"]
+    # Taken frames are the consumer's; they are not counted or handed back
+    slot.put("frame3", 3.0)
+    assert slot.take(0) == (4, "frame3", 3.0)
+    assert slot.dropped == 2
+
+def test_slot_take_times_out_when_empty():
+    slot = FrameSlot()
+    started = time.monotonic()
+    assert slot.take(0.05) is None
+    assert time.monotonic() - started >= 0.04
+
+def test_slot_take_wakes_on_put():
+    slot = FrameSlot()
+    threading.Timer(0.05, slot.put, ("frame", 1.0)).start()
+    assert slot.take(5.0) == (1, "frame", 1.0)
+
+def test_slot_close_wakes_a_waiting_consumer_after_the_last_frame():
+    slot = FrameSlot()
+    slot.put("last", 1.0)
+    slot.close()
+    assert not slot.closed
+    assert slot.take(5.0)[1] == "last"
+    assert slot.closed
+    started = time.monotonic()
+    assert slot.take(5.0) is None
+    assert time.monotonic() - started < 0.5
+
+# ---------------- FramePool ----------------
+def test_pool_reuses_released_buffers():
+    pool = FramePool((48, 64, 3))
+    first = pool.acquire()
+    assert first.shape == (48, 64, 3) and first.dtype == np.uint8
+    pool.release(first)
+    assert pool.acquire() is first
+    second = pool.acquire()
+    assert second is not first
+    assert pool.allocated == 2
+
+def test_pool_drops_buffers_of_another_shape():
+    pool = FramePool((48, 64, 3))
+    old = pool.acquire()
+    pool.release(old)
+    # A resolution change: free buffers of the old shape are discarded
+    new = pool.acquire((24, 32, 3))
+    assert new is not old and new.shape == (24, 32, 3)
+    pool.release(old)
+    assert pool.free == []
+    pool.release(None)
+    assert pool.free == []
+
+def test_pool_keeps_at_most_max_free():
+    pool = FramePool((4, 4, 3))
+    buffers = [pool.acquire() for _ in range(FramePool.MAX_FREE + 3)]
+    for buffer in buffers:
+        pool.release(buffer)
+    assert len(pool.free) == FramePool.MAX_FREE
+
+def test_slot_returns_dropped_frames_to_the_pool():
+    pool = FramePool((4, 4, 3))
+    slot = FrameSlot(on_drop=pool.release)
+    stale, newest = pool.acquire(), pool.acquire()
+    slot.put(stale, 0.0)
+    slot.put(newest, 1.0)
+    assert pool.acquire() is stale
+    assert slot.take(0)[1] is newest
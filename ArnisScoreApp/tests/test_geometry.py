@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+import geometry
+from geometry import (
+    iou_matrix, classify_hit, split_classes, find_contacts,
+    BLUE_PLAYER, BLUE_STICK, RED_PLAYER, RED_STICK,
+)
+
+def frame(*boxes):
+    """(class_id, x1, y1, x2, y2[, conf]) tuples -> xyxy, cls, conf arrays."""
+    xyxy = np.array([b[1:5] for b in boxes], dtype=np.float32).reshape(-1, 4)
+    cls = np.array([b[0] for b in boxes], dtype=np.int64)
+    conf = np.array([b[5] if len(b) > 5 else 0.9 for b in boxes], dtype=np.float32)
+    return xyxy, cls, conf
+
+@pytest.fixture(params=["loop", "matrix"])
+def contact_path(request, monkeypatch):
+    """Runs a test through both the small-frame loop and the IoU-matrix path."""
+    if request.param == "matrix":
+        monkeypatch.setattr(geometry, "SMALL_BOXES", 0)
+    return request.param
+
+# ---------------- iou_matrix ----------------
+def test_iou_matrix_values():
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 110, 110]], dtype=np.float32)
+    expected = np.array([[1.0, 50 / 150, 0.0], [0.0, 0.0, 0.0]])
+    np.testing.assert_allclose(iou_matrix(a, b), expected, rtol=1e-6)
+
+def test_iou_matrix_empty():
+    boxes = np.zeros((3, 4), dtype=np.float32)
+    assert iou_matrix(boxes, np.zeros((0, 4))).shape == (3, 0)
+    assert iou_matrix(np.zeros((0, 4)), boxes).shape == (0, 3)
+
+def test_iou_matrix_zero_area_boxes():
+    point = np.array([[5, 5, 5, 5]], dtype=np.float32)
+    line = np.array([[0, 5, 10, 5]], dtype=np.float32)
+    box = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    ious = iou_matrix(np.concatenate([point, line]), np.concatenate([box, point]))
+    assert np.isfinite(ious).all()
+    np.testing.assert_array_equal(ious, 0.0)
+
+# ---------------- classify_hit ----------------
+@pytest.mark.parametrize("stick_center_y, part", [
+    (10, "Head"), (29, "Head"), (31, "Body"), (69, "Body"), (71, "Legs"), (89, "Legs"), (91, "Invalid"),
+])
+def test_classify_hit_regions(stick_center_y, part):
+    player = [0, 0, 50, 100]
+    stick = [20, stick_center_y - 5, 30, stick_center_y + 5]
+    assert classify_hit([player], [stick]).tolist() == [part]
+
+def test_classify_hit_is_pairwise():
+    players = [[0, 0, 50, 100], [0, 100, 50, 200]]
+    sticks = [[0, 0, 10, 20], [0, 180, 10, 200]]
+    assert classify_hit(players, sticks).tolist() == ["Head", "Invalid"]
+
+# ---------------- split_classes ----------------
+@pytest.mark.parametrize("small", [True, False])
+def test_split_classes_keeps_order_and_threshold(small, monkeypatch):
+    if not small:
+        monkeypatch.setattr(geometry, "SMALL_BOXES", 0)
+    xyxy, cls, conf = frame(
+        (RED_STICK, 0, 0, 1, 1, 0.9), (BLUE_PLAYER, 1, 1, 2, 2, 0.5),
+        (RED_STICK, 2, 2, 3, 3, 0.8), (BLUE_PLAYER, 3, 3, 4, 4, 0.95),
+    )
+    by_class = split_classes(xyxy, cls, conf, threshold=0.7)
+    np.testing.assert_array_equal(by_class[RED_STICK][0], xyxy[[0, 2]])
+    np.testing.assert_array_equal(by_class[BLUE_PLAYER][0], xyxy[[3]])
+    np.testing.assert_array_equal(by_class[BLUE_PLAYER][1], conf[[3]])
+    assert by_class[RED_PLAYER][0].shape == (0, 4)
+    assert by_class[BLUE_STICK][1].shape == (0,)
+
+# ---------------- find_contacts ----------------
+def test_no_contacts_with_empty_classes(contact_path):
+    assert find_contacts(*frame()) == []
+    # Sticks but no opposing player, and players but no sticks
+    assert find_contacts(*frame((RED_STICK, 0, 0, 10, 10), (RED_PLAYER, 0, 0, 50, 100))) == []
+    assert find_contacts(*frame((BLUE_PLAYER, 0, 0, 50, 100), (RED_PLAYER, 0, 0, 50, 100))) == []
+
+def test_same_colour_overlap_is_masked(contact_path):
+    xyxy, cls, conf = frame(
+        (RED_STICK, 0, 0, 10, 10), (RED_PLAYER, 0, 0, 50, 100),
+        (BLUE_STICK, 200, 0, 210, 10), (BLUE_PLAYER, 200, 0, 250, 100),
+    )
+    assert find_contacts(xyxy, cls, conf) == []
+
+def test_red_attacks_come_first(contact_path):
+    # Detection order puts the blue attack first; contacts must still list red first
+    xyxy, cls, conf = frame(
+        (BLUE_STICK, 200, 80, 210, 90, 0.8), (RED_PLAYER, 200, 0, 250, 100),
+        (RED_STICK, 0, 10, 10, 20, 0.85), (BLUE_PLAYER, 0, 0, 50, 100),
+    )
+    contacts = find_contacts(xyxy, cls, conf)
+    assert [(c.attacker, c.body_part) for c in contacts] == [("Red", "Head"), ("Blue", "Legs")]
+    red = contacts[0]
+    np.testing.assert_array_equal(red.stick_box, xyxy[2])
+    np.testing.assert_array_equal(red.player_box, xyxy[3])
+    assert red.conf == pytest.approx(0.85)
+    assert red.iou == pytest.approx(100 / 5000)
+
+def test_contacts_are_row_major_per_colour(contact_path):
+    xyxy, cls, conf = frame(
+        (RED_STICK, 0, 40, 10, 50), (RED_STICK, 60, 40, 70, 50),
+        (BLUE_PLAYER, 0, 0, 50, 100), (BLUE_PLAYER, 55, 0, 105, 100),
+    )
+    contacts = find_contacts(xyxy, cls, conf)
+    pairs = [(c.stick_box[0], c.player_box[0]) for c in contacts]
+    assert pairs == [(0, 0), (60, 55)]
+
+def test_zero_area_boxes_never_touch(contact_path):
+    xyxy, cls, conf = frame(
+        (RED_STICK, 10, 10, 10, 10), (RED_STICK, 0, 50, 20, 50),
+        (BLUE_PLAYER, 0, 0, 50, 100),
+    )
+    assert find_contacts(xyxy, cls, conf) == []
+
+def test_threshold_drops_weak_boxes(contact_path):
+    xyxy, cls, conf = frame((RED_STICK, 0, 10, 10, 20, 0.5), (BLUE_PLAYER, 0, 0, 50, 100, 0.9))
+    assert find_contacts(xyxy, cls, conf, threshold=0.7) == []
+    assert len(find_contacts(xyxy, cls, conf, threshold=0.4)) == 1
+
+@pytest.mark.parametrize("n_boxes", [4, 8, 16, 40])
+def test_loop_and_matrix_paths_agree(n_boxes, monkeypatch):
+    rng = np.random.default_rng(n_boxes)
+    for _ in range(200):
+        xy = rng.uniform(0, 500, (n_boxes, 2))
+        xyxy = np.hstack([xy, xy + rng.uniform(0, 150, (n_boxes, 2))]).astype(np.float32)
+        cls = rng.integers(0, 4, n_boxes)
+        conf = rng.uniform(0.5, 1.0, n_boxes).astype(np.float32)
+
+        monkeypatch.setattr(geometry, "SMALL_BOXES", 1000)
+        loop = find_contacts(xyxy, cls, conf, 0.7)
+        monkeypatch.setattr(geometry, "SMALL_BOXES", 0)
+        matrix = find_contacts(xyxy, cls, conf, 0.7)
+
+        assert [(c.attacker, c.body_part) for c in loop] == [(c.attacker, c.body_part) for c in matrix]
+        for a, b in zip(loop, matrix):
+            np.testing.assert_array_equal(a.stick_box, b.stick_box)
+            np.testing.assert_array_equal(a.player_box, b.player_box)
+            assert a.iou == pytest.approx(b.iou, rel=1e-5)
+            assert a.conf == pytest.approx(b.conf)
@@ -0,0 +1,54 @@
+import pytest
+
+import parallel_analyze
+from parallel_analyze import merge_events, plan_segments
+
+@pytest.fixture
+def video(monkeypatch):
+    """A video of the given (fps, frame_count), without opening a file."""
+    def video(fps, frame_count):
+        monkeypatch.setattr(parallel_analyze, "video_info", lambda path: (fps, frame_count))
+        return "match.mp4"
+    return video
+
+# ---------------- plan_segments ----------------
+def test_segments_cover_the_video_with_warm_up(video):
+    assert plan_segments(video(25, 100), segment_seconds=1, overlap_seconds=0.5) == [
+        (0, 25, 0), (25, 50, 13), (50, 75, 38), (75, None, 63),
+    ]
+
+def test_last_segment_runs_to_the_end(video):
+    # 110 frames: the short tail is its own segment and reads to the end of the file
+    segments = plan_segments(video(25, 110), segment_seconds=2, overlap_seconds=0)
+    assert segments == [(0, 50, 0), (50, 100, 50), (100, None, 100)]
+
+def test_warm_up_aligns_to_detector_frames(video):
+    segments = plan_segments(video(25, 100), segment_seconds=1, overlap_seconds=0.5, detect_every=4)
+    assert [warmup for _, _, warmup in segments] == [0, 12, 36, 60]
+    # A single pass runs the detector on frames 0, 4, 8, ...; so does every segment
+    assert all(warmup % 4 == 0 for _, _, warmup in segments)
+    assert all(warmup <= start for start, _, warmup in segments)
+
+def test_whole_video_when_unsplit_or_unknown_length(video):
+    assert plan_segments(video(25, 100), segment_seconds=0, overlap_seconds=3) == [(0, None, 0)]
+    assert plan_segments(video(25, 0), segment_seconds=300, overlap_seconds=3) == [(0, None, 0)]
+
+# ---------------- merge_events ----------------
+def hit(frame, attacker, valid=True, red_score=0, blue_score=0):
+    return {"frame": frame, "attacker": attacker, "body_part": "Head", "valid": valid,
+            "blue_score": blue_score, "red_score": red_score}
+
+def test_merge_orders_segments_and_recomputes_scores():
+    # Per-segment scores include warm-up hits and restart per segment, so they are wrong when joined
+    second = [hit(30, "Blue", blue_score=5), hit(40, "Red", valid=False, red_score=9)]
+    first = [hit(3, "Red", red_score=1), hit(10, "Red", red_score=2)]
+    merged, scores = merge_events([(25, second), (0, first)])
+    assert [e["frame"] for e in merged] == [3, 10, 30, 40]
+    assert [(e["blue_score"], e["red_score"]) for e in merged] == [(0, 1), (0, 2), (1, 2), (1, 2)]
+    assert scores == {"Blue": 1, "Red": 2}
+    # The segments' own events are left as they were
+    assert second[0]["blue_score"] == 5
+
+def test_merge_empty():
+    assert merge_events([]) == ([], {"Blue": 0, "Red": 0})
+    assert merge_events([(0, []), (25, [])]) == ([], {"Blue": 0, "Red": 0})
@@ -0,0 +1,142 @@
+"""BatchInferenceScheduler with a stub model: when batches flush, how they are grouped, and cancellation."""
+import threading
+import time
+
+import pytest
+
+from scheduler import BatchInferenceScheduler
+
+class StubModel:
+    """Records every batched call and answers each frame with (frame, kwargs)."""
+
+    def __init__(self):
+        self.calls = []
+        self.error = None
+
+    def __call__(self, frames, **kwargs):
+        self.calls.append((list(frames), kwargs))
+        if self.error is not None:
+            raise self.error
+        return [(frame, kwargs) for frame in frames]
+
+@pytest.fixture
+def model():
+    return StubModel()
+
+@pytest.fixture
+def make_scheduler(model):
+    schedulers = []
+
+    def make_scheduler(cameras, max_wait=10.0, **kwargs):
+        scheduler = BatchInferenceScheduler(model, max_wait=max_wait, **kwargs)
+        for camera in cameras:
+            scheduler.register(camera)
+        schedulers.append(scheduler)
+        return scheduler
+    yield make_scheduler
+    for scheduler in schedulers:
+        scheduler.stop()
+
+def infer_in_thread(scheduler, camera, frame, **kwargs):
+    """Starts a camera thread blocked in infer(); ``thread.result`` holds what it returned."""
+    thread = threading.Thread(target=lambda: setattr(thread, "result", scheduler.infer(camera, frame, **kwargs)))
+    thread.start()
+    return thread
+
+def wait_pending(scheduler, n):
+    deadline = time.monotonic() + 5.0
+    while len(scheduler._pending) < n:
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def test_flushes_once_every_camera_has_submitted(model, make_scheduler):
+    scheduler = make_scheduler([1, 2, 3])
+    started = time.monotonic()
+    threads = [infer_in_thread(scheduler, camera, f"frame{camera}") for camera in (1, 2, 3)]
+    for thread in threads:
+        thread.join(5.0)
+    # Far sooner than max_wait: the batch was complete
+    assert time.monotonic() - started < 2.0
+    assert [thread.result[0] for thread in threads] == ["frame1", "frame2", "frame3"]
+    assert len(model.calls) == 1
+    assert sorted(model.calls[0][0]) == ["frame1", "frame2", "frame3"]
+    assert model.calls[0][1] == {"verbose": False}
+    assert (scheduler.batches_run, scheduler.frames_run) == (1, 3)
+
+def test_lone_camera_flushes_at_the_deadline(model, make_scheduler):
+    scheduler = make_scheduler([1, 2], max_wait=0.2)
+    started = time.monotonic()
+    result = scheduler.infer(1, "frame")
+    elapsed = time.monotonic() - started
+    assert result[0] == "frame"
+    assert 0.15 <= elapsed < 2.0
+    assert model.calls == [(["frame"], {"verbose": False})]
+
+def test_max_batch_caps_a_flush(model, make_scheduler):
+    scheduler = make_scheduler(range(4), max_batch=2)
+    threads = [infer_in_thread(scheduler, camera, camera) for camera in range(4)]
+    for thread in threads:
+        thread.join(5.0)
+    assert all(thread.result is not None for thread in threads)
+    assert all(len(frames) <= 2 for frames, _ in model.calls)
+
+def test_groups_by_input_size_and_threshold(model, make_scheduler):
+    scheduler = make_scheduler([1, 2, 3, 4], conf=0.7)
+    threads = [
+        infer_in_thread(scheduler, 1, "a", imgsz=320, conf=0.5),
+        infer_in_thread(scheduler, 2, "b", imgsz=320, conf=0.5),
+        infer_in_thread(scheduler, 3, "c", imgsz=640, conf=0.5),
+        infer_in_thread(scheduler, 4, "d"),
+    ]
+    for thread in threads:
+        thread.join(5.0)
+    calls = {tuple(sorted(frames)): kwargs for frames, kwargs in model.calls}
+    assert calls == {
+        ("a", "b"): {"verbose": False, "conf": 0.5, "imgsz": 320},
+        ("c",): {"verbose": False, "conf": 0.5, "imgsz": 640},
+        # No per-frame values: the scheduler's defaults apply
+        ("d",): {"verbose": False, "conf": 0.7},
+    }
+    assert [thread.result[1] for thread in threads] == [calls[("a", "b")]] * 2 + [calls[("c",)], calls[("d",)]]
+
+def test_newer_frame_cancels_the_stale_one(model, make_scheduler):
+    scheduler = make_scheduler([1, 2])
+    stale = infer_in_thread(scheduler, 1, "old")
+    wait_pending(scheduler, 1)
+    newer = scheduler.submit(1, "new")
+    stale.join(5.0)
+    assert stale.result is None
+    other = scheduler.submit(2, "other")
+    assert newer.result(5.0)[0] == "new" and other.result(5.0)[0] == "other"
+    assert [sorted(frames) for frames, _ in model.calls] == [["new", "other"]]
+
+def test_unregister_stops_the_batch_waiting(model, make_scheduler):
+    scheduler = make_scheduler([1, 2])
+    waiting = infer_in_thread(scheduler, 1, "frame")
+    wait_pending(scheduler, 1)
+    time.sleep(0.05)
+    assert waiting.is_alive()
+    scheduler.unregister(2)
+    waiting.join(2.0)
+    assert not waiting.is_alive() and waiting.result[0] == "frame"
+
+def test_unregister_cancels_that_cameras_frame(make_scheduler):
+    scheduler = make_scheduler([1, 2])
+    future = scheduler.submit(2, "frame")
+    scheduler.unregister(2)
+    assert future.cancelled()
+
+def test_stop_releases_pending_frames(model, make_scheduler):
+    scheduler = make_scheduler([1, 2])
+    blocked = infer_in_thread(scheduler, 1, "frame")
+    wait_pending(scheduler, 1)
+    scheduler.stop()
+    blocked.join(2.0)
+    assert not blocked.is_alive() and blocked.result is None
+    assert scheduler._thread is None and model.calls == []
+
+def test_model_errors_reach_the_caller(model, make_scheduler):
+    model.error = RuntimeError("CUDA out of memory")
+    scheduler = make_scheduler([1])
+    with pytest.raises(RuntimeError, match="out of memory"):
+        scheduler.infer(1, "frame")
@@ -0,0 +1,230 @@
+"""REST and WebSocket routes of the scoring server, with scripted courts instead of cameras and YOLO."""
+import asyncio
+import queue
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+
+from frame_source import FrameSource
+from server import Court, ScoringServer
+
+HIT, MISS = "hit", "miss"
+
+class ScriptedSource(FrameSource):
+    """Hands over whatever the test feeds it; ``finish`` ends the stream."""
+
+    def __init__(self):
+        self.frames = queue.Queue()
+        self.index = 0
+        self.finished = False
+
+    def feed(self, *frames):
+        for frame in frames:
+            self.frames.put(frame)
+
+    def finish(self):
+        self.frames.put(None)
+
+    def read(self, timeout=None):
+        try:
+            frame = self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if frame is None:
+            self.finished = True
+            return None
+        self.index += 1
+        return self.index, self.index / 30.0, frame
+
+    @property
+    def closed(self):
+        return self.finished
+
+    def close(self):
+        self.finish()
+
+class ScriptedPrediction:
+    """Scores a red head hit for every HIT frame, like Prediction's log_callback would report it."""
+
+    class tracker:
+        @staticmethod
+        def reset():
+            pass
+
+    def __init__(self):
+        self.scores = {"Blue": 0, "Red": 0}
+        self.log_callback = None
+
+    def process_frame(self, frame, camera_number, frame_seq=None, render=True):
+        if frame == HIT:
+            self.scores["Red"] += 1
+            self.log_callback(True, 91.234, "Red - Head", camera_number)
+        elif frame != MISS:
+            raise RuntimeError(frame)
+
+    def reset_scores(self):
+        self.scores = {"Blue": 0, "Red": 0}
+
+class RecordingScheduler:
+    def __init__(self):
+        self.active = set()
+        self.unregistered = []
+        self.stopped = False
+
+    def register(self, camera_number):
+        self.active.add(camera_number)
+
+    def unregister(self, camera_number):
+        self.active.discard(camera_number)
+        self.unregistered.append(camera_number)
+
+    def stop(self):
+        self.stopped = True
+
+def make_server(court_ids=(1, 2)):
+    courts = [Court(i, f"court{i}.mp4", ScriptedPrediction(), ScriptedSource()) for i in court_ids]
+    return ScoringServer(courts, RecordingScheduler())
+
+async def until(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def serve(test):
+    """Runs ``test(server, client)`` against a started app, then shuts it down."""
+    async def main():
+        server = make_server()
+        async with TestClient(TestServer(server.make_app())) as client:
+            await test(server, client)
+        return server
+    return asyncio.run(main())
+
+# ---------------- REST ----------------
+def test_courts_and_events():
+    async def test(server, client):
+        court = server.courts[1]
+        court.source.feed(MISS, HIT, MISS, HIT, HIT)
+        await until(lambda: court.frames == 5)
+
+        response = await client.get("/courts")
+        assert response.status == 200
+        listed = {info["court"]: info for info in await response.json()}
+        assert set(listed) == {1, 2}
+        assert (listed[1]["red_score"], listed[1]["hits"], listed[1]["frames"]) == (3, 3, 5)
+        assert listed[1]["status"] == "running" and listed[2]["status"] == "starting"
+
+        info = await (await client.get("/courts/1")).json()
+        assert info["source"] == "court1.mp4"
+
+        body = await (await client.get("/courts/1/events")).json()
+        assert body["total"] == 3
+        assert [e["red_score"] for e in body["events"]] == [1, 2, 3]
+        assert body["events"][0] == {**body["events"][0], "type": "hit", "court": 1, "frame": 2,
+                                     "attacker": "Red", "body_part": "Head", "valid": True,
+                                     "confidence": 91.23}
+        since = await (await client.get("/courts/1/events", params={"since": 2})).json()
+        assert [e["red_score"] for e in since["events"]] == [3]
+    serve(test)
+
+def test_events_since_skips_evicted_hits(monkeypatch):
+    monkeypatch.setattr(Court, "MAX_EVENTS", 2)
+
+    async def test(server, client):
+        court = server.courts[1]
+        court.source.feed(HIT, HIT, HIT, HIT)
+        await until(lambda: court.event_count == 4)
+        body = await (await client.get("/courts/1/events", params={"since": 1})).json()
+        # Hits 2 and 3 have been evicted; only the newest MAX_EVENTS remain
+        assert body["total"] == 4
+        assert [e["red_score"] for e in body["events"]] == [3, 4]
+    serve(test)
+
+@pytest.mark.parametrize("path", ["/courts/9", "/courts/x", "/courts/9/events", "/courts/x/events"])
+def test_unknown_court_is_404(path):
+    async def test(server, client):
+        assert (await client.get(path)).status == 404
+        assert (await client.post("/courts/9/reset")).status == 404
+    serve(test)
+
+@pytest.mark.parametrize("since", ["x", "1.5", ""])
+def test_bad_since_is_400(since):
+    async def test(server, client):
+        response = await client.get("/courts/1/events", params={"since": since})
+        assert response.status == 400
+        assert "since" in await response.text()
+    serve(test)
+
+def test_reset_zeroes_the_score():
+    async def test(server, client):
+        court = server.courts[2]
+        court.source.feed(HIT, HIT)
+        await until(lambda: court.event_count == 2)
+        response = await client.post("/courts/2/reset")
+        assert response.status == 200
+        assert (await response.json())["red_score"] == 0
+        assert court.prediction.scores == {"Blue": 0, "Red": 0}
+        # Hits already reported stay in the history
+        assert (await (await client.get("/courts/2/events")).json())["total"] == 2
+    serve(test)
+
+# ---------------- Court lifecycle ----------------
+def test_finished_and_failed_courts_leave_the_scheduler():
+    async def test(server, client):
+        assert server.scheduler.active == {1, 2}
+        server.courts[1].source.finish()
+        server.courts[2].source.feed("corrupt frame")
+        await until(lambda: len(server.scheduler.unregistered) == 2)
+        assert server.scheduler.active == set()
+        infos = {info["court"]: info for info in await (await client.get("/courts")).json()}
+        assert infos[1]["status"] == "finished"
+        assert infos[2]["status"] == "error: corrupt frame"
+    server = serve(test)
+    assert server.scheduler.stopped
+
+# ---------------- WebSocket ----------------
+async def receive(ws, kind):
+    while True:
+        message = await asyncio.wait_for(ws.receive_json(), 5.0)
+        if message["type"] == kind:
+            return message
+
+def test_websocket_streams_hits_and_scores():
+    async def test(server, client):
+        async with client.ws_connect("/ws") as ws:
+            first = [await asyncio.wait_for(ws.receive_json(), 5.0) for _ in server.courts]
+            assert [(m["type"], m["court"]) for m in first] == [("status", 1), ("status", 2)]
+
+            server.courts[2].source.feed(HIT)
+            hit = await receive(ws, "hit")
+            assert (hit["court"], hit["attacker"], hit["red_score"]) == (2, "Red", 1)
+            score = await receive(ws, "score")
+            assert (score["court"], score["red_score"], score["blue_score"]) == (2, 1, 0)
+
+            await client.post("/courts/2/reset")
+            assert (await receive(ws, "score"))["red_score"] == 0
+    serve(test)
+
+def test_websocket_court_filter():
+    async def test(server, client):
+        async with client.ws_connect("/ws", params={"court": "2"}) as ws:
+            server.courts[1].source.feed(HIT)
+            await until(lambda: server.courts[1].event_count == 1)
+            server.courts[2].source.feed(HIT)
+            hit = await receive(ws, "hit")
+            assert hit["court"] == 2
+    serve(test)
+
+@pytest.mark.parametrize("court", ["x", "1.5"])
+def test_websocket_bad_court_is_400(court):
+    async def test(server, client):
+        response = await client.get("/ws", params={"court": court},
+                                    headers={"Upgrade": "websocket", "Connection": "Upgrade",
+                                             "Sec-WebSocket-Version": "13",
+                                             "Sec-WebSocket-Key": "dGhlIHNhbXBsZSBub25jZQ=="})
+        assert response.status == 400
+        assert not server.clients
+    serve(test)
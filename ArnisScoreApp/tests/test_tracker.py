@@ -0,0 +1,31 @@
+import numpy as np
+
+from tracker import MultiObjectTracker
+
+PLAYER = np.array([[100, 100, 150, 250]], dtype=np.float32)
+STICK = np.array([[140, 120, 160, 180]], dtype=np.float32)
+
+def detect(tracker, boxes, classes):
+    conf = np.full(len(classes), 0.9, dtype=np.float32)
+    return tracker.step(np.concatenate(boxes), np.array(classes), conf)
+
+def test_coasting_tracks_are_not_emitted_as_fresh():
+    tracker = MultiObjectTracker()
+    detect(tracker, [PLAYER, STICK], [0, 3])
+    # The stick leaves the frame: only the player is detected from now on
+    detect(tracker, [PLAYER], [0])
+
+    ids, xyxy, cls, conf = tracker.step(max_misses=1)
+    assert cls.tolist() == [0]
+    # Without the limit the stick keeps coasting for up to max_age frames
+    ids, xyxy, cls, conf = tracker.step()
+    assert sorted(cls.tolist()) == [0, 3]
+
+def test_tracks_matched_on_the_last_detection_stay_fresh():
+    tracker = MultiObjectTracker()
+    detect(tracker, [PLAYER, STICK], [0, 3])
+    detect(tracker, [PLAYER, STICK], [0, 3])
+    for frames_since_detection in (1, 2, 3):
+        ids, xyxy, cls, conf = tracker.step(max_misses=frames_since_detection)
+        assert sorted(cls.tolist()) == [0, 3]
+        np.testing.assert_allclose(xyxy[cls == 0], PLAYER, atol=1.0)
@@ -0,0 +1,70 @@
+"""Export writers, run without a GUI."""
+import csv
+import re
+
+import pytest
+
+import utils
+from utils import LOG_COLUMNS, write_csv, write_pdf
+
+def log_rows(n):
+    return [
+        (f"10:{i // 60:02d}:{i % 60:02d}", i % 2 == 0, 50.0 + i % 50, "Red" if i % 3 else "Blue", "Head")
+        for i in range(n)
+    ]
+
+def test_csv_sections_and_progress(tmp_path):
+    path = tmp_path / "logs.csv"
+    reports = []
+    sections = [("Camera 1", log_rows(12001)), ("Camera 2", log_rows(3))]
+    write_csv(str(path), sections, [name for name, _, _ in LOG_COLUMNS], lambda done, total: reports.append(done))
+
+    with open(path, newline="") as file:
+        lines = list(csv.reader(file))
+    assert lines[0] == ["Camera 1"]
+    assert lines[1] == ["Time", "Valid", "Confidence", "Scored By", "Body Part"]
+    assert lines[2] == ["10:00:00", "True", "50.0", "Blue", "Head"]
+    assert lines[12003] == []
+    assert lines[12004] == ["Camera 2"]
+    assert len(lines) == 2 + 12001 + 1 + 2 + 3 + 1
+    assert reports[-1] == 12004 and reports == sorted(reports)
+
+# ---------------- PDF ----------------
+@pytest.fixture(autouse=True)
+def needs_fpdf(request):
+    if request.node.name.startswith("test_pdf"):
+        pytest.importorskip("fpdf")
+
+def without_creation_date(data):
+    return re.sub(rb"/CreationDate \(D:\d+\)", b"", data)
+
+def test_pdf_buffer_matches_pyfpdf_output(tmp_path, monkeypatch):
+    """The joined-once buffer must produce the same file as pyfpdf's own str buffer."""
+    sections = [("Camera 1", log_rows(700)), ("Camera 2", log_rows(5))]
+    fast, plain = tmp_path / "fast.pdf", tmp_path / "plain.pdf"
+    write_pdf(str(fast), "Arnis Strike Detection Logs", sections, LOG_COLUMNS)
+    monkeypatch.setattr(utils, "_PdfBuffer", str)
+    write_pdf(str(plain), "Arnis Strike Detection Logs", sections, LOG_COLUMNS)
+    assert without_creation_date(fast.read_bytes()) == without_creation_date(plain.read_bytes())
+
+def test_pdf_contents(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    path = tmp_path / "logs.pdf"
+    reports = []
+    rows = log_rows(1000)
+    write_pdf(str(path), "Arnis Strike Detection Logs", [("Camera 1", rows), ("Camera 3", log_rows(2))],
+              LOG_COLUMNS, lambda done, total: reports.append((done, total)))
+
+    with pymupdf.open(str(path)) as document:
+        pages = [page.get_text() for page in document]
+    text = "\n".join(pages)
+    assert "Arnis Strike Detection Logs" in text
+    assert "Camera 1" in text and "Camera 3" in text
+    # Every page repeats the header row
+    assert all("Body Part" in page for page in pages)
+    assert len(pages) == pytest.approx(1002 / 25, abs=3)
+    # Confidence goes through the column formatter
+    assert "99.00" in text
+    last_time = rows[-1][0]
+    assert last_time in pages[-1] or last_time in pages[-2]
+    assert reports[-1] == (1002, 1002)
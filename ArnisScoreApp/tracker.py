@@ -0,0 +1,174 @@
+import numpy as np
+
+from geometry import iou_matrix
+
+# Constant-velocity model over (cx, cy, w, h) and their velocities, one step per frame
+_F = np.eye(8, dtype=np.float64)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8, dtype=np.float64)
+
+# Noise scaled by box height, as in SORT/ByteTrack
+STD_POSITION = 1.0 / 20
+STD_VELOCITY = 1.0 / 160
+
+def _xyxy_to_cxcywh(xyxy):
+    wh = xyxy[:, 2:] - xyxy[:, :2]
+    return np.hstack([xyxy[:, :2] + wh / 2, wh])
+
+def _cxcywh_to_xyxy(cxcywh):
+    half = cxcywh[:, 2:] / 2
+    return np.hstack([cxcywh[:, :2] - half, cxcywh[:, :2] + half])
+
+def _greedy_match(ious, threshold):
+    """Highest-IoU-first assignment; returns (row, col) pairs above ``threshold``."""
+    matches = []
+    if ious.size == 0:
+        return matches
+    ious = ious.copy()
+    while True:
+        r, c = np.unravel_index(np.argmax(ious), ious.shape)
+        if ious[r, c] < threshold:
+            return matches
+        matches.append((r, c))
+        ious[r, :] = -1.0
+        ious[:, c] = -1.0
+
+class MultiObjectTracker:
+    """ByteTrack-style Kalman + IoU tracker for players and sticks.
+
+    State for every track lives in stacked arrays so ``predict`` is a couple of
+    matrix products regardless of how many objects are on screen. Call
+    ``step(xyxy, cls, conf)`` on frames the detector ran on and ``step()`` on
+    skipped frames to get predicted boxes.
+    """
+    def __init__(self, iou_threshold=0.2, high_conf=0.6, low_conf=0.1, max_age=15):
+        self.iou_threshold = iou_threshold
+        self.high_conf = high_conf
+        self.low_conf = low_conf
+        self.max_age = max_age
+        self.next_id = 1
+        self.reset()
+
+    def reset(self):
+        self.mean = np.zeros((0, 8))
+        self.cov = np.zeros((0, 8, 8))
+        self.ids = np.zeros(0, np.int64)
+        self.cls = np.zeros(0, np.int64)
+        self.conf = np.zeros(0, np.float32)
+        self.misses = np.zeros(0, np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---------------- Kalman steps ----------------
+    def _noise(self, heights, scale_pos, scale_vel):
+        std = np.concatenate([
+            np.repeat((scale_pos * heights)[:, None], 4, axis=1),
+            np.repeat((scale_vel * heights)[:, None], 4, axis=1),
+        ], axis=1)
+        return np.einsum("ni,ij->nij", std ** 2, np.eye(8))
+
+    def predict(self):
+        if not len(self):
+            return
+        heights = np.maximum(self.mean[:, 3], 1.0)
+        self.mean = self.mean @ _F.T
+        self.cov = _F @ self.cov @ _F.T + self._noise(heights, STD_POSITION, STD_VELOCITY)
+        self.misses += 1
+        self._prune()
+
+    def _correct(self, rows, measurements):
+        mean, cov = self.mean[rows], self.cov[rows]
+        heights = np.maximum(measurements[:, 3], 1.0)
+        R = (STD_POSITION * heights)[:, None, None] ** 2 * np.eye(4)
+        S = _H @ cov @ _H.T + R
+        K = cov @ _H.T @ np.linalg.inv(S)
+        innovation = measurements - mean @ _H.T
+        self.mean[rows] = mean + np.einsum("nij,nj->ni", K, innovation)
+        self.cov[rows] = cov - K @ _H @ cov
+        self.misses[rows] = 0
+
+    def _spawn(self, xyxy, cls, conf):
+        n = len(xyxy)
+        if not n:
+            return np.zeros(0, np.int64)
+        measurement = _xyxy_to_cxcywh(xyxy)
+        heights = np.maximum(measurement[:, 3], 1.0)
+        ids = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        self.mean = np.vstack([self.mean, np.hstack([measurement, np.zeros((n, 4))])])
+        self.cov = np.concatenate([self.cov, self._noise(heights, 2 * STD_POSITION, 10 * STD_VELOCITY)])
+        self.ids = np.concatenate([self.ids, ids])
+        self.cls = np.concatenate([self.cls, cls])
+        self.conf = np.concatenate([self.conf, conf])
+        self.misses = np.concatenate([self.misses, np.zeros(n, np.int64)])
+        return ids
+
+    # ---------------- Association ----------------
+    def _associate(self, det_idx, xyxy, cls, free_tracks):
+        """Match detections ``det_idx`` to ``free_tracks`` of the same class."""
+        pairs = []
+        if not len(det_idx) or not free_tracks:
+            return pairs
+        track_rows = np.array(sorted(free_tracks))
+        ious = iou_matrix(xyxy[det_idx].astype(np.float64), self.boxes()[track_rows])
+        ious[cls[det_idx][:, None] != self.cls[track_rows][None, :]] = 0.0
+        for d, t in _greedy_match(ious, self.iou_threshold):
+            pairs.append((det_idx[d], track_rows[t]))
+        return pairs
+
+    def update(self, xyxy, cls, conf):
+        """Associates one frame of detections; returns the track id per detection (-1 if none)."""
+        xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+        cls = np.asarray(cls).astype(np.int64).reshape(-1)
+        conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        det_ids = np.full(len(xyxy), -1, dtype=np.int64)
+
+        high = np.flatnonzero(conf >= self.high_conf)
+        low = np.flatnonzero((conf >= self.low_conf) & (conf < self.high_conf))
+        free_tracks = set(range(len(self)))
+
+        # Confident detections first, then let weak ones keep existing tracks alive
+        matched = self._associate(high, xyxy, cls, free_tracks)
+        free_tracks -= {t for _, t in matched}
+        matched += self._associate(low, xyxy, cls, free_tracks)
+
+        if matched:
+            det_rows = np.array([d for d, _ in matched])
+            track_rows = np.array([t for _, t in matched])
+            self._correct(track_rows, _xyxy_to_cxcywh(xyxy[det_rows]))
+            self.conf[track_rows] = conf[det_rows]
+            det_ids[det_rows] = self.ids[track_rows]
+
+        matched_dets = {d for d, _ in matched}
+        new = np.array([d for d in high if d not in matched_dets], dtype=np.int64)
+        det_ids[new] = self._spawn(xyxy[new], cls[new], conf[new])
+
+        return det_ids
+
+    def _prune(self):
+        keep = self.misses <= self.max_age
+        if not keep.all():
+            self.mean, self.cov = self.mean[keep], self.cov[keep]
+            self.ids, self.cls = self.ids[keep], self.cls[keep]
+            self.conf, self.misses = self.conf[keep], self.misses[keep]
+
+    # ---------------- Output ----------------
+    def boxes(self):
+        return _cxcywh_to_xyxy(self.mean[:, :4])
+
+    def step(self, xyxy=None, cls=None, conf=None, max_misses=None):
+        """Advance one frame; pass detections when the detector ran on it.
+
+        Returns (ids, xyxy, cls, conf) for every live track, or only for
+        tracks missed on at most ``max_misses`` frames. Tracks coast for up
+        to ``max_age`` frames so they can be re-matched, but a coasting box
+        is a guess and should not be scored.
+        """
+        self.predict()
+        if xyxy is not None:
+            self.update(xyxy, cls, conf)
+        if max_misses is None:
+            return self.ids.copy(), self.boxes().astype(np.float32), self.cls.copy(), self.conf.copy()
+        fresh = self.misses <= max_misses
+        return self.ids[fresh], self.boxes()[fresh].astype(np.float32), self.cls[fresh], self.conf[fresh]
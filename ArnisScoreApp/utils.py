@@ -1,87 +1,261 @@
-import csv
-from fpdf import FPDF
-from PyQt5.QtWidgets import QFileDialog
-
-def export_to_csv(logs_list):
-    file_path, _ = QFileDialog.getSaveFileName(None, "Save CSV", "", "CSV Files (*.csv)")
-    if not file_path:
-        return
-
-    with open(file_path, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        for camera_name, logs in logs_list:
-            writer.writerow([camera_name])
-            writer.writerow(["Time", "Valid", "Confidence", "Scored By", "Body Part"])
-            writer.writerows(logs)
-            writer.writerow([])
-    return file_path
-
-def export_to_pdf(logs_list):
-    """
-    logs_list: List of tuples (camera_name, logs)
-    """
-    file_path, _ = QFileDialog.getSaveFileName(None, "Save PDF", "", "PDF Files (*.pdf)")
-    if not file_path:
-        return
-
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", size=14)
-    pdf.cell(200, 10, "Arnis Strike Detection Logs", ln=True, align="C")
-    pdf.set_font("Arial", size=12)
-
-    for camera_name, logs in logs_list:
-        pdf.ln(5)
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, camera_name, ln=True)
-        pdf.set_font("Arial", size=12)
-        pdf.cell(40, 10, "Time", 1)
-        pdf.cell(30, 10, "Valid", 1)
-        pdf.cell(40, 10, "Confidence", 1)
-        pdf.cell(40, 10, "Scored By", 1)
-        pdf.cell(40, 10, "Body Part", 1)
-        pdf.ln()
-
-        for log in logs:
-            timestamp, valid, confidence, scored_by, body_part = log
-            pdf.cell(40, 10, str(timestamp), 1)
-            pdf.cell(30, 10, str(valid), 1)
-            pdf.cell(40, 10, f"{confidence:.2f}", 1)
-            pdf.cell(40, 10, scored_by, 1)
-            pdf.cell(40, 10, body_part, 1)
-            pdf.ln()
-    pdf.output(file_path)
-    return file_path
-
-def export_cnn_lstm_logs_csv(title, logs):
-    file_path, _ = QFileDialog.getSaveFileName(None, f"Save {title} as CSV", "", "CSV Files (*.csv)")
-    if not file_path:
-        return
-    with open(file_path, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow([title])
-        writer.writerow(["Time", "Confidence", "Body Part", "Camera"])
-        writer.writerows(logs)
-
-def export_cnn_lstm_logs_pdf(title, logs):
-    file_path, _ = QFileDialog.getSaveFileName(None, f"Save {title} as PDF", "", "PDF Files (*.pdf)")
-    if not file_path:
-        return
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", size=14)
-    pdf.cell(200, 10, title, ln=True, align="C")
-    pdf.set_font("Arial", size=12)
-    pdf.cell(45, 10, "Time", 1)
-    pdf.cell(45, 10, "Confidence", 1)
-    pdf.cell(45, 10, "Body Part", 1)
-    pdf.cell(45, 10, "Camera", 1)
-    pdf.ln()
-    for log in logs:
-        time, confidence, body_part, camera = log
-        pdf.cell(45, 10, str(time), 1)
-        pdf.cell(45, 10, str(confidence), 1)
-        pdf.cell(45, 10, str(body_part), 1)
-        pdf.cell(45, 10, str(camera), 1)
-        pdf.ln()
-    pdf.output(file_path)
+import csv
+import importlib.util
+from itertools import islice
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtWidgets import QFileDialog
+
+LOG_COLUMNS = [
+    # (header, PDF column width, PDF formatter)
+    ("Time", 40, str),
+    ("Valid", 30, str),
+    ("Confidence", 40, "{:.2f}".format),
+    ("Scored By", 40, str),
+    ("Body Part", 40, str),
+]
+CNN_LSTM_COLUMNS = [
+    ("Time", 45, str),
+    ("Confidence", 45, str),
+    ("Body Part", 45, str),
+    ("Camera", 45, str),
+]
+CHUNK_ROWS = 5000
+PARQUET_ROW_GROUP = 65536
+
+# ---------------- Background export ----------------
+class ExportWorker(QThread):
+    """Writes one export file off the GUI thread.
+
+    ``job(file_path, progress)`` does the writing and calls
+    ``progress(done, total)`` as it goes; the worker turns that into
+    percentage updates for a progress bar.
+    """
+    progress = pyqtSignal(int, str)
+    exported = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, label, job, file_path, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.job = job
+        self.file_path = file_path
+        self.percent = -1
+        self.finished.connect(self.deleteLater)
+
+    def run(self):
+        try:
+            self.job(self.file_path, self.report)
+        except Exception as e:
+            print(f"{self.label} failed: {e}")
+            self.failed.emit(f"{self.label} failed: {e}")
+        else:
+            self.exported.emit(self.file_path)
+
+    def report(self, done, total):
+        percent = min(100, int(100 * done / total)) if total else 100
+        if percent != self.percent:
+            self.percent = percent
+            self.progress.emit(percent, f"{self.label}: {done}/{total} rows")
+
+def prepare_export(parent, caption, file_filter, job):
+    """Asks for a file name; returns an ExportWorker for it (not started), or None if cancelled."""
+    file_path, _ = QFileDialog.getSaveFileName(parent, caption, "", file_filter)
+    if not file_path:
+        return None
+    return ExportWorker(caption, job, file_path, parent)
+
+def attach_progress(worker, progress_bar, show_message=print):
+    """Shows a worker's progress on ``progress_bar`` and its outcome via ``show_message``."""
+    progress_bar.setValue(0)
+    progress_bar.show()
+    worker.progress.connect(lambda percent, _: progress_bar.setValue(percent))
+    worker.exported.connect(lambda file_path: show_message(f"Exported {file_path}"))
+    worker.failed.connect(show_message)
+    worker.finished.connect(progress_bar.hide)
+
+# ---------------- Writers (run on the export thread) ----------------
+def write_csv(file_path, sections, headers, progress=None):
+    """sections: [(title, rows)]; rows are written in chunks of CHUNK_ROWS."""
+    total = sum(len(rows) for _, rows in sections)
+    done = 0
+    with open(file_path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        for title, rows in sections:
+            writer.writerow([title])
+            writer.writerow(headers)
+            rows = iter(rows)
+            while True:
+                chunk = list(islice(rows, CHUNK_ROWS))
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+            writer.writerow([])
+    if progress:
+        progress(total, total)
+
+class _PdfBuffer:
+    """Drop-in for pyfpdf's str document buffer, which it grows with ``+=``.
+
+    With hundreds of pages that copy made ``output`` quadratic; chunks are
+    joined once at the end instead.
+    """
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def __iadd__(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        return self
+
+    def __len__(self):
+        return self.size
+
+    def encode(self, encoding):
+        return "".join(self.parts).encode(encoding)
+
+def write_pdf(file_path, title, sections, columns, progress=None, row_height=10):
+    """sections: [(title, rows)]; columns: [(header, width, formatter)].
+
+    Pages are laid out one at a time: each row is plain text plus one rule
+    under it, and the column lines are drawn once per page, instead of a
+    bordered cell per field.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(False)
+    pdf.set_compression(True)
+    if isinstance(getattr(pdf, "buffer", None), str):
+        pdf.buffer = _PdfBuffer()
+    left = pdf.l_margin
+    right = left + sum(width for _, width, _ in columns)
+    bottom = pdf.h - pdf.b_margin
+    total = sum(len(rows) for _, rows in sections)
+    done = 0
+
+    def header():
+        pdf.set_font("Arial", "B", size=12)
+        for name, width, _ in columns:
+            pdf.cell(width, row_height, name, 1)
+        pdf.ln()
+        pdf.set_font("Arial", size=12)
+        return pdf.get_y()
+
+    def column_lines(top, end):
+        x = left
+        for _, width, _ in columns:
+            pdf.line(x, top, x, end)
+            x += width
+        pdf.line(right, top, right, end)
+
+    pdf.add_page()
+    pdf.set_font("Arial", "B", size=14)
+    pdf.cell(200, 10, title, ln=True, align="C")
+    for section_title, rows in sections:
+        if section_title:
+            pdf.ln(5)
+            if pdf.get_y() + 3 * row_height > bottom:
+                pdf.add_page()
+            pdf.set_font("Arial", "B", 12)
+            pdf.cell(0, 10, section_title, ln=True)
+        top = header()
+        for row in rows:
+            if pdf.get_y() + row_height > bottom:
+                column_lines(top, pdf.get_y())
+                pdf.add_page()
+                top = header()
+            y = pdf.get_y()
+            x = left
+            for (_, width, formatter), value in zip(columns, row):
+                pdf.text(x + 1, y + row_height * 0.65, formatter(value))
+                x += width
+            pdf.line(left, y + row_height, right, y + row_height)
+            pdf.set_y(y + row_height)
+            done += 1
+            if progress and done % 500 == 0:
+                progress(done, total)
+        column_lines(top, pdf.get_y())
+    pdf.output(file_path)
+    if progress:
+        progress(total, total)
+
+def has_parquet():
+    return importlib.util.find_spec("pyarrow") is not None
+
+def write_events_parquet(file_path, store, progress=None, **filters):
+    """Streams events from an EventStore into a Parquet file, one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+    from event_store import EVENT_COLUMNS
+
+    # Repeated strings (scorer, body part) are dictionary-encoded by Parquet itself
+    schema = pa.schema([
+        ("id", pa.int64()), ("match_id", pa.int64()), ("camera", pa.int8()),
+        ("timestamp", pa.timestamp("ms")), ("valid", pa.bool_()), ("confidence", pa.float32()),
+        ("scored_by", pa.string()), ("body_part", pa.string()),
+        ("blue_score", pa.int32()), ("red_score", pa.int32()),
+    ])
+    store.flush()   # include hits still waiting in the writer queue
+    total = store.count(**filters)
+    done = 0
+    with pq.ParquetWriter(file_path, schema, compression="zstd") as writer:
+        for chunk in store.iter_query(chunk_size=PARQUET_ROW_GROUP, **filters):
+            columns = dict(zip(EVENT_COLUMNS, map(list, zip(*chunk))))
+            columns["timestamp"] = [round(t * 1000) for t in columns["timestamp"]]
+            columns["valid"] = [bool(v) for v in columns["valid"]]
+            writer.write_table(pa.table(
+                [pa.array(columns[field.name], type=field.type) for field in schema], schema=schema
+            ))
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    if progress:
+        progress(total, total)
+
+# ---------------- GUI entry points ----------------
+def export_to_csv(logs_list, parent=None):
+    """logs_list: List of tuples (camera_name, logs). Returns an unstarted ExportWorker or None."""
+    return prepare_export(
+        parent, "Save CSV", "CSV Files (*.csv)",
+        lambda file_path, progress: write_csv(
+            file_path, logs_list, [name for name, _, _ in LOG_COLUMNS], progress
+        ),
+    )
+
+def export_to_pdf(logs_list, parent=None):
+    """logs_list: List of tuples (camera_name, logs). Returns an unstarted ExportWorker or None."""
+    return prepare_export(
+        parent, "Save PDF", "PDF Files (*.pdf)",
+        lambda file_path, progress: write_pdf(
+            file_path, "Arnis Strike Detection Logs", logs_list, LOG_COLUMNS, progress
+        ),
+    )
+
+def export_to_parquet(store, parent=None, **filters):
+    """Every stored event (or those matching ``filters``) as one Parquet file."""
+    return prepare_export(
+        parent, "Save Parquet", "Parquet Files (*.parquet)",
+        lambda file_path, progress: write_events_parquet(file_path, store, progress, **filters),
+    )
+
+def export_cnn_lstm_logs_csv(title, logs, parent=None):
+    return prepare_export(
+        parent, f"Save {title} as CSV", "CSV Files (*.csv)",
+        lambda file_path, progress: write_csv(
+            file_path, [(title, logs)], [name for name, _, _ in CNN_LSTM_COLUMNS], progress
+        ),
+    )
+
+def export_cnn_lstm_logs_pdf(title, logs, parent=None):
+    return prepare_export(
+        parent, f"Save {title} as PDF", "PDF Files (*.pdf)",
+        lambda file_path, progress: write_pdf(
+            file_path, title, [(None, logs)], CNN_LSTM_COLUMNS, progress
+        ),
+    )
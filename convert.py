@@ -1,6 +1,6 @@
-from ultralytics import YOLO
-
-model = YOLO("results/weights/best.pt")  
-
-
-model.export(format="onnx")
+from ultralytics import YOLO
+
+model = YOLO("results/weights/best.pt")  
+
+
+model.export(format="onnx")
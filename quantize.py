@@ -0,0 +1,225 @@
+"""Static INT8 quantization of the trained detector, with an accuracy/latency report.
+
+    python quantize.py --weights results/weights/best.pt --data data.yaml
+
+Writes ``best.onnx`` (FP32) and ``best_int8.onnx`` next to the weights and a
+``quantization_report.csv`` in ``results/``. To run the INT8 model in the app,
+copy it to ``ArnisScoreApp/models/object_detection_int8.onnx`` and start
+``main.py --backend int8``.
+"""
+import os
+import re
+import csv
+import glob
+import time
+import random
+import argparse
+
+import cv2
+import yaml
+import numpy as np
+from ultralytics import YOLO
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Same metric columns as results/results.csv so the report lines up with training runs
+METRIC_COLUMNS = [
+    "metrics/precision(B)",
+    "metrics/recall(B)",
+    "metrics/mAP50(B)",
+    "metrics/mAP50-95(B)",
+]
+LATENCY_COLUMNS = ["latency_ms", "latency_p95_ms", "fps", "fps_per_camera_3cams"]
+
+def dataset_sources(data, key, data_file):
+    """data.yaml's train/val entry as paths, relative to its ``path:`` key as ultralytics resolves them."""
+    root = os.path.dirname(os.path.abspath(data_file))
+    base = data.get("path") or root
+    if not os.path.isabs(base) and not os.path.exists(base):
+        base = os.path.join(root, base)
+    entries = data[key] if isinstance(data[key], list) else [data[key]]
+    return [entry if os.path.isabs(entry) else os.path.join(base, entry) for entry in entries]
+
+def list_images(sources, limit=None, seed=0):
+    images = []
+    for source in sources:
+        if os.path.isdir(source):
+            images += [
+                p for p in glob.glob(os.path.join(source, "**", "*"), recursive=True)
+                if p.lower().endswith(IMAGE_EXTENSIONS)
+            ]
+        elif source.endswith(".txt") and os.path.isfile(source):
+            with open(source) as f:
+                images += [line.strip() for line in f if line.strip()]
+        elif os.path.isfile(source):
+            images.append(source)
+        else:
+            # e.g. a data.yaml written on Windows read on Linux
+            raise FileNotFoundError(f"Dataset images not found: {source}")
+    if not images:
+        raise RuntimeError(f"No images in {', '.join(sources)}")
+    images.sort()
+    if limit and len(images) > limit:
+        images = random.Random(seed).sample(images, limit)
+    return images
+
+def letterbox(image, size=640):
+    """Resize keeping aspect ratio and pad to a square, as ultralytics does before inference."""
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    resized = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    canvas[top:top + nh, left:left + nw] = resized
+    blob = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)
+    return np.ascontiguousarray(blob[None], dtype=np.float32) / 255.0
+
+class CalibrationReader:
+    """Feeds letterboxed training images to onnxruntime's static calibrator."""
+    def __init__(self, images, input_name, imgsz=640):
+        self.images = iter(images)
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self.count = 0
+
+    def get_next(self):
+        for path in self.images:
+            image = cv2.imread(path)
+            if image is not None:
+                self.count += 1
+                return {self.input_name: letterbox(image, self.imgsz)}
+        if not self.count:
+            # onnxruntime's own error for an empty calibration set does not say why
+            raise RuntimeError("No readable calibration images")
+        return None
+
+def head_nodes_to_exclude(onnx_path):
+    """Box decoding in the detect head mixes pixel coordinates and 0-1 class scores
+    in one tensor; quantizing those ops destroys the scores, so only the head's
+    convolutions are quantized."""
+    import onnx
+    graph = onnx.load(onnx_path).graph
+    indices = [int(m.group(1)) for n in graph.node for m in [re.match(r"/model\.(\d+)/", n.name)] if m]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [n.name for n in graph.node if n.name.startswith(head) and n.op_type != "Conv"]
+
+def export_fp32(weights, imgsz):
+    return YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+
+def quantize_int8(fp32_path, int8_path, calibration_images, imgsz):
+    import onnxruntime as ort
+    from onnxruntime.quantization import (
+        CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared_path = fp32_path.replace(".onnx", "_prep.onnx")
+    quant_pre_process(fp32_path, prepared_path)
+
+    input_name = ort.InferenceSession(
+        prepared_path, providers=["CPUExecutionProvider"]
+    ).get_inputs()[0].name
+
+    quantize_static(
+        prepared_path,
+        int8_path,
+        CalibrationReader(calibration_images, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=head_nodes_to_exclude(prepared_path),
+    )
+    os.remove(prepared_path)
+    return int8_path
+
+def evaluate_accuracy(model_path, data, imgsz):
+    metrics = YOLO(model_path, task="detect").val(
+        data=data, imgsz=imgsz, batch=1, device="cpu", plots=False, verbose=False
+    )
+    box = metrics.box
+    return dict(zip(METRIC_COLUMNS, (box.mp, box.mr, box.map50, box.map)))
+
+def measure_latency(model_path, images, imgsz, warmup=10):
+    """Per-frame CPU latency including pre/post-processing, as the live app sees it."""
+    model = YOLO(model_path, task="detect")
+    frames = [f for f in (cv2.imread(p) for p in images) if f is not None]
+    if not frames:
+        raise RuntimeError("No readable images for latency measurement")
+
+    for frame in frames[:warmup]:
+        model(frame, imgsz=imgsz, device="cpu", verbose=False)
+
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        model(frame, imgsz=imgsz, device="cpu", verbose=False)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    mean = float(np.mean(timings))
+    fps = 1000.0 / mean
+    return {
+        "latency_ms": mean,
+        "latency_p95_ms": float(np.percentile(timings, 95)),
+        "fps": fps,
+        "fps_per_camera_3cams": fps / 3.0,
+    }
+
+def write_report(rows, path):
+    columns = ["model"] + METRIC_COLUMNS + LATENCY_COLUMNS
+    with open(path, mode="w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: (f"{v:.5g}" if isinstance(v, float) else v) for k, v in row.items()})
+
+    for row in rows:
+        print(
+            f"{row['model']:>10}  mAP50 {row['metrics/mAP50(B)']:.4f}  "
+            f"mAP50-95 {row['metrics/mAP50-95(B)']:.4f}  "
+            f"{row['latency_ms']:.1f} ms/frame  {row['fps']:.1f} FPS"
+        )
+    print(f"Report written to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default="results/weights/best.pt")
+    parser.add_argument("--data", default="data.yaml")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--calib-images", type=int, default=200, help="Training images sampled for calibration")
+    parser.add_argument("--latency-images", type=int, default=100, help="Validation images timed per model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default="results/quantization_report.csv")
+    args = parser.parse_args()
+
+    with open(args.data) as f:
+        data = yaml.safe_load(f)
+    calibration_images = list_images(dataset_sources(data, "train", args.data), args.calib_images, args.seed)
+    latency_images = list_images(dataset_sources(data, "val", args.data), args.latency_images, args.seed)
+    print(f"{len(calibration_images)} calibration images, {len(latency_images)} latency images")
+
+    fp32_path = export_fp32(args.weights, args.imgsz)
+    int8_path = quantize_int8(
+        fp32_path, fp32_path.replace(".onnx", "_int8.onnx"), calibration_images, args.imgsz
+    )
+
+    rows = []
+    for name, path in (("fp32", fp32_path), ("int8", int8_path)):
+        row = {"model": name}
+        row.update(evaluate_accuracy(path, args.data, args.imgsz))
+        row.update(measure_latency(path, latency_images, args.imgsz))
+        rows.append(row)
+
+    delta = {"model": "int8-fp32"}
+    for column in METRIC_COLUMNS + LATENCY_COLUMNS:
+        delta[column] = rows[1][column] - rows[0][column]
+    rows.append(delta)
+
+    write_report(rows, args.report)
+
+if __name__ == "__main__":
+    main()